@@ -0,0 +1,281 @@
+""" Benchmark suite for the hot paths, on a synthetic shoot (benchmarks/shoot.py). Runs headless: the
+    engine and the decode/render functions are timed directly, and Tk PhotoImage conversion is added
+    to the zoom benchmark when a display is available (e.g. under xvfb-run).
+
+    python benchmarks/run.py --json results.json                 # generates ./.bench_shoot on first use
+    python benchmarks/run.py --shoot /mnt/ssd/shoot --count 2000 --repeat 5 --only scan,thumbnails
+    python benchmarks/run.py --compare before.json --json after.json
+
+    Every benchmark runs --repeat times (median reported); destructive ones (sort, rename, sequence) run
+    on a hard-linked clone of the shoot, rebuilt before each repeat and not timed. Results depend on the
+    page cache: the first repeat of 'scan' and 'thumbnails' is usually the coldest. """
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import photo_engine as engine
+from shoot import generate_shoot, parse_size
+
+class Bench:
+    """ Shared state: the shoot, its file lists and a scratch folder. """
+    def __init__(self, shoot, scratch):
+        self.shoot = shoot
+        self.scratch = scratch
+        self.files = engine.scan_folder(shoot)  # Relative paths, capture order
+        self.jpegs = [f for f in self.files if f.upper().endswith(".JPG")]
+        self.videos = [f for f in self.files if f.upper().endswith(".MP4")]
+        self.first_folder = os.path.join(shoot, "DCIM", sorted(os.listdir(os.path.join(shoot, "DCIM")))[0])
+
+    def path(self, rel):
+        return os.path.join(self.shoot, rel)
+
+    def clone(self):
+        """ Fresh hard-linked copy of the shoot in scratch (falls back to copies across volumes). """
+        dst = os.path.join(self.scratch, "clone")
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(self.shoot, dst, copy_function=_link_or_copy)
+        return dst
+
+def _link_or_copy(src, dst):
+    try: os.link(src, dst)
+    except OSError: shutil.copy2(src, dst)
+
+# --- Benchmarks: setup(b) -> state (untimed), run(b, state) -> items processed ---
+def bench_scan(b, _state):
+    """ Folder scan + capture-time ordering with a cold metadata index. """
+    db = os.path.join(b.scratch, "scan_meta.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db + suffix): os.remove(db + suffix)
+    return len(engine.scan_folder(b.shoot, metadata=engine.MetadataIndex(db)))
+
+def bench_scan_warm(b, _state):
+    """ Same, reopening a persisted metadata index (second visit to a card). """
+    return len(engine.scan_folder(b.shoot, metadata=engine.MetadataIndex(os.path.join(b.scratch, "warm_meta.sqlite"))))
+
+def bench_thumbnails(b, _state):
+    """ Ribbon thumbnails (80x60) of every file through the app's decode pool, no cache. """
+    import photo_organizer as app
+    files = [b.path(f) for f in b.files]
+    pool = app.get_decode_pool()
+    return sum(1 for r in pool.map(app.thumbnail_worker, files, [(80, 60)] * len(files), chunksize=8) if r)
+
+def bench_thumbnails_no_exif(b, _state):
+    """ The slow path: thumbnails decoded from the image data (first 100 JPEGs, serial). """
+    import photo_organizer as app
+    from PIL import Image
+    files = [b.path(f) for f in b.jpegs[:100]]
+    for path in files:
+        with Image.open(path) as img:
+            img.draft("RGB", (160, 120))
+            img = app.apply_orientation(img, img.getexif().get(0x0112, 1))
+            img.thumbnail((80, 60))
+    return len(files)
+
+def bench_decode_screen(b, _state):
+    """ Main-image decode to a 2560x1440 viewer (first 40 JPEGs). """
+    import photo_organizer as app
+    files = [b.path(f) for f in b.jpegs[:40]]
+    for path in files: app.load_screen_image(path, (2560, 1440))
+    return len(files)
+
+def bench_decode_full(b, _state):
+    """ Full-resolution decode for zooming in (first 5 JPEGs). """
+    import photo_organizer as app
+    files = [b.path(f) for f in b.jpegs[:5]]
+    for path in files: app.load_media(path, "full", None)
+    return len(files)
+
+def bench_decode_video(b, _state):
+    """ First frame of every clip (viewer) via the app's loader. """
+    import photo_organizer as app
+    if not b.videos or not app.HAS_CV2: return 0
+    for f in b.videos: app.load_media(b.path(f), "video", None)
+    return len(b.videos)
+
+def bench_video_frames(b, _state):
+    """ Ribbon thumbnail + viewer frame of every clip through a fresh VideoFrameService (one shared decode
+        per clip, empty caches); includes starting the worker processes. """
+    import photo_organizer as app
+    if not b.videos or not app.HAS_CV2: return 0
+    cache = os.path.join(b.scratch, "video_frames")
+    shutil.rmtree(cache, ignore_errors=True)
+    service = app.VideoFrameService(box=(1920, 1080), cache_dir=cache)
+    futures = [service.submit(b.path(f)) for f in b.videos] + [service.submit(b.path(f), urgent=True) for f in b.videos]
+    frames = [fut.result() for fut in futures]
+    for frame in frames[:len(b.videos)]:
+        if frame is not None: app.video_thumbnail(frame, (80, 60))
+    return sum(1 for frame in frames[:len(b.videos)] if frame is not None)
+
+def setup_zoom(b):
+    import photo_organizer as app
+    return app.load_media(b.path(b.jpegs[0]), "full", None)
+
+def bench_zoom_redraw(b, base):
+    """ 60 redraws of a 1920x1080 view zooming from fit to 2:1 and back on a full-res image, with a fresh
+        pyramid; includes Tk PhotoImage conversion when a display is available. """
+    import photo_organizer as app
+    pyramid = app.ImagePyramid(base)
+    view_w, view_h = 1920, 1080
+    fit = min(view_w / base.width, view_h / base.height)
+    scales = [fit * (2 / fit) ** (i / 29) for i in range(30)]
+    tk_root = _tk_root()
+    for scale in scales + scales[::-1]:
+        left, top = view_w / 2 - base.width * scale / 2, view_h / 2 - base.height * scale / 2
+        crop, _x, _y = pyramid.render(scale, left, top, view_w, view_h)
+        if tk_root is not None: app.ImageTk.PhotoImage(crop)
+    return len(scales) * 2
+
+_tk = []
+def _tk_root():
+    if not _tk:
+        try:
+            import tkinter
+            root = tkinter.Tk()
+            root.withdraw()
+            _tk.append(root)
+        except Exception: _tk.append(None)
+    return _tk[0]
+
+def _labels(b, rels):
+    rng = random.Random(7)
+    return {f: rng.choice(("Green", "Green", "Yellow", "Yellow", "Red", "Unmarked")) for f in rels}
+
+def setup_sort(b):
+    return b.clone()
+
+def bench_sort_copy(b, clone):
+    """ Visual Sorter run (copy, related RAW/XMP included, 2 workers) as run_visual_sort does it. """
+    out = os.path.join(b.scratch, "sorted")
+    shutil.rmtree(out, ignore_errors=True)
+    labels = _labels(b, b.files)
+    job = engine.SortJob(lambda: engine.plan_visual_sort(clone, out, labels, {}, "copy", True), workers=2, roots=[out])
+    job._run()
+    if job.error: raise RuntimeError(job.error)
+    return len(job.results())
+
+def bench_sort_move(b, clone):
+    """ Same with move into <source>/<label> (same volume: renames). """
+    labels = _labels(b, b.files)
+    job = engine.SortJob(lambda: engine.plan_visual_sort(clone, clone, labels, {}, "move", True), workers=2, roots=[clone])
+    job._run()
+    if job.error: raise RuntimeError(job.error)
+    return len(job.results())
+
+def bench_group_rename(b, clone):
+    """ Process Groups: every JPEG of each folder renamed chronologically as one scene (two-phase). """
+    metadata = engine.MetadataIndex(os.path.join(b.scratch, "rename_meta.sqlite"))
+    pairs = []
+    by_folder = {}
+    for f in b.jpegs: by_folder.setdefault(os.path.dirname(f), []).append(os.path.join(clone, f))
+    for folder, paths in by_folder.items(): pairs += engine.group_rename_pairs(paths, f"Scene {os.path.basename(folder)}", "", None, metadata)
+    steps = engine.plan_renames(pairs)
+    return len(engine.execute_renames(steps, journal=False))
+
+def bench_sequence(b, clone):
+    """ Sequence Sorter (process_seq_files): every third number of the first folder, JPG+CR2+ARW, copied. """
+    folder = os.path.join(clone, os.path.relpath(b.first_folder, b.shoot))
+    numbers = sorted({n[4:8] for n in os.listdir(folder) if n.startswith("IMG_")})[::3]
+    target = os.path.join(b.scratch, "sequence")
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+    counts = engine.run_sequence(folder, ", ".join(numbers), "IMG_", ["JPG", "CR2", "ARW"], target, log=lambda m: None)
+    return counts["Copied"]
+
+BENCHMARKS = {  # name -> (setup or None, run)
+    "scan": (None, bench_scan),
+    "scan_warm": (None, bench_scan_warm),
+    "thumbnails": (None, bench_thumbnails),
+    "thumbnails_no_exif": (None, bench_thumbnails_no_exif),
+    "decode_screen": (None, bench_decode_screen),
+    "decode_full": (None, bench_decode_full),
+    "decode_video": (None, bench_decode_video),
+    "video_frames": (None, bench_video_frames),
+    "zoom_redraw": (setup_zoom, bench_zoom_redraw),
+    "sort_copy": (setup_sort, bench_sort_copy),
+    "sort_move": (setup_sort, bench_sort_move),
+    "group_rename": (setup_sort, bench_group_rename),
+    "sequence": (setup_sort, bench_sequence),
+}
+
+def environment():
+    def git(*cmd):
+        try: return subprocess.run(["git", *cmd], cwd=os.path.dirname(HERE), capture_output=True, text=True).stdout.strip()
+        except OSError: return ""
+    import PIL
+    import photo_organizer as app
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "pillow": PIL.__version__, "opencv": app.HAS_CV2, "display": _tk_root() is not None}
+
+def ensure_shoot(folder, args):
+    """ Reuses folder if its shoot.json matches the requested parameters, else regenerates it. """
+    wanted = {"count": args.count, "size": list(args.size), "raw_mb": args.raw_mb, "seed": args.seed}
+    try:
+        with open(os.path.join(folder, "shoot.json"), encoding="utf-8") as f: info = json.load(f)
+        if all(info.get(k) == v for k, v in wanted.items()): return info
+    except (OSError, ValueError): pass
+    shutil.rmtree(folder, ignore_errors=True)
+    print(f"Generating {args.count} shots in {folder}...", file=sys.stderr)
+    return generate_shoot(folder, args.count, args.size, args.raw_mb, args.videos, seed=args.seed)
+
+def compare(old, new):
+    print(f"\n{'benchmark':20} {'before':>10} {'after':>10} {'change':>8}")
+    for name, r in new["results"].items():
+        o = old.get("results", {}).get(name)
+        if not o: continue
+        print(f"{name:20} {o['median_s'] * 1000:9.1f}ms {r['median_s'] * 1000:9.1f}ms {(r['median_s'] / o['median_s'] - 1) * 100:+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shoot", default=os.path.join(os.getcwd(), ".bench_shoot"), help="shoot folder (generated if missing)")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--size", type=parse_size, default=(6000, 4000))
+    parser.add_argument("--raw-mb", type=int, default=4)
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="print the change against an earlier --json file")
+    args = parser.parse_args()
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown: parser.error(f"unknown benchmark: {', '.join(unknown)}")
+
+    shoot = ensure_shoot(os.path.abspath(args.shoot), args)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench-", dir=os.path.dirname(os.path.abspath(args.shoot))) as scratch:
+        b = Bench(os.path.abspath(args.shoot), scratch)
+        for name in names:
+            setup, run = BENCHMARKS[name]
+            times, items = [], 0
+            for _ in range(args.repeat):
+                state = setup(b) if setup else None
+                started = time.perf_counter()
+                items = run(b, state)
+                times.append(time.perf_counter() - started)
+            median = statistics.median(times)
+            results[name] = {"median_s": median, "runs_s": times, "items": items,
+                             "per_item_ms": median * 1000 / items if items else None}
+            print(f"{name:20} {median * 1000:9.1f} ms  {items:6} items" + (f"  {median * 1000 / items:7.2f} ms/item" if items else ""))
+    report = {"env": environment(), "shoot": shoot, "repeat": args.repeat, "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: compare(json.load(f), report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
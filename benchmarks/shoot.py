@@ -0,0 +1,158 @@
+""" Synthetic shoot generator: a memory-card-like folder for benchmarks, reproducible from a seed.
+
+    python benchmarks/shoot.py OUT_DIR [--count 500] [--size 6000x4000] [--raw-mb 4] [--videos 10]
+
+    DCIM/100CANON, 101CANON, ... hold IMG_0001.JPG ... from two bodies shooting alternately: Canon shots
+    get a .CR2, Sony shots an .ARW stand-in (TIFF header with the same EXIF, padded to --raw-mb), and
+    about a third of the shots an .xmp sidecar. JPEGs carry EXIF date/model/orientation and an embedded
+    thumbnail like camera files do. Capture times rise by 0.5-5 s (with bursts) and match the mtimes.
+    Short MP4s are added when OpenCV is installed. Needs Pillow. """
+import argparse
+import importlib.util
+import json
+import os
+import random
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+
+BODIES = (("Canon", "Canon EOS R5", ".CR2"), ("SONY", "ILCE-7M4", ".ARW"))
+PER_FOLDER = 999
+START = datetime(2024, 6, 1, 10, 0, 0)
+VARIANTS = 6  # distinct encoded images; files differ by EXIF, not pixels
+
+def _ifd(entries, start, next_ifd=0):
+    """ One little-endian TIFF IFD placed at offset 'start'. entries: [(tag, type, value)], type 2 ASCII,
+        3 SHORT or 4 LONG. Long strings go into a data area right after the IFD. """
+    entries = sorted(entries)
+    data_start = start + 2 + 12 * len(entries) + 4
+    head, data = struct.pack("<H", len(entries)), b""
+    for tag, typ, value in entries:
+        if typ == 2:
+            raw = value.encode() + b"\0"
+            field = raw.ljust(4, b"\0") if len(raw) <= 4 else struct.pack("<I", data_start + len(data))
+            if len(raw) > 4: data += raw + b"\0" * (len(raw) % 2)
+            head += struct.pack("<HHI", tag, 2, len(raw)) + field
+        else:
+            head += struct.pack("<HHI", tag, typ, 1) + (struct.pack("<HH", value, 0) if typ == 3 else struct.pack("<I", value))
+    return head + struct.pack("<I", next_ifd) + data
+
+def make_tiff_exif(make, model, when, orientation=1, thumb=None):
+    """ TIFF structure with IFD0 (make, model, date, orientation), the Exif IFD (DateTimeOriginal) and,
+        if thumb (JPEG bytes) is given, IFD1 pointing at it. """
+    stamp = when.strftime("%Y:%m:%d %H:%M:%S")
+    ifd0 = lambda exif_at, ifd1_at: _ifd([(0x010F, 2, make), (0x0110, 2, model), (0x0112, 3, orientation),
+                                          (0x0132, 2, stamp), (0x8769, 4, exif_at)], 8, ifd1_at)
+    size0 = len(ifd0(0, 0))
+    exif_ifd = _ifd([(0x9003, 2, stamp)], 8 + size0)
+    ifd1_at = 8 + size0 + len(exif_ifd) if thumb else 0
+    out = b"II*\0" + struct.pack("<I", 8) + ifd0(8 + size0, ifd1_at) + exif_ifd
+    if thumb:
+        thumb_at = ifd1_at + len(_ifd([(0x0103, 3, 6), (0x0201, 4, 0), (0x0202, 4, 0)], ifd1_at))
+        out += _ifd([(0x0103, 3, 6), (0x0201, 4, thumb_at), (0x0202, 4, len(thumb))], ifd1_at) + thumb
+    return out
+
+def _variants(size, quality, rng):
+    """ VARIANTS (jpeg bytes without EXIF, embedded-thumbnail JPEG) pairs with smooth content and grain. """
+    from PIL import Image, ImageDraw, ImageFilter
+    out = []
+    for _ in range(VARIANTS):
+        small = Image.new("RGB", (size[0] // 16, size[1] // 16), tuple(rng.randrange(40, 200) for _ in range(3)))
+        draw = ImageDraw.Draw(small)
+        for _ in range(12):
+            x, y = rng.randrange(small.width), rng.randrange(small.height)
+            r = rng.randrange(small.height // 8, small.height // 2)
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+        img = small.filter(ImageFilter.GaussianBlur(6)).resize(size, Image.Resampling.BICUBIC)
+        grain = Image.effect_noise(size, 24).convert("RGB")
+        img = Image.blend(img, grain, 0.12)
+        thumb = img.copy()
+        thumb.thumbnail((160, 160))
+        out.append((_encode(img, quality), _encode(thumb, 80)))
+    return out
+
+def _encode(img, quality):
+    import io
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=quality)
+    return buf.getvalue()
+
+def _write_video(path, frames=48, size=(1280, 720)):
+    import cv2
+    import numpy as np
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 24, size)
+    for i in range(frames):
+        frame = np.full((size[1], size[0], 3), (i * 5) % 256, np.uint8)
+        cv2.circle(frame, (40 + i * 20 % size[0], size[1] // 2), 60, (0, 200, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+def generate_shoot(out_dir, count=500, size=(6000, 4000), raw_mb=4, videos=10, xmp_ratio=0.33, quality=90, seed=1):
+    """ Writes the shoot and out_dir/shoot.json (parameters + file counts); returns that dict. """
+    rng = random.Random(seed)
+    variants = _variants(size, quality, rng)
+    raw_block = rng.randbytes(1024 * 1024)
+    if importlib.util.find_spec("cv2") is None: videos = 0
+    video_every = max(1, count // videos) if videos else 0
+    when, files, total_bytes = START, {"jpg": 0, "raw": 0, "xmp": 0, "mp4": 0}, 0
+    for i in range(count):
+        when += timedelta(seconds=rng.choice((0.2, 0.2, 0.5)) if rng.random() < 0.3 else rng.uniform(0.5, 5))
+        folder = os.path.join(out_dir, "DCIM", f"{100 + i // PER_FOLDER}CANON")
+        os.makedirs(folder, exist_ok=True)
+        stem = os.path.join(folder, f"IMG_{i % PER_FOLDER + 1:04d}")
+        make, model, raw_ext = BODIES[i % 2]
+        orientation = 6 if rng.random() < 0.15 else 1
+        written = []
+        if video_every and i % video_every == video_every - 1:
+            _write_video(stem + ".MP4")
+            written.append(stem + ".MP4")
+            files["mp4"] += 1
+        else:
+            jpeg, thumb = variants[i % VARIANTS]
+            tiff = make_tiff_exif(make, model, when, orientation, thumb)
+            app1 = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\0\0" + tiff
+            with open(stem + ".JPG", "wb") as f: f.write(jpeg[:2] + app1 + jpeg[2:])
+            header = make_tiff_exif(make, model, when, orientation)
+            with open(stem + raw_ext, "wb") as f:
+                f.write(header)
+                for _ in range(raw_mb): f.write(raw_block)
+            written += [stem + ".JPG", stem + raw_ext]
+            files["jpg"] += 1
+            files["raw"] += 1
+            if rng.random() < xmp_ratio:
+                with open(stem + ".xmp", "w", encoding="utf-8") as f:
+                    f.write(f'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+                            f'<rdf:Description xmp:Rating="{rng.randrange(6)}" xmlns:xmp="http://ns.adobe.com/xap/1.0/"/></rdf:RDF></x:xmpmeta>\n')
+                written.append(stem + ".xmp")
+                files["xmp"] += 1
+        for path in written:
+            os.utime(path, (when.timestamp(), when.timestamp()))
+            total_bytes += os.path.getsize(path)
+    info = {"count": count, "size": list(size), "raw_mb": raw_mb, "videos": videos, "xmp_ratio": xmp_ratio,
+            "quality": quality, "seed": seed, "files": files, "bytes": total_bytes,
+            "folders": sorted(os.listdir(os.path.join(out_dir, "DCIM")))}
+    with open(os.path.join(out_dir, "shoot.json"), "w", encoding="utf-8") as f: json.dump(info, f, indent=2)
+    return info
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=500, help="shots (JPEG+RAW pairs, some of them videos)")
+    parser.add_argument("--size", type=parse_size, default=(6000, 4000), help="JPEG pixel size, WxH")
+    parser.add_argument("--raw-mb", type=int, default=4, help="size of each RAW stand-in")
+    parser.add_argument("--videos", type=int, default=10, help="MP4 clips (needs OpenCV)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if os.path.exists(os.path.join(args.out_dir, "DCIM")): parser.error(f"{args.out_dir} already contains a shoot")
+    started = time.perf_counter()
+    info = generate_shoot(args.out_dir, args.count, args.size, args.raw_mb, args.videos, seed=args.seed)
+    print(f"{info['files']} ({info['bytes'] / 1e9:.2f} GB) in {time.perf_counter() - started:.1f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+""" Startup benchmark: time from process start to the first interactive window, and peak RSS.
+
+    python benchmarks/startup.py                      # 5 fresh processes, prints the medians
+    python benchmarks/startup.py --json out.json      # also writes every run
+    python benchmarks/startup.py --save-baseline benchmarks/startup_baseline.json
+    python benchmarks/startup.py --baseline benchmarks/startup_baseline.json   # exit 1 on a regression
+    python benchmarks/startup.py --import-only        # no display needed: import time + RSS only
+
+    Every run is a new interpreter, so the numbers include imports. The window counts as interactive
+    once it is mapped and the event loop has gone idle (first input would be handled right away). """
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def peak_rss_mb():
+    try: import resource
+    except ImportError: return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KB on Linux
+
+def child(started, import_only):
+    """ Runs inside the measured process; prints one JSON line. """
+    sys.path.insert(0, REPO)
+    import photo_organizer
+    imported = time.time()
+    result = {"import_s": imported - started}
+    if not import_only:
+        root = photo_organizer.tk.Tk()
+        app = photo_organizer.PhotoOrganizerApp(root)
+        root.wait_visibility(root)
+        root.update_idletasks()
+        result["time_to_window_s"] = time.time() - started
+        result["lazy_tabs_pending"] = len(app.tab_builders)
+        root.destroy()
+    result["peak_rss_mb"] = peak_rss_mb()
+    result["cv2_imported"] = "cv2" in sys.modules
+    print(json.dumps(result))
+
+def run_once(import_only):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", repr(time.time())] + (["--import-only"] if import_only else [])
+    out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-only", action="store_true", help="skip the window (headless machines)")
+    parser.add_argument("--json", metavar="FILE", help="write all runs and the medians")
+    parser.add_argument("--baseline", metavar="FILE", help="fail if a median exceeds the baseline by more than --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", metavar="FILE")
+    parser.add_argument("--child", metavar="STARTED", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(float(args.child), args.import_only)
+        return 0
+
+    try: runs = [run_once(args.import_only) for _ in range(args.runs)]
+    except subprocess.CalledProcessError as e:
+        print(e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e, file=sys.stderr)
+        if "display" in (e.stderr or "").lower(): print("No display: use --import-only.", file=sys.stderr)
+        return 2
+    metrics = [k for k in ("import_s", "time_to_window_s", "peak_rss_mb") if runs[0].get(k) is not None]
+    medians = {k: statistics.median(r[k] for r in runs) for k in metrics}
+    for k, v in medians.items(): print(f"{k:18} {v * 1000:8.0f} ms" if k.endswith("_s") else f"{k:18} {v:8.1f} MB")
+    if any(r["cv2_imported"] for r in runs): print("warning: OpenCV was imported during startup", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump({"runs": runs, "median": medians}, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f: json.dump(medians, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: baseline = json.load(f)
+        regressions = [f"{k}: {medians[k]:.3f} vs {baseline[k]:.3f}" for k in metrics
+                       if k in baseline and medians[k] > baseline[k] * (1 + args.tolerance)]
+        for line in regressions: print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1405 @@
+""" Smart Shoot Organizer engine: scanning, sorting, renaming and sequence lookups without a UI.
+    Imports only the standard library, so scripts, servers and the command line can use it headless;
+    photo_organizer.py builds the Tk app on top of it.
+
+    python photo_engine.py sort|rename|sequence ...   (also: photo_organizer.py sort|rename|sequence ...) """
+import os
+import shutil
+import threading
+import sys
+import time
+import hashlib
+import errno
+import ctypes
+import json
+import sqlite3
+import struct
+import fnmatch
+import queue
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tiff"}
+VIDEO_EXTS = {".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv", ".webm", ".m4v"}
+TIFF_RAW_EXTS = {".tif", ".tiff", ".cr2", ".nef", ".arw", ".dng", ".orf", ".rw2", ".pef", ".srw"}
+ISOBMFF_EXTS = {".mp4", ".mov", ".m4v", ".3gp", ".cr3", ".heic"}
+SIDECAR_EXTS = {".xmp", ".thm", ".aae", ".pp3", ".dop", ".on1"}
+
+# ==========================================
+#       PERF INSTRUMENTATION
+# ==========================================
+PERF_WINDOW = 512  # samples kept per stage for the rolling percentiles
+
+class PerfStats:
+    """ Rolling timings per stage (the last PERF_WINDOW samples), hit/miss counters and gauges (callables
+        read at snapshot time, e.g. queue depths). Thread-safe; recording costs a perf_counter pair and a
+        deque append, so it stays on. Worker processes report their timings back with their results. """
+    def __init__(self, window=PERF_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.gauges = {}
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples, self.calls, self.counters = {}, {}, {}
+            self.started = time.time()
+
+    def add(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None: samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try: yield
+        finally: self.add(name, time.perf_counter() - started)
+
+    def count(self, name, hits=0, misses=0):
+        with self.lock:
+            h, m = self.counters.get(name, (0, 0))
+            self.counters[name] = (h + hits, m + misses)
+
+    def gauge(self, name, read):
+        """ read() -> number; replaces an earlier gauge of the same name. """
+        self.gauges[name] = read
+
+    def snapshot(self):
+        with self.lock:
+            samples = {name: sorted(s) for name, s in self.samples.items()}
+            calls, counters, started = dict(self.calls), dict(self.counters), self.started
+        timings = {}
+        for name, s in sorted(samples.items()):
+            pct = lambda p: s[min(len(s) - 1, int(p * len(s)))] * 1000
+            timings[name] = {"n": calls[name], "p50_ms": pct(0.5), "p90_ms": pct(0.9), "p99_ms": pct(0.99),
+                             "max_ms": s[-1] * 1000, "mean_ms": sum(s) / len(s) * 1000}
+        gauges = {}
+        for name, read in sorted(self.gauges.items()):
+            try: gauges[name] = read()
+            except Exception: pass  # e.g. the object behind it is gone
+        return {"uptime_s": time.time() - started, "timings": timings, "gauges": gauges,
+                "hit_rates": {name: {"hits": h, "misses": m, "rate": h / (h + m) if h + m else None}
+                              for name, (h, m) in sorted(counters.items())}}
+
+    def export(self, path):
+        """ JSON snapshot, or CSV rows (kind, name, n/hits, p50/misses, ...) for a .csv path. """
+        snap = self.snapshot()
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            if not path.lower().endswith(".csv"):
+                json.dump(snap, f, indent=2)
+                return
+            import csv
+            w = csv.writer(f)
+            w.writerow(["kind", "name", "n", "p50_ms", "p90_ms", "p99_ms", "max_ms", "mean_ms"])
+            for name, t in snap["timings"].items():
+                w.writerow(["timing", name, t["n"]] + [round(t[k], 3) for k in ("p50_ms", "p90_ms", "p99_ms", "max_ms", "mean_ms")])
+            for name, r in snap["hit_rates"].items(): w.writerow(["hit_rate", name, r["hits"] + r["misses"], r["rate"]])
+            for name, value in snap["gauges"].items(): w.writerow(["gauge", name, value])
+
+PERF = PerfStats()
+
+# ==========================================
+#       RELATED FILES (RAW / XMP / SIDECARS)
+# ==========================================
+def related_stem(name):
+    """ Shot stem of a file name: 'IMG_1.CR2' and 'IMG_1.JPG.xmp' -> 'IMG_1'. Extensions are case-insensitive. """
+    base, ext = os.path.splitext(name)
+    if ext.lower() in SIDECAR_EXTS:
+        inner, inner_ext = os.path.splitext(base)
+        if inner_ext and len(inner_ext) <= 5: base = inner  # Double-extension sidecar (IMG_1.JPG.xmp)
+    return base
+
+def build_related_index(folder):
+    """ One directory listing -> {stem: [file names]} so related-file lookups are O(1) per file. """
+    index = {}
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.is_file(): index.setdefault(related_stem(entry.name), []).append(entry.name)
+    return index
+
+# ==========================================
+#       FOLDER SCANNER
+# ==========================================
+def parse_patterns(text):
+    """ 'IMG_*, *.CR3; .*' -> lower-case fnmatch globs. """
+    return [p.strip().lower() for p in text.replace(";", ",").split(",") if p.strip()]
+
+def list_media_dir(root, rel_dir, exts, recursive=True, include=(), exclude=()):
+    """ One os.scandir of root/rel_dir -> (subfolders, name-ordered DirEntries of matching media), both relative.
+        Names and types only (no stat). exclude globs skip folders and files by name, include globs (if any)
+        must match the file name; both are case-insensitive. Raises OSError if the folder can't be read. """
+    dirs, files = [], []
+    with os.scandir(os.path.join(root, rel_dir)) as it:
+        for entry in it:
+            lname = entry.name.lower()
+            if any(fnmatch.fnmatchcase(lname, p) for p in exclude): continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive: dirs.append(os.path.join(rel_dir, entry.name) if rel_dir else entry.name)
+                    continue
+            except OSError: continue
+            if os.path.splitext(lname)[1] not in exts: continue
+            if include and not any(fnmatch.fnmatchcase(lname, p) for p in include): continue
+            files.append((lname, entry))
+    files.sort(key=lambda f: f[0])
+    return sorted(dirs, key=str.lower), [entry for _lname, entry in files]
+
+def scan_media(root, exts, recursive=True, include=(), exclude=(), cancel=None, first_chunk=32, chunk_size=2048):
+    """ Walks root breadth-first, yielding chunks of (relative path, size, mtime_ns) from the DirEntry data,
+        name-ordered within each folder. The first chunk is small so a UI can show something at once;
+        top-level files come before subfolders (DCIM/100CANON, 101CANON...). """
+    pending = deque([""])
+    chunk, limit = [], first_chunk
+    while pending:
+        rel_dir = pending.popleft()
+        try: dirs, entries = list_media_dir(root, rel_dir, exts, recursive, include, exclude)
+        except OSError:
+            if not rel_dir: raise
+            continue
+        for entry in entries:
+            if cancel is not None and cancel.is_set(): return
+            try: st = entry.stat()
+            except OSError: continue
+            chunk.append((os.path.join(rel_dir, entry.name) if rel_dir else entry.name, st.st_size, st.st_mtime_ns))
+            if len(chunk) >= limit:
+                yield chunk
+                chunk, limit = [], chunk_size
+        pending.extend(dirs)
+    if chunk: yield chunk
+
+class FolderScan:
+    """ Runs scan_media() on a worker thread. The Tk thread polls `events`: ("chunk", [paths]) while walking,
+        then ("done", paths ordered by capture time) once the metadata index has dated every file (files
+        without a capture date fall back to mtime), or ("error", message). """
+    def __init__(self, root, exts, recursive=True, include=(), exclude=(), metadata=None):
+        self.root = root
+        self.args = (exts, recursive, include, exclude)
+        self.metadata = metadata
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        entries = []
+        try:
+            for chunk in scan_media(self.root, *self.args, cancel=self.cancel_event):
+                entries.extend(chunk)
+                self.events.put(("chunk", [rel for rel, _size, _mtime in chunk]))
+        except OSError as e:
+            self.events.put(("error", str(e)))
+            return
+        if self.cancel_event.is_set(): return
+        self.events.put(("done", order_by_capture(self.root, entries, self.metadata)))
+
+def order_by_capture(root, entries, metadata=None):
+    """ scan_media() entries -> relative paths ordered by capture time (mtime when a file has none, or
+        without a metadata index), then name. """
+    dates = {}
+    if metadata is not None:
+        records = metadata.lookup_many([os.path.join(root, rel) for rel, _size, _mtime in entries])
+        dates = {path: rec["date_taken"] for path, rec in records.items() if rec["date_taken"] is not None}
+    entries = sorted(entries, key=lambda e: (dates.get(os.path.join(root, e[0]), e[2] / 1e9), e[0].lower()))
+    return [rel for rel, _size, _mtime in entries]
+
+def scan_folder(root: str, exts=None, recursive: bool = True, include=(), exclude=(), metadata=None) -> list[str]:
+    """ Blocking scan: every media file under root (relative paths), in capture order. """
+    entries = [e for chunk in scan_media(root, exts or IMAGE_EXTS | VIDEO_EXTS, recursive, include, exclude) for e in chunk]
+    return order_by_capture(root, entries, metadata)
+
+class FolderWatcher:
+    """ Lightweight polling for outside changes (another app, a card reader): each round only the folders
+        are stat'ed; a folder whose mtime moved is re-listed and diffed by inode, so renames and moves between
+        folders come through as renames. Posts (renamed {old: new}, removed, added) with paths relative to
+        root to `events`. """
+    def __init__(self, root, exts, recursive=True, include=(), exclude=(), interval=2.0):
+        self.root = root
+        self.args = (exts, recursive, include, exclude)
+        self.interval = interval
+        self.events = queue.Queue()
+        self.stop_event = threading.Event()
+        self.snapshot = {}  # rel_dir -> (mtime_ns, {rel path: (inode, size, mtime_ns)})
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    @staticmethod
+    def _identity(entry):
+        """ A rename keeps inode, size and mtime; a new file that reuses a freed inode almost never keeps all three. """
+        st = entry.stat()
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _list(self, rel_dir):
+        """ Snapshots one folder; returns its subfolders (None if it is gone). """
+        try:
+            mtime = os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns
+            dirs, entries = list_media_dir(self.root, rel_dir, *self.args)
+        except OSError:
+            self.snapshot.pop(rel_dir, None)
+            return None
+        files = {}
+        for e in entries:
+            try: files[os.path.join(rel_dir, e.name) if rel_dir else e.name] = self._identity(e)
+            except OSError: continue  # Vanished mid-listing: only this file counts as gone
+        self.snapshot[rel_dir] = (mtime, files)
+        return dirs
+
+    def _run(self):
+        pending = [""]
+        while pending and not self.stop_event.is_set(): pending.extend(self._list(pending.pop()) or [])
+        while not self.stop_event.wait(self.interval):
+            before, after = {}, {}
+            pending = []
+            for rel_dir, (mtime, files) in list(self.snapshot.items()):
+                try:
+                    if os.stat(os.path.join(self.root, rel_dir)).st_mtime_ns == mtime: continue
+                except OSError: pass
+                before.update(files)
+                pending.append(rel_dir)
+            known = set(self.snapshot)
+            while pending:
+                rel_dir = pending.pop()
+                dirs = self._list(rel_dir)
+                after.update(self.snapshot.get(rel_dir, (0, {}))[1])
+                pending.extend(d for d in dirs or [] if d not in known)  # New folders: everything in them is new
+            removed = {f: ident for f, ident in before.items() if f not in after}
+            added = {f: ident for f, ident in after.items() if f not in before}
+            if not removed and not added: continue
+            by_identity = {ident: f for f, ident in removed.items()}
+            renamed = {by_identity[ident]: f for f, ident in added.items() if ident in by_identity}
+            self.events.put((renamed, [f for f in removed if f not in renamed],
+                             sorted((f for f in added if f not in renamed.values()), key=str.lower)))
+
+# ==========================================
+#       FILE TRANSFER (FAST PATHS)
+# ==========================================
+FICLONE = 0x40049409  # Linux reflink ioctl (Btrfs, XFS, bcachefs)
+_copy_range_broken = False
+
+def same_volume(src, dst):
+    """ True if src and the folder dst will live in are on the same device. """
+    try: return os.stat(src).st_dev == os.stat(os.path.dirname(os.path.abspath(dst))).st_dev
+    except OSError: return False
+
+def _clonefile_darwin(src, dst):
+    # APFS copy-on-write clone; fails with EEXIST, so the target is cleared first
+    libc = ctypes.CDLL(None, use_errno=True)
+    if os.path.lexists(dst): os.remove(dst)
+    return libc.clonefile(os.fsencode(src), os.fsencode(dst), ctypes.c_int(0)) == 0
+
+def _copy_data_linux(fsrc, fdst):
+    """ Reflink, then in-kernel copy_file_range, then sendfile. Returns the method used or None. """
+    global _copy_range_broken
+    try:
+        import fcntl
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return "reflink"
+    except (OSError, ImportError): pass
+    size = os.fstat(fsrc.fileno()).st_size
+    if hasattr(os, "copy_file_range") and not _copy_range_broken:
+        try:
+            copied = 0
+            while copied < size:
+                n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                if n == 0: break
+                copied += n
+            if copied == size: return "copy_file_range"
+            fdst.seek(0); fdst.truncate(); fsrc.seek(0)  # Stopped short: fall back to a plain copy
+        except OSError as e:
+            if e.errno not in (errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP): raise
+            if e.errno == errno.ENOSYS: _copy_range_broken = True
+            fdst.seek(0); fdst.truncate(); fsrc.seek(0)
+    return None
+
+def copy_file(src, dst, mode="auto"):
+    """ Copies data + metadata (like shutil.copy2) using the cheapest available path.
+        mode 'hardlink' links instead of copying when both ends share a volume.
+        Returns the method used: 'hardlink', 'clone', 'reflink', 'copy_file_range' or 'copy'. """
+    if os.path.exists(dst) and os.path.samefile(src, dst): raise shutil.SameFileError(f"{src} and {dst} are the same file")
+    if mode == "hardlink" and same_volume(src, dst):
+        try:
+            if os.path.lexists(dst): os.remove(dst)
+            os.link(src, dst)
+            return "hardlink"
+        except OSError: pass
+    if sys.platform == "darwin" and same_volume(src, dst):
+        try:
+            if _clonefile_darwin(src, dst):
+                shutil.copystat(src, dst)
+                return "clone"
+        except (OSError, AttributeError): pass
+    if sys.platform.startswith("linux"):
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            method = _copy_data_linux(fsrc, fdst)
+            if method is None:
+                shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+                method = "copy"
+        shutil.copystat(src, dst)
+        return method
+    shutil.copy2(src, dst)  # sendfile / fcopyfile / CopyFileEx inside the stdlib
+    return "copy"
+
+def move_file(src, dst, copy_mode="auto"):
+    """ Atomic os.rename on the same volume; copy (fast paths) + delete across volumes. """
+    try:
+        os.rename(src, dst)
+        return "rename"
+    except OSError as e:
+        if e.errno != errno.EXDEV and same_volume(src, dst): raise
+    method = copy_file(src, dst, copy_mode)
+    os.remove(src)
+    return method
+
+# ==========================================
+#       VERIFIED COPY ENGINE
+# ==========================================
+COPY_CHUNK = 8 * 1024 * 1024
+MANIFEST_NAME = "MANIFEST.b2sum"  # `b2sum -c MANIFEST.b2sum` inside the folder re-checks it
+
+def _drop_cache(f):
+    # So a read-back hits the disk rather than the page cache we just filled
+    try:
+        os.fsync(f.fileno())
+        if hasattr(os, "posix_fadvise"): os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError: pass
+
+def hash_file(path, chunk=COPY_CHUNK):
+    h = hashlib.blake2b()
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            buf = f.read(chunk)
+            if not buf: return h.hexdigest()
+            h.update(buf)
+
+def fanout_copy(src, dsts, readback=False, digest=True, chunk=COPY_CHUNK):
+    """ Reads src once and writes it to every path in dsts concurrently: the calling thread reads (and hashes)
+        large chunks into one bounded queue per destination, one writer thread per destination drains it.
+        A destination that fails keeps draining without writing, so the others still finish. Each file lands
+        in '<dst>.part' and is renamed into place when complete; readback=True re-reads and compares digests.
+        Returns {dst: hex digest ('' if not hashing) or the Exception that destination hit}. """
+    results = {}
+    for dst in dsts:
+        if os.path.exists(dst) and os.path.samefile(src, dst): results[dst] = shutil.SameFileError(f"{src} and {dst} are the same file")
+    queues = {dst: queue.Queue(maxsize=4) for dst in dsts if dst not in results}
+    h = hashlib.blake2b() if digest or readback else None
+    read_errors = []
+    read_total = [0]  # Final once a writer sees the None sentinel
+
+    def writer(dst):
+        tmp, buf = dst + ".part", b""
+        try:
+            with open(tmp, "wb", buffering=0) as out:
+                while True:
+                    buf = queues[dst].get()
+                    if buf is None: break
+                    view = memoryview(buf)
+                    while view:  # Raw writes may be short (NFS, SMB)
+                        n = out.write(view)
+                        if not n: raise IOError(f"Write to {tmp} made no progress")
+                        view = view[n:]
+                if read_errors: raise read_errors[0]
+                if readback: _drop_cache(out)
+            if os.path.getsize(tmp) != read_total[0]:
+                raise IOError(f"Size mismatch for {dst}: {os.path.getsize(tmp)} of {read_total[0]} bytes written")
+            shutil.copystat(src, tmp)
+            os.replace(tmp, dst)
+            results[dst] = None
+        except Exception as e:
+            results[dst] = e
+            while buf is not None: buf = queues[dst].get()  # Keep the reader (and the other destinations) moving
+            try: os.remove(tmp)
+            except OSError: pass
+
+    writers = [threading.Thread(target=writer, args=(dst,), daemon=True) for dst in queues]
+    for w in writers: w.start()
+    try:
+        with open(src, "rb", buffering=0) as f:
+            while True:
+                buf = f.read(chunk)
+                if not buf: break
+                read_total[0] += len(buf)
+                if h: h.update(buf)  # hashlib and file I/O release the GIL on large buffers
+                for q in queues.values(): q.put(buf)
+    except Exception as e: read_errors.append(e)
+    finally:
+        for q in queues.values(): q.put(None)
+    for w in writers: w.join()
+    hexdigest = h.hexdigest() if h else ""
+    for dst in queues:
+        if results[dst] is not None: continue
+        if readback and hash_file(dst, chunk) != hexdigest:
+            os.remove(dst)
+            results[dst] = IOError(f"Read-back verification failed for {dst}")
+        else: results[dst] = hexdigest if digest else ""
+    return results
+
+def verified_copy(src, dst, readback=False, chunk=COPY_CHUNK):
+    """ Single-destination fanout_copy: reading+hashing and writing overlap on two threads.
+        Raises on failure, returns the BLAKE2b hex digest. """
+    result = fanout_copy(src, [dst], readback, True, chunk)[dst]
+    if isinstance(result, Exception): raise result
+    return result
+
+class CopyManifest:
+    """ Collects per-file digests and writes one b2sum-format MANIFEST per destination folder.
+        Existing manifests are merged, so re-running a sort updates entries instead of duplicating them. """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}  # folder -> {name: digest}
+
+    def add(self, path, digest):
+        with self.lock: self.entries.setdefault(os.path.dirname(path), {})[os.path.basename(path)] = digest
+
+    def write(self):
+        with self.lock: entries, self.entries = self.entries, {}
+        for folder, files in entries.items():
+            path = os.path.join(folder, MANIFEST_NAME)
+            merged = {}
+            try:
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        digest, _, name = line.rstrip("\n").partition("  ")
+                        if name: merged[name] = digest
+            except OSError: pass
+            merged.update(files)
+            with open(path, "w", encoding="utf-8") as f:
+                for name in sorted(merged): f.write(f"{merged[name]}  {name}\n")
+
+# ==========================================
+#       BACKGROUND SORT JOBS
+# ==========================================
+@dataclass
+class FileOp:
+    action: str             # 'move' | 'copy' | 'delete'
+    src: str
+    dst: str = ""
+    label: str = ""
+    size: int = 0
+    status: str = "pending"  # 'ok' | 'failed' | 'skipped' | 'cancelled'
+    error: str = ""
+    method: str = ""         # how the bytes moved: 'rename', 'reflink', 'hardlink', 'copy', 'verified', ...
+    digest: str = ""         # BLAKE2b of the copied bytes when verification is on
+    backups: list = field(default_factory=list)  # extra 'copy' FileOps of the same src, written from the same read
+
+    def targets(self):
+        return [self] + self.backups
+
+@dataclass
+class SortItem:
+    """ One labeled file plus its related files; related ops only run if the primary succeeded. """
+    primary: FileOp
+    related: list = field(default_factory=list)
+
+    def ops(self):
+        return [self.primary] + self.related
+
+def add_backup_ops(op, out_root, backup_roots):
+    """ Mirrors op's destination (relative to out_root) under each backup root. """
+    rel = os.path.relpath(op.dst, out_root)
+    op.backups = [FileOp("copy", op.src, os.path.join(root, rel), op.label) for root in backup_roots]
+    return op
+
+def plan_visual_sort(source_dir: str, out_root: str, file_labels: dict, renames: dict, action: str,
+                     include_related: bool, backup_roots=()) -> list[SortItem]:
+    """ Turns Visual Sorter labels into SortItems (Red -> delete, others -> move/copy into <out_root>/<label>,
+        plus a copy under every backup root). File names may be paths relative to source_dir (subfolders);
+        related files are looked up in the file's own folder, and clashing names get a '_2', '_3' suffix. """
+    indexes = {}
+    def related_files(filename):
+        rel_dir = os.path.dirname(filename)
+        if rel_dir not in indexes:
+            try: index = build_related_index(os.path.join(source_dir, rel_dir))
+            except OSError: index = {}
+            indexes[rel_dir] = {os.path.join(rel_dir, stem): [os.path.join(rel_dir, n) for n in names] for stem, names in index.items()}
+        return indexes[rel_dir].get(related_stem(filename), [])
+
+    labeled = {f for f, lbl in file_labels.items() if lbl != "Unmarked"}
+    taken = set()
+    items = []
+    for filename, label in file_labels.items():
+        if label == "Unmarked": continue
+        stem = related_stem(filename)
+        # Files that carry their own label follow that label instead
+        related = [f for f in related_files(filename) if f != filename and f not in labeled] if include_related else []
+        src = os.path.join(source_dir, filename)
+        if label == "Red":
+            items.append(SortItem(FileOp("delete", src, label=label),
+                                  [FileOp("delete", os.path.join(source_dir, r), label=label) for r in related]))
+            continue
+        dest_folder = os.path.join(out_root, label)
+        base_targ, ext_targ = os.path.splitext(os.path.basename(renames.get(filename, filename)))
+        target_name, n = base_targ + ext_targ, 1
+        while os.path.join(dest_folder, target_name).lower() in taken:  # e.g. 100CANON/IMG_0001 and 101CANON/IMG_0001
+            n += 1
+            target_name = f"{base_targ}_{n}{ext_targ}"
+        taken.add(os.path.join(dest_folder, target_name).lower())
+        base_targ = os.path.splitext(target_name)[0]
+        # Related files keep everything after the stem ('.CR2', '.JPG.xmp') with the target's stem
+        items.append(SortItem(FileOp(action, src, os.path.join(dest_folder, target_name), label),
+                              [FileOp(action, os.path.join(source_dir, r), os.path.join(dest_folder, base_targ + r[len(stem):]), label)
+                               for r in related]))
+    if backup_roots:
+        for item in items:
+            for op in item.ops():
+                if op.action != "delete": add_backup_ops(op, out_root, backup_roots)
+    return items
+
+def execute_fanout_op(op, verify="off", manifest=None, copy_mode="auto"):
+    """ One read of op.src, written to every backup and to op.dst. A same-volume move stays a rename instead:
+        only the backups are read, and the source is renamed once every backup succeeded (if one failed,
+        op.dst gets a copy and the source is kept). Backup failures are recorded on the backup ops; a
+        cross-volume move only removes the source once every destination succeeded. Raises if op.dst failed. """
+    rename = op.action == "move" and same_volume(op.src, op.dst)
+    targets = op.backups if rename else op.targets()
+    results = fanout_copy(op.src, [t.dst for t in targets], readback=verify == "readback", digest=verify != "off")
+    for t in targets:
+        result = results[t.dst]
+        if isinstance(result, Exception):
+            t.status, t.error = "failed", str(result)
+            continue
+        t.status, t.digest, t.method = "ok", result, "fanout"
+        if manifest is not None and result: manifest.add(t.dst, result)
+    backups_ok = all(b.status == "ok" for b in op.backups)
+    if rename:
+        op.method = move_file(op.src, op.dst, copy_mode) if backups_ok else copy_file(op.src, op.dst, copy_mode)
+    elif isinstance(results[op.dst], Exception): raise results[op.dst]
+    elif op.action == "move" and backups_ok: os.remove(op.src)
+    if op.action == "move" and not backups_ok: op.error = "source kept: a backup copy failed"
+
+def execute_file_op(op: FileOp, copy_mode: str = "auto", verify: str = "off", manifest=None):
+    """ verify: 'off', 'hash' (digest + manifest) or 'readback' (also re-read the written file).
+        Verification applies to copies and to moves that leave the volume; same-volume moves are renames. """
+    if op.backups: execute_fanout_op(op, verify, manifest, copy_mode)
+    elif op.action == "delete":
+        os.remove(op.src)
+        op.method = "delete"
+    elif verify != "off" and (op.action == "copy" or not same_volume(op.src, op.dst)):
+        op.digest = verified_copy(op.src, op.dst, readback=verify == "readback")
+        if op.action == "move": os.remove(op.src)
+        op.method = "verified"
+        if manifest is not None: manifest.add(op.dst, op.digest)
+    elif op.action == "move": op.method = move_file(op.src, op.dst, copy_mode)
+    else: op.method = copy_file(op.src, op.dst, copy_mode)
+
+class SortJob:
+    """ Plans and executes a sort on a background thread with a bounded I/O pool (1 for HDDs, more for
+        SSDs). The Tk thread polls snapshot() for progress and reads results() for the per-file report. """
+    def __init__(self, plan, workers=2, copy_mode="auto", verify="off", roots=()):
+        self.plan = plan
+        self.roots = list(roots)  # destination roots, for per-destination progress
+        self.dest_totals, self.dest_done, self.dest_failed = {}, {}, {}
+        self.workers = max(1, int(workers))
+        self.copy_mode = copy_mode
+        self.verify = verify
+        self.manifest = CopyManifest()
+        self.items = []
+        self.lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.total_files = self.total_bytes = 0
+        self.done_files = self.done_bytes = 0
+        self.started = 0.0
+        self.finished = False
+        self.error = ""
+
+    def start(self):
+        self.started = time.perf_counter()
+        PERF.gauge("sort.pending", lambda: 0 if self.finished else self.total_files - self.done_files)
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            self.items = self.plan()
+            ops = self.results()
+            for op in ops:
+                try: op.size = os.path.getsize(op.src)
+                except OSError: op.size = 0
+            with self.lock:
+                primaries = [op for item in self.items for op in item.ops()]
+                self.total_files = len(primaries)
+                # Bytes read once, however many destinations; deletes move no data
+                self.total_bytes = sum(op.size for op in primaries if op.action != "delete")
+                for op in ops:
+                    if op.dst: self.dest_totals[self._root_of(op.dst)] = self.dest_totals.get(self._root_of(op.dst), 0) + op.size
+            for folder in {os.path.dirname(op.dst) for op in ops if op.dst}:
+                try: os.makedirs(folder, exist_ok=True)
+                except OSError: pass  # Ops into an unreachable destination fail (and are reported) one by one
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sort") as pool:
+                list(pool.map(self._run_item, self.items))
+            self.manifest.write()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished = True
+
+    def _run_item(self, item):
+        for op in item.ops():
+            if self.cancel_event.is_set():
+                op.status = "cancelled"
+            elif op is not item.primary and item.primary.status != "ok":
+                op.status, op.error = "skipped", "primary file failed"
+            else:
+                try:
+                    with PERF.timer("sort.file"): execute_file_op(op, self.copy_mode, self.verify, self.manifest)
+                    op.status = "ok"
+                except Exception as e:
+                    op.status, op.error = "failed", str(e)
+            for b in op.backups:
+                if b.status == "pending": b.status, b.error = op.status, op.error
+            with self.lock:
+                self.done_files += 1
+                if op.action != "delete": self.done_bytes += op.size
+                for t in op.targets():
+                    if not t.dst: continue
+                    root = self._root_of(t.dst)
+                    if t.status == "ok": self.dest_done[root] = self.dest_done.get(root, 0) + t.size
+                    elif t.status == "failed": self.dest_failed[root] = self.dest_failed.get(root, 0) + 1
+
+    def _root_of(self, path):
+        return next((r for r in self.roots if path.startswith(os.path.join(r, ""))), "")
+
+    def results(self):
+        return [t for item in self.items for op in item.ops() for t in op.targets()]
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = max(1e-6, time.perf_counter() - self.started)
+            rate = self.done_bytes / elapsed
+            remaining = self.total_bytes - self.done_bytes
+            return {"files": self.done_files, "total_files": self.total_files, "bytes": self.done_bytes,
+                    "total_bytes": self.total_bytes, "rate": rate, "eta": remaining / rate if rate > 0 else None,
+                    "finished": self.finished, "cancelled": self.cancel_event.is_set(),
+                    "destinations": [(r, self.dest_done.get(r, 0), self.dest_totals.get(r, 0), self.dest_failed.get(r, 0))
+                                     for r in self.roots if r in self.dest_totals]}
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024: return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+# ==========================================
+#       SEQUENCE SORTER LOOKUPS
+# ==========================================
+def expand_sequence(raw: str) -> list[str]:
+    """ '1210, 1, 5, 67' -> ['1210', '1211', '1215', '1267']: short entries replace the tail of the previous number. """
+    numbers, last_full = [], ""
+    for num_str in (x.strip() for x in raw.replace("\n", ",").split(",")):
+        if not num_str: continue
+        current_full = last_full[:len(last_full) - len(num_str)] + num_str if len(num_str) < len(last_full) else num_str
+        numbers.append(current_full)
+        last_full = current_full
+    return numbers
+
+def build_sequence_index(folder: str, prefix: str) -> dict:
+    """ One scandir pass: {number: {lower-case ext: [filenames]}} for files named <prefix><number>.<ext>.
+        The prefix and extension match case-insensitively ('img_12.jpg' answers IMG_ + 12 + JPG). """
+    index, plen, lprefix = {}, len(prefix), prefix.lower()
+    with os.scandir(folder) as it:
+        for entry in it:
+            if not entry.is_file(): continue
+            stem, ext = os.path.splitext(entry.name)
+            if stem[:plen].lower() != lprefix: continue
+            index.setdefault(stem[plen:], {}).setdefault(ext[1:].lower(), []).append(entry.name)
+    return index
+
+def resolve_sequence(index: dict, numbers: list[str], exts: list[str]) -> tuple[list[str], list[str], dict]:
+    """ Resolves every number against a build_sequence_index() result in one pass.
+        Returns (filenames in sequence order, numbers with no wanted file, {number: [other extensions present]}).
+        An empty extension list accepts every extension. """
+    wanted = [e.strip().lstrip(".").lower() for e in exts if e.strip().lstrip(".")]
+    matched, unmatched, unexpected, seen = [], [], {}, set()
+    for num in numbers:
+        files = index.get(num, {})
+        names = [name for ext in (wanted or sorted(files)) for name in files.get(ext, []) if name not in seen]
+        if not any(ext in files for ext in (wanted or files)): unmatched.append(num)
+        seen.update(names)
+        matched.extend(names)
+        extra = sorted(set(files) - set(wanted)) if wanted else []
+        if extra and num not in unexpected: unexpected[num] = extra
+    return matched, unmatched, unexpected
+
+def run_sequence(source_dir: str, raw_seq: str, prefix: str, exts: list[str], target_dir: str, backup_dirs=(),
+                 action: str = "copy", copy_mode: str = "auto", verify: str = "off", log=print, progress=None) -> dict:
+    """ Copies/moves every file of a shorthand sequence from source_dir to target_dir (and each backup folder).
+        log(message) gets one line per file, missing number and extra extension; progress(done, total) is
+        called after every file. Returns the summary counts. """
+    counts = {"Copied" if action == "copy" else "Moved": 0, "Missing numbers": 0, "Extra extensions": 0, "Errors": 0}
+    done_key = "Copied" if action == "copy" else "Moved"
+    manifest = CopyManifest()
+    log("Starting processing...")
+    try: index = build_sequence_index(source_dir, prefix)
+    except OSError as e:
+        log(f"[ERR] Could not read {source_dir}: {e}")
+        counts["Errors"] += 1
+        return counts
+    files, unmatched, unexpected = resolve_sequence(index, expand_sequence(raw_seq), exts)
+    for i, filename in enumerate(files):
+        src_path = os.path.join(source_dir, filename)
+        dst_path = os.path.join(target_dir, filename)
+        try:
+            op = FileOp(action, src_path, dst_path, backups=[FileOp("copy", src_path, os.path.join(d, filename)) for d in backup_dirs])
+            with PERF.timer("sequence.file"): execute_file_op(op, copy_mode, verify, manifest)
+            log(f"[{done_key.upper()}] {filename}" + (" (verified)" if op.digest else ""))
+            for b in op.backups:
+                if b.status != "ok": log(f"[ERR] Backup {b.dst}: {b.error}"); counts["Errors"] += 1
+            if op.error: log(f"[WARN] {filename}: {op.error}")
+            counts[done_key] += 1
+        except Exception as e:
+            log(f"[ERR] {filename}: {str(e)}")
+            counts["Errors"] += 1
+        if progress: progress(i + 1, len(files))
+    for num in unmatched: log(f"[MISSING] {prefix}{num} (no {'/'.join(e.strip() for e in exts if e.strip()) or 'file'})")
+    for num, extra in unexpected.items(): log(f"[EXTRA] {prefix}{num} also has: {', '.join('.' + e for e in extra)}")
+    counts["Missing numbers"], counts["Extra extensions"] = len(unmatched), len(unexpected)
+    try: manifest.write()
+    except OSError as e:
+        log(f"[ERR] Could not write {MANIFEST_NAME}: {e}")
+        counts["Errors"] += 1
+    log("-" * 30)
+    log("Done! " + ", ".join(f"{k}: {v}" for k, v in counts.items()))
+    return counts
+
+# ==========================================
+#       BATCH RENAME PLANNER
+# ==========================================
+RENAME_BLOCKING = ("exists", "duplicate")
+RENAME_JOURNAL_KEEP = 20  # batches kept for Undo
+
+def safe_name_part(text):
+    return "".join(c for c in text if c.isalnum() or c in (' ', '_', '-')).strip()
+
+@dataclass
+class RenameStep:
+    src: str
+    dst: str
+    status: str = "ok"  # 'ok' | 'unchanged' | 'chain' | 'cycle' | 'exists' | 'duplicate'
+    tmp: str = ""
+
+def _name_key(path):
+    # Case-folded: on APFS/NTFS 'a.jpg' and 'A.jpg' are the same file
+    return os.path.normcase(os.path.abspath(path)).lower()
+
+def plan_renames(pairs: list[tuple[str, str]]) -> list[RenameStep]:
+    """ Checks a full [(src, dst)] mapping before anything touches the disk, in linear time.
+        'exists' / 'duplicate' block the batch; 'chain' (target is another source) and 'cycle' (A->B, B->A)
+        are safe because execute_renames() goes through temporary names. """
+    steps = [RenameStep(src, dst) for src, dst in pairs]
+    by_src = {_name_key(st.src): st for st in steps}
+    targets = set()
+    for st in steps:
+        if st.src == st.dst:
+            st.status = "unchanged"
+            targets.add(_name_key(st.dst))  # Stays put, so nothing else may land there
+    for st in steps:
+        if st.status == "unchanged": continue
+        k = _name_key(st.dst)
+        if k in targets: st.status = "duplicate"
+        elif k in by_src and by_src[k] is not st: st.status = "chain"
+        elif k not in by_src and os.path.lexists(st.dst): st.status = "exists"
+        targets.add(k)
+    # Cycles in the src -> dst graph: every node has at most one successor, so one colored walk per node
+    state = {}
+    for st in steps:
+        path = []
+        cur = st
+        while cur is not None and id(cur) not in state:
+            state[id(cur)] = "walking"
+            path.append(cur)
+            nxt = by_src.get(_name_key(cur.dst))
+            cur = nxt if nxt is not cur else None
+        if cur is not None and state[id(cur)] == "walking":
+            for node in path[path.index(cur):]:
+                if node.status == "chain": node.status = "cycle"
+        for node in path: state[id(node)] = "done"
+    return steps
+
+def group_rename_pairs(paths: list[str], scene: str, camera: str = "", dest_dir: str | None = None,
+                       metadata=None) -> list[tuple[str, str]]:
+    """ '<Scene>_001[_<Camera>].ext' names for one group, numbered in capture order. camera '' uses each file's
+        EXIF model (if any). dest_dir None renames in place. Returns [(src, dst)] for plan_renames(). """
+    metadata = metadata or MetadataIndex()
+    records = metadata.lookup_many(list(paths), validate=False)
+    ordered = sorted(paths, key=lambda path: metadata.date_of(path, records.get(path)))
+    safe_scene = safe_name_part(scene)
+    pairs = []
+    for idx, src_path in enumerate(ordered):
+        ext = os.path.splitext(src_path)[1]
+        cam_name = camera or (records.get(src_path) or {}).get("model")
+        if cam_name: new_name = f"{safe_scene}_{str(idx+1).zfill(3)}_{safe_name_part(cam_name)}{ext}"
+        else: new_name = f"{safe_scene}_{str(idx+1).zfill(3)}{ext}"
+        pairs.append((src_path, os.path.join(dest_dir or os.path.dirname(src_path), new_name)))
+    return pairs
+
+def _rename_journal_path():
+    return os.path.join(get_user_config_dir(), "rename_journal.json")
+
+def load_rename_journal():
+    try:
+        with open(_rename_journal_path(), encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError): return []
+
+def _save_rename_journal(batches):
+    os.makedirs(get_user_config_dir(), exist_ok=True)
+    tmp = _rename_journal_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f: json.dump(batches[-RENAME_JOURNAL_KEEP:], f, indent=1)
+    os.replace(tmp, _rename_journal_path())
+
+def execute_renames(steps: list[RenameStep], journal: bool = True) -> list[RenameStep]:
+    """ Two-phase same-volume rename: every source first goes to a unique temporary name next to it, then
+        every temporary to its target, so chains and cycles never overwrite each other. Any failure rolls
+        back everything done so far; the journal (written before the first rename, with the temporary
+        names) lets Undo or a later run recover even after a crash. Returns the steps that ran. """
+    if any(st.status in RENAME_BLOCKING for st in steps):
+        raise FileExistsError("Rename plan has conflicts: " + ", ".join(os.path.basename(st.dst) for st in steps if st.status in RENAME_BLOCKING)[:300])
+    todo = [st for st in steps if st.status != "unchanged"]
+    tag = f".~rename-{os.getpid()}-{int(time.time() * 1000)}"
+    for i, st in enumerate(todo): st.tmp = os.path.join(os.path.dirname(st.src), f"{tag}-{i}.tmp")
+    batches = load_rename_journal() if journal else []
+    if journal:
+        # Absolute, so Undo works whatever the working directory of the run (e.g. the CLI with '.') was
+        batches.append({"time": datetime.now().isoformat(timespec="seconds"), "state": "pending",
+                        "steps": [[os.path.abspath(p) for p in (st.src, st.tmp, st.dst)] for st in todo]})
+        _save_rename_journal(batches)
+    phase1, phase2 = [], []
+    try:
+        started = time.perf_counter()
+        for st in todo:
+            os.rename(st.src, st.tmp)
+            phase1.append(st)
+        for st in todo:
+            if os.path.lexists(st.dst): raise FileExistsError(f"{os.path.basename(st.dst)} appeared while renaming")
+            os.rename(st.tmp, st.dst)
+            phase2.append(st)
+        if todo: PERF.add("rename.file", (time.perf_counter() - started) / len(todo))  # Both phases, per file
+    except Exception:
+        for st in reversed(phase2):
+            try: os.rename(st.dst, st.tmp)
+            except OSError: pass
+        for st in reversed(phase1):
+            try: os.rename(st.tmp, st.src)
+            except OSError: pass
+        if journal:
+            batches.pop()
+            _save_rename_journal(batches)
+        raise
+    if journal:
+        batches[-1]["state"] = "done"
+        _save_rename_journal(batches)
+    return todo
+
+def copy_renames(steps: list[RenameStep], copy_mode: str = "auto", verify: str = "off") -> list[RenameStep]:
+    """ The 'copy' action of a rename plan: every source is copied to its new name through execute_file_op, so
+        copy mode and verification apply (with a manifest per folder). A copy would overwrite a chain or cycle
+        target, so those block too. Any failure removes the copies made so far. Returns the steps that ran. """
+    if any(st.status in RENAME_BLOCKING + ("chain", "cycle") for st in steps):
+        raise FileExistsError("Copy plan has conflicts: " + ", ".join(os.path.basename(st.dst) for st in steps if st.status != "ok")[:300])
+    manifest = CopyManifest()
+    done = []
+    try:
+        for st in steps:
+            execute_file_op(FileOp("copy", st.src, st.dst), copy_mode, verify, manifest)
+            done.append(st)
+    except Exception:
+        for st in reversed(done):
+            try: os.remove(st.dst)
+            except OSError: pass
+        raise
+    manifest.write()
+    return done
+
+def undo_last_rename():
+    """ Reverts the most recent journaled batch (also one interrupted half-way). Returns [(current, restored)]. """
+    batches = load_rename_journal()
+    if not batches: return []
+    batch = batches.pop()
+    pairs = []
+    for src, tmp, dst in batch["steps"]:
+        if os.path.lexists(tmp): pairs.append((tmp, src))
+        elif os.path.lexists(dst): pairs.append((dst, src))
+    execute_renames(plan_renames(pairs), journal=False)
+    _save_rename_journal(batches)
+    return pairs
+
+# ==========================================
+#       USER FOLDERS
+# ==========================================
+def get_user_cache_dir():
+    """ Per-user cache folder (~/Library/Caches, %LOCALAPPDATA% or XDG_CACHE_HOME). """
+    if sys.platform == 'darwin':
+        base = os.path.expanduser("~/Library/Caches")
+    elif os.name == 'nt':
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "SmartShootOrganizer")
+
+def get_user_config_dir():
+    """ Per-user settings folder (Application Support, %APPDATA% or XDG_CONFIG_HOME). """
+    if sys.platform == 'darwin':
+        base = os.path.expanduser("~/Library/Application Support")
+    elif os.name == 'nt':
+        base = os.environ.get("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "SmartShootOrganizer")
+
+# ==========================================
+#       METADATA INDEX
+# ==========================================
+EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+def parse_exif_date(value):
+    """ 'YYYY:MM:DD HH:MM:SS' -> POSIX timestamp (local time), or None. """
+    try: return datetime.strptime(str(value).strip().rstrip("\x00")[:19], EXIF_DATE_FORMAT).timestamp()
+    except (ValueError, OverflowError, OSError): return None
+
+# --- Header-only readers: bounded seeks + small reads, never a pixel decode ---
+MAX_HEADER_FIELD = 4096
+QT_EPOCH_OFFSET = 2082844800  # seconds between 1904-01-01 (QuickTime) and 1970-01-01
+
+def _parse_tiff(read, base, rec):
+    """ Reads IFD0 + Exif IFD of a TIFF structure starting at 'base'. read(offset, n) -> bytes. """
+    head = read(base, 8)
+    if len(head) < 8: return
+    if head[:2] == b"II": end = "<"
+    elif head[:2] == b"MM": end = ">"
+    else: return
+    if struct.unpack(end + "H", head[2:4])[0] != 42: return
+    sizes = {1: 1, 2: 1, 3: 2, 4: 4, 7: 1}
+
+    def ifd(offset):
+        raw = read(base + offset, 2)
+        if len(raw) < 2: return {}
+        count = struct.unpack(end + "H", raw)[0]
+        if count > 1024: return {}
+        data = read(base + offset + 2, count * 12)
+        out = {}
+        for i in range(len(data) // 12):
+            tag, typ, n = struct.unpack_from(end + "HHI", data, i * 12)
+            if typ not in sizes: continue
+            field = data[i * 12 + 8:i * 12 + 12]
+            if sizes[typ] * n > 4:
+                field = read(base + struct.unpack(end + "I", field)[0], min(sizes[typ] * n, MAX_HEADER_FIELD))
+            if typ == 2: out[tag] = field[:n].split(b"\x00")[0].decode("utf-8", "replace").strip()
+            elif typ == 3 and len(field) >= 2: out[tag] = struct.unpack(end + "H", field[:2])[0]
+            elif typ == 4 and len(field) >= 4: out[tag] = struct.unpack(end + "I", field[:4])[0]
+        return out
+
+    ifd0 = ifd(struct.unpack(end + "I", head[4:8])[0])
+    exif = ifd(ifd0[0x8769]) if isinstance(ifd0.get(0x8769), int) else {}
+    date = exif.get(0x9003) or ifd0.get(0x0132)
+    if date and rec["date_taken"] is None: rec["date_taken"] = parse_exif_date(date)
+    if ifd0.get(0x0110) and not rec["model"]: rec["model"] = ifd0[0x0110]
+    if isinstance(ifd0.get(0x0112), int): rec["orientation"] = ifd0[0x0112] or 1
+    width = exif.get(0xA002) or ifd0.get(0x0100)
+    height = exif.get(0xA003) or ifd0.get(0x0101)
+    if width and height and not rec["width"]: rec["width"], rec["height"] = width, height
+
+def _read_jpeg_header(f, rec):
+    """ Walks JPEG segments up to the first SOF; only APP1 (Exif) and SOF payloads are read. """
+    f.seek(2)
+    while True:
+        hdr = f.read(4)
+        if len(hdr) < 4 or hdr[0] != 0xFF: return
+        marker, length = hdr[1], struct.unpack(">H", hdr[2:4])[0]
+        if marker == 0xDA or length < 2: return
+        if marker == 0xE1:
+            data = f.read(length - 2)
+            if data[:6] == b"Exif\x00\x00":
+                _parse_tiff(lambda off, n: data[off:off + n], 6, rec)
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) == 5: rec["height"], rec["width"] = struct.unpack(">HH", data[1:5])
+            return
+        else:
+            f.seek(length - 2, 1)
+
+def _iter_boxes(f, start, end):
+    """ Yields (type, payload start, payload end) for the ISO-BMFF boxes in [start, end). """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        hdr = f.read(8)
+        if len(hdr) < 8: return
+        size, typ = struct.unpack(">I4s", hdr)
+        header = 8
+        if size == 1:
+            ext = f.read(8)
+            if len(ext) < 8: return
+            size, header = struct.unpack(">Q", ext)[0], 16
+        elif size == 0:
+            size = end - pos
+        if size < header: return
+        yield typ, pos + header, min(pos + size, end)
+        pos += size
+
+def _read_qt_text(f, start, end):
+    """ QuickTime user-data text (16-bit length, 16-bit language, text) or an iTunes-style 'data' box. """
+    f.seek(start)
+    data = f.read(min(end - start, MAX_HEADER_FIELD))
+    if data[4:8] == b"data": return data[16:].split(b"\x00")[0].decode("utf-8", "replace").strip()
+    if len(data) >= 4:
+        n = struct.unpack(">H", data[:2])[0]
+        return data[4:4 + n].decode("utf-8", "replace").strip()
+    return ""
+
+def _read_qt_meta(f, start, end, rec):
+    """ moov/meta with keys + ilst (Apple/iPhone style) for model and local creation date. """
+    f.seek(start)
+    if f.read(8)[4:8] != b"hdlr": start += 4  # Full-box variant carries version/flags first
+    keys, items = {}, {}
+    for typ, s0, s1 in _iter_boxes(f, start, end):
+        if typ == b"keys":
+            f.seek(s0)
+            data = f.read(min(s1 - s0, 65536))
+            if len(data) < 8: continue
+            pos, idx = 8, 1
+            for _ in range(struct.unpack(">I", data[4:8])[0]):
+                if pos + 8 > len(data): break
+                ksize = struct.unpack(">I", data[pos:pos + 4])[0]
+                if ksize < 8: break
+                keys[idx] = data[pos + 8:pos + ksize].decode("utf-8", "replace")
+                pos += ksize
+                idx += 1
+        elif typ == b"ilst":
+            for item, i0, i1 in _iter_boxes(f, s0, s1):
+                items[struct.unpack(">I", item)[0]] = (i0, i1)
+    values = {keys[k]: _read_qt_text(f, *items[k]) for k in items if k in keys}
+    if values.get("com.apple.quicktime.model"): rec["model"] = values["com.apple.quicktime.model"]
+    created = values.get("com.apple.quicktime.creationdate")
+    if created:
+        try: rec["date_taken"] = datetime.fromisoformat(created.replace("Z", "+00:00")).timestamp()
+        except ValueError: pass
+
+def _read_isobmff_header(f, size, rec):
+    """ MP4/MOV: moov/mvhd creation time, tkhd dimensions, udta ©mod and Apple meta keys.
+        Only box headers are read while skipping to moov, even when it sits after mdat. """
+    for typ, start, end in _iter_boxes(f, 0, size):
+        if typ != b"moov": continue
+        for child, c0, c1 in _iter_boxes(f, start, end):
+            if child == b"mvhd":
+                f.seek(c0)
+                data = f.read(20)
+                if len(data) < 20: continue
+                created = struct.unpack(">Q", data[4:12])[0] if data[0] == 1 else struct.unpack(">I", data[4:8])[0]
+                if created > QT_EPOCH_OFFSET and rec["date_taken"] is None:
+                    rec["date_taken"] = float(created - QT_EPOCH_OFFSET)
+            elif child == b"trak" and not rec["width"]:
+                for sub, t0, t1 in _iter_boxes(f, c0, c1):
+                    if sub == b"tkhd" and t1 - t0 >= 84:
+                        f.seek(t1 - 8)
+                        w, h = struct.unpack(">II", f.read(8))
+                        if w and h: rec["width"], rec["height"] = w >> 16, h >> 16
+            elif child == b"udta":
+                for sub, u0, u1 in _iter_boxes(f, c0, c1):
+                    if sub == b"\xa9mod" and not rec["model"]: rec["model"] = _read_qt_text(f, u0, u1) or None
+            elif child == b"meta":
+                _read_qt_meta(f, c0, c1, rec)
+        return
+
+def read_media_header(filepath, rec):
+    """ Fills rec from the file header. Returns True if the format was recognised. """
+    ext = os.path.splitext(filepath)[1].lower()
+    with open(filepath, "rb") as f:
+        magic = f.read(12)
+        if magic[:2] == b"\xff\xd8":
+            _read_jpeg_header(f, rec)
+        elif magic[:4] in (b"II*\x00", b"MM\x00*"):
+            def read(offset, n):
+                f.seek(offset)
+                return f.read(n)
+            _parse_tiff(read, 0, rec)
+        elif magic[4:8] in (b"ftyp", b"moov", b"wide", b"mdat", b"free", b"skip") or ext in ISOBMFF_EXTS:
+            _read_isobmff_header(f, os.fstat(f.fileno()).st_size, rec)
+        else:
+            return False
+    return True
+
+def extract_metadata(filepath, st=None):
+    """ Capture date, camera model, orientation and dimensions of one file (header reads only). """
+    st = st or os.stat(filepath)
+    rec = {"fsize": st.st_size, "mtime": st.st_mtime_ns, "date_taken": None, "model": None,
+           "orientation": 1, "width": None, "height": None}
+    try: recognised = read_media_header(filepath, rec)
+    except (OSError, struct.error, ValueError): recognised = False
+    if not recognised and os.path.splitext(filepath)[1].lower() in IMAGE_EXTS:
+        try:
+            from PIL import Image, ExifTags  # Only for formats the header parsers don't cover (PNG, WebP...)
+            with Image.open(filepath) as img:
+                rec["width"], rec["height"] = img.size
+                exif = img.getexif()
+                # DateTimeOriginal lives in the Exif sub-IFD; DateTime (306) is in IFD0
+                date_str = exif.get_ifd(ExifTags.IFD.Exif).get(36867) or exif.get(306)
+                if date_str: rec["date_taken"] = parse_exif_date(date_str)
+                if exif.get(272): rec["model"] = str(exif.get(272)).strip().rstrip("\x00") or None
+                rec["orientation"] = int(exif.get(0x0112, 1) or 1)
+        except Exception: pass
+    # Stored (sensor) dimensions -> as displayed
+    if rec["orientation"] in (5, 6, 7, 8) and rec["width"]:
+        rec["width"], rec["height"] = rec["height"], rec["width"]
+    return rec
+
+class MetadataIndex:
+    """ Per-file metadata extracted once in a thread pool and persisted (SQLite) keyed by path,
+        validated by size + mtime. Records are also kept in memory for the session. """
+    SCHEMA_VERSION = 2
+    FIELDS = ("fsize", "mtime", "date_taken", "model", "orientation", "width", "height")
+
+    def __init__(self, db_path=None, workers=8):
+        self.db_path = db_path or os.path.join(get_user_cache_dir(), "metadata.sqlite")
+        self.workers = workers
+        self.records = {}
+        self.lock = threading.Lock()
+        self.conn = None
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS media")
+                self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS media (
+                path TEXT PRIMARY KEY, fsize INTEGER, mtime INTEGER, date_taken REAL,
+                model TEXT, orientation INTEGER, width INTEGER, height INTEGER)""")
+            self.conn.commit()
+        except Exception as e:
+            print(f"Metadata index not persisted: {e}")
+            self.conn = None
+
+    def lookup_many(self, paths, validate=True):
+        """ Returns {path: record}. Only files that are new or changed are read. With validate=False,
+            records already indexed this session are trusted without a stat. """
+        result, todo = {}, []
+        with self.lock:
+            for path in paths:
+                rec = self.records.get(path)
+                if rec is not None and not validate: result[path] = rec
+                else: todo.append(path)
+        if not todo: return result
+        stored = self._load_rows(todo)
+
+        def index_one(path):
+            try: st = os.stat(path)
+            except OSError: return path, None, False
+            rec = self.records.get(path) or stored.get(path)
+            if rec and rec["fsize"] == st.st_size and rec["mtime"] == st.st_mtime_ns: return path, rec, False
+            return path, extract_metadata(path, st), True
+
+        fresh = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="meta") as pool:
+            for path, rec, is_new in pool.map(index_one, todo):
+                if rec is None: continue
+                result[path] = rec
+                if is_new: fresh.append((path, rec))
+        PERF.count("metadata.index", hits=len(result) - len(fresh), misses=len(fresh))
+        with self.lock:
+            self.records.update(result)
+        self._save_rows(fresh)
+        return result
+
+    def lookup(self, path):
+        return self.lookup_many([path], validate=False).get(path)
+
+    def move(self, pairs):
+        """ Re-keys records after files were moved or renamed (same approach as ThumbnailCache.move). """
+        if not pairs: return
+        with self.lock:
+            moved = {old: self.records.pop(old) for old, _new in pairs if old in self.records}
+            for old, new in pairs:
+                if old in moved: self.records[new] = moved[old]
+            if self.conn is None: return
+            try:
+                self.conn.executemany("UPDATE OR REPLACE media SET path=? WHERE path=?", [("\0" + old, old) for old, _new in pairs])
+                self.conn.executemany("UPDATE OR REPLACE media SET path=? WHERE path=?", [(new, "\0" + old) for old, new in pairs])
+                self.conn.commit()
+            except Exception as e:
+                print(f"Metadata index update failed: {e}")
+
+    def date_of(self, path, rec=None):
+        """ Capture time as a datetime, falling back to the file's mtime. """
+        rec = rec or self.lookup(path)
+        if rec and rec["date_taken"] is not None: return datetime.fromtimestamp(rec["date_taken"])
+        if rec: return datetime.fromtimestamp(rec["mtime"] / 1e9)
+        return datetime.fromtimestamp(os.path.getmtime(path))
+
+    def _load_rows(self, paths):
+        if self.conn is None: return {}
+        rows = {}
+        with self.lock:
+            try:
+                for i in range(0, len(paths), 500):
+                    chunk = paths[i:i + 500]
+                    q = f"SELECT path, {', '.join(self.FIELDS)} FROM media WHERE path IN ({','.join('?' * len(chunk))})"
+                    for row in self.conn.execute(q, chunk):
+                        rows[row[0]] = dict(zip(self.FIELDS, row[1:]))
+            except sqlite3.Error as e:  # e.g. 'database is locked' by another instance: re-read the files instead
+                print(f"Metadata index read failed: {e}")
+                return {}
+        return rows
+
+    def _save_rows(self, items):
+        if self.conn is None or not items: return
+        with self.lock:
+            try:
+                self.conn.executemany(f"INSERT OR REPLACE INTO media VALUES (?,{','.join('?' * len(self.FIELDS))})",
+                                      [(path,) + tuple(rec[f] for f in self.FIELDS) for path, rec in items])
+                self.conn.commit()
+            except Exception as e:
+                print(f"Metadata index write failed: {e}")
+
+# ==========================================
+#       COMMAND LINE
+# ==========================================
+def read_manifest(path: str) -> dict:
+    """ {file: value} from a JSON object, or from CSV/TSV rows 'file,value[,more...]' (extra columns -> list).
+        File names are relative to the source folder. """
+    with open(path, encoding="utf-8-sig") as f:
+        if path.lower().endswith(".json"): return json.load(f)
+        import csv
+        rows = csv.reader(f, delimiter="\t" if path.lower().endswith(".tsv") else ",")
+        return {row[0].strip(): [v.strip() for v in row[1:]] if len(row) > 2 else row[1].strip()
+                for row in rows if len(row) >= 2 and row[0].strip() and not row[0].startswith("#")}
+
+def _cli_sort(args):
+    labels, renames = {}, {}
+    for name, value in read_manifest(args.labels).items():
+        label, *rest = value if isinstance(value, list) else [value]
+        labels[name] = label
+        if rest and rest[0]: renames[name] = rest[0] if os.path.splitext(rest[0])[1] else rest[0] + os.path.splitext(name)[1]
+    out_root = args.out or args.source
+    plan = lambda: plan_visual_sort(args.source, out_root, labels, renames, "copy" if args.copy else "move",
+                                    not args.no_related, args.backup)
+    if args.dry_run:
+        for item in plan():
+            for op in item.ops():
+                print(f"{op.action:6} {op.src}" + (f" -> {op.dst}" if op.dst else "") + "".join(f"\n       + {b.dst}" for b in op.backups))
+        return 0
+    job = SortJob(plan, workers=args.workers, copy_mode=args.copy_mode, verify=args.verify, roots=[out_root] + args.backup).start()
+    while not job.finished:
+        time.sleep(0.5)
+        snap = job.snapshot()
+        if not args.quiet: print(f"\r{snap['files']}/{snap['total_files']} files, {format_bytes(snap['bytes'])}/{format_bytes(snap['total_bytes'])}", end="", file=sys.stderr)
+    if not args.quiet: print(file=sys.stderr)
+    if job.error:
+        print(f"Sort failed: {job.error}", file=sys.stderr)
+        return 1
+    results = job.results()
+    problems = [op for op in results if op.status != "ok" or op.error]
+    for op in problems: print(f"[{op.status.upper()}] {op.src}" + (f" -> {op.dst}" if op.dst else "") + f": {op.error}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump([{**op.__dict__, "backups": [b.dst for b in op.backups]} for op in results], f, indent=2)
+    print(f"Processed {sum(1 for item in job.items if item.primary.status == 'ok')} of {len(job.items)} files, {len(problems)} problems.")
+    return 1 if problems else 0
+
+def _cli_rename(args):
+    groups = {}
+    args.source = os.path.abspath(args.source)
+    for name, scene in read_manifest(args.groups).items():
+        groups.setdefault(scene[0] if isinstance(scene, list) else scene, []).append(os.path.join(args.source, name))
+    metadata = MetadataIndex()
+    pairs, dest_dirs = [], set()
+    for scene, paths in groups.items():
+        dest_dir = os.path.join(args.source, safe_name_part(scene)) if args.action in ("move", "copy") else None
+        if dest_dir: dest_dirs.add(dest_dir)
+        pairs.extend(group_rename_pairs(paths, scene, args.camera, dest_dir, metadata))
+    steps = plan_renames(pairs)  # One plan for every group, so names can't collide across groups either
+    blocking = [st for st in steps if st.status in RENAME_BLOCKING]
+    if args.dry_run or blocking:
+        for st in steps: print(f"{st.status:9} {os.path.relpath(st.src, args.source)} -> {os.path.relpath(st.dst, args.source)}")
+    if blocking:
+        print(f"{len(blocking)} conflicts, nothing was changed.", file=sys.stderr)
+        return 1
+    if args.dry_run: return 0
+    for folder in dest_dirs: os.makedirs(folder, exist_ok=True)
+    if args.action == "copy": done = copy_renames(steps, args.copy_mode, args.verify)  # All or nothing
+    else: done = execute_renames(steps)  # Journaled: the app's 'Undo Last Rename' reverts it
+    print(f"{'Copied' if args.action == 'copy' else 'Renamed'} {len(done)} files in {len(groups)} groups.")
+    return 0
+
+def _cli_sequence(args):
+    target_dir = os.path.join(args.source, args.target)
+    backup_dirs = [os.path.join(d, args.target) for d in args.backup]
+    for folder in [target_dir] + backup_dirs: os.makedirs(folder, exist_ok=True)
+    counts = run_sequence(args.source, args.sequence, args.prefix, args.ext.split(","), target_dir, backup_dirs,
+                          "move" if args.move else "copy", args.copy_mode, args.verify,
+                          log=(lambda message: None) if args.quiet else print)
+    if args.quiet: print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+    return 1 if counts["Errors"] else 0
+
+def main(argv=None):
+    """ photo_organizer sort|rename|sequence ... (see --help). Returns the exit status. """
+    import argparse
+    parser = argparse.ArgumentParser(prog="photo_organizer", description="Smart Shoot Organizer, headless.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def copy_options(p):
+        p.add_argument("--backup", action="append", default=[], metavar="DIR", help="also copy into DIR (repeatable)")
+        p.add_argument("--verify", choices=("off", "hash", "readback"), default="off", help="BLAKE2b-verify copies")
+        p.add_argument("--copy-mode", choices=("auto", "hardlink"), default="auto")
+        p.add_argument("-q", "--quiet", action="store_true")
+        perf_option(p)
+
+    def perf_option(p):
+        p.add_argument("--perf", metavar="FILE", help="write timing percentiles (JSON, or CSV for a .csv name)")
+
+    p = sub.add_parser("sort", help="sort labeled files into <out>/<label> folders (Red is deleted)")
+    p.add_argument("source")
+    p.add_argument("labels", help="label manifest: JSON {file: label} or CSV file,label[,new name]")
+    p.add_argument("--out", help="output root (default: the source folder)")
+    p.add_argument("--copy", action="store_true", help="copy instead of move")
+    p.add_argument("--no-related", action="store_true", help="leave RAW/XMP/sidecar files of the same shot")
+    p.add_argument("--workers", type=int, default=2, help="parallel file operations (1 for HDDs)")
+    p.add_argument("--report", metavar="FILE", help="write a per-file JSON report")
+    p.add_argument("-n", "--dry-run", action="store_true", help="print the plan only")
+    copy_options(p)
+
+    p = sub.add_parser("rename", help="rename groups chronologically as <Scene>_001[_<Camera>]")
+    p.add_argument("source")
+    p.add_argument("groups", help="group manifest: JSON {file: scene} or CSV file,scene")
+    p.add_argument("--action", choices=("rename", "move", "copy"), default="rename", help="move/copy go into <source>/<Scene>")
+    p.add_argument("--camera", default="", help="camera name (default: EXIF model, if any)")
+    p.add_argument("--verify", choices=("off", "hash", "readback"), default="off", help="BLAKE2b-verify copies (--action copy)")
+    p.add_argument("--copy-mode", choices=("auto", "hardlink"), default="auto")
+    p.add_argument("-n", "--dry-run", action="store_true", help="print the plan only")
+    perf_option(p)
+
+    p = sub.add_parser("sequence", help="pick files by shorthand number sequence ('1210, 1, 5' -> 1210, 1211, 1215)")
+    p.add_argument("source")
+    p.add_argument("sequence")
+    p.add_argument("--target", default="Selected_Photos", help="folder created inside the source (and each backup)")
+    p.add_argument("--prefix", default="IMG_")
+    p.add_argument("--ext", default="JPG,CR2,MP4,MOV", help="comma-separated extensions; empty for all")
+    p.add_argument("--move", action="store_true", help="move instead of copy")
+    copy_options(p)
+
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.source): parser.error(f"not a folder: {args.source}")
+    try: return {"sort": _cli_sort, "rename": _cli_rename, "sequence": _cli_sequence}[args.command](args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.perf: PERF.export(args.perf)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,1024 @@
+import sys
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in ("sort", "rename", "sequence"):
+    from photo_engine import main  # Command line: runs headless, without tkinter / Pillow / OpenCV
+    sys.exit(main())
+
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, simpledialog
+from tkinter import filedialog, messagebox, ttk
 import os
 import shutil
 import threading
-import sys
 import subprocess
 import time
 import io
-from datetime import datetime
+import json
+import sqlite3
+import struct
+import hashlib
+import queue
+import multiprocessing
+import importlib.util
+from collections import OrderedDict
+from functools import cached_property
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, BrokenExecutor, wait, FIRST_COMPLETED
+
+from photo_engine import (IMAGE_EXTS, VIDEO_EXTS, PERF, RENAME_BLOCKING, FolderScan, FolderWatcher, MetadataIndex, SortJob,
+                          copy_renames, execute_renames, format_bytes, get_user_cache_dir, get_user_config_dir,
+                          group_rename_pairs, load_rename_journal, parse_patterns, plan_renames, plan_visual_sort,
+                          run_sequence, safe_name_part, undo_last_rename)
 
 # --- Library Checks ---
 try:
-    from PIL import Image, ImageTk, ImageOps, ImageDraw, ExifTags
+    from PIL import Image, ImageTk, ImageDraw
     HAS_PIL = True
 except ImportError:
     HAS_PIL = False
 
-# Optional: OpenCV for video frame extraction
-try:
+# Optional: OpenCV for video frame extraction. Only looked up here: the import itself (hundreds of ms and
+# tens of MB) happens where the first video frame is decoded.
+HAS_CV2 = importlib.util.find_spec("cv2") is not None
+
+SEQ_LOG_VISIBLE = 1000  # log lines kept in the Sequence tab's Text widget
+SEQ_LOG_MAX = 100000    # log lines kept for Save Log
+
+# ==========================================
+#       PERSISTENT THUMBNAIL CACHE
+# ==========================================
+DEFAULT_SETTINGS = {
+    "prefetch_ahead": 4,          # files decoded ahead in the travel direction
+    "prefetch_memory_mb": 512,    # budget for decoded screen-sized images
+    "io_workers": 2,              # parallel file operations when sorting (1 for HDDs, 4+ for SSDs)
+    "copy_mode": "auto",          # 'auto' (clone/reflink when possible) or 'hardlink' (same volume only)
+    "copy_verify": "off",         # 'off', 'hash' (BLAKE2b manifest) or 'readback' (hash + re-read destination)
+    "scan_subfolders": True,      # walk DCIM/100CANON, 101CANON, ... when opening a folder
+    "scan_include": "",           # comma-separated file name globs; empty = all media
+    "scan_exclude": ".*, Green, Yellow, Red",  # folder/file name globs to skip (hidden files, sort output)
+    "watch_folders": False,       # poll open folders for outside changes (folder mtimes every 2 s)
+}
+
+def load_settings():
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(os.path.join(get_user_config_dir(), "settings.json"), "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        settings.update({k: v for k, v in stored.items() if k in DEFAULT_SETTINGS})
+    except (OSError, ValueError): pass
+    return settings
+
+def save_settings(settings):
+    try:
+        folder = get_user_config_dir()
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, "settings.json"), "w", encoding="utf-8") as f:
+            json.dump(settings, f, indent=2)
+    except OSError as e:
+        print(f"Could not save settings: {e}")
+
+class ThumbnailCache:
+    """ SQLite store of raw thumbnail pixels keyed by (path, thumb size), validated by file size + mtime.
+        Least recently used rows are evicted once the store grows past max_bytes. """
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path=None, max_bytes=256 * 1024 * 1024):
+        self.db_path = db_path or os.path.join(get_user_cache_dir(), "thumbnails.sqlite")
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = None
+        self.total_bytes = 0
+        self.pending = 0
+        try:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                self.conn.execute("DROP TABLE IF EXISTS thumbs")
+                self.conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS thumbs (
+                path TEXT NOT NULL, tw INTEGER NOT NULL, th INTEGER NOT NULL,
+                fsize INTEGER, mtime INTEGER, w INTEGER, h INTEGER, mode TEXT,
+                data BLOB, atime REAL, PRIMARY KEY (path, tw, th))""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS thumbs_atime ON thumbs(atime)")
+            self.conn.commit()
+            self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM thumbs").fetchone()[0]
+        except Exception as e:
+            print(f"Thumbnail cache disabled: {e}")
+            self.conn = None
+
+    def _key(self, filepath, size):
+        st = os.stat(filepath)
+        return os.path.abspath(filepath), int(size[0]), int(size[1]), st.st_size, st.st_mtime_ns
+
+    def get(self, filepath, size):
+        """ Returns a PIL image, or None on miss / stale entry. """
+        if self.conn is None or not HAS_PIL: return None
+        try:
+            path, tw, th, fsize, mtime = self._key(filepath, size)
+            with self.lock:
+                row = self.conn.execute("SELECT fsize, mtime, w, h, mode, data FROM thumbs WHERE path=? AND tw=? AND th=?", (path, tw, th)).fetchone()
+                if not row or row[0] != fsize or row[1] != mtime: return None
+                self.conn.execute("UPDATE thumbs SET atime=? WHERE path=? AND tw=? AND th=?", (time.time(), path, tw, th))
+                self._maybe_commit()
+            return Image.frombytes(row[4], (row[2], row[3]), row[5])
+        except Exception:
+            return None
+
+    def put(self, filepath, size, img):
+        if self.conn is None: return
+        try:
+            path, tw, th, fsize, mtime = self._key(filepath, size)
+            if img.mode not in ("RGB", "RGBA", "L"): img = img.convert("RGB")
+            data = img.tobytes()
+            with self.lock:
+                old = self.conn.execute("SELECT LENGTH(data) FROM thumbs WHERE path=? AND tw=? AND th=?", (path, tw, th)).fetchone()
+                self.conn.execute("INSERT OR REPLACE INTO thumbs VALUES (?,?,?,?,?,?,?,?,?,?)",
+                                  (path, tw, th, fsize, mtime, img.width, img.height, img.mode, data, time.time()))
+                self.total_bytes += len(data) - (old[0] if old else 0)
+                if self.total_bytes > self.max_bytes: self._evict()
+                self._maybe_commit()
+        except Exception as e:
+            print(f"Thumbnail cache write failed: {e}")
+
+    def move(self, pairs):
+        """ Re-keys rows after files were moved or renamed; size + mtime survive that, so entries stay valid.
+            Goes through temporary keys so swaps (A->B, B->A) don't clobber each other. """
+        if self.conn is None or not pairs: return
+        pairs = [(os.path.abspath(old), os.path.abspath(new)) for old, new in pairs]
+        with self.lock:
+            try:
+                self.conn.executemany("UPDATE OR REPLACE thumbs SET path=? WHERE path=?", [("\0" + old, old) for old, _new in pairs])
+                self.conn.executemany("UPDATE OR REPLACE thumbs SET path=? WHERE path=?", [(new, "\0" + old) for old, new in pairs])
+                self.conn.commit()
+                self.pending = 0
+            except Exception as e:
+                print(f"Thumbnail cache update failed: {e}")
+
+    def _evict(self):
+        # Drop least recently used rows until we are back under 90% of the budget
+        target = int(self.max_bytes * 0.9)
+        while self.total_bytes > target:
+            rows = self.conn.execute("SELECT rowid, LENGTH(data) FROM thumbs ORDER BY atime LIMIT 256").fetchall()
+            if not rows: self.total_bytes = 0; break
+            for rowid, length in rows:
+                self.conn.execute("DELETE FROM thumbs WHERE rowid=?", (rowid,))
+                self.total_bytes -= length or 0
+                if self.total_bytes <= target: break
+        self.conn.commit()
+        self.pending = 0
+
+    def _maybe_commit(self):
+        self.pending += 1
+        if self.pending >= 100:
+            self.conn.commit()
+            self.pending = 0
+
+    def flush(self):
+        if self.conn is None: return
+        with self.lock:
+            try: self.conn.commit()
+            except Exception: pass
+            self.pending = 0
+
+# ==========================================
+#       FAST THUMBNAIL EXTRACTION
+# ==========================================
+# EXIF orientation -> transpose ops (same table as ImageOps.exif_transpose)
+ORIENTATION_OPS = {2: "FLIP_LEFT_RIGHT", 3: "ROTATE_180", 4: "FLIP_TOP_BOTTOM", 5: "TRANSPOSE",
+                   6: "ROTATE_270", 7: "TRANSVERSE", 8: "ROTATE_90"}
+
+def apply_orientation(img, orientation):
+    op = ORIENTATION_OPS.get(orientation)
+    if not op: return img
+    return img.transpose(getattr(Image.Transpose, op))
+
+def extract_exif_thumbnail(exif_bytes):
+    """ Returns the JPEG thumbnail stored in IFD1 of a raw Exif block, or None. """
+    data = exif_bytes[6:] if exif_bytes[:6] == b"Exif\x00\x00" else exif_bytes
+    if len(data) < 8: return None
+    if data[:2] == b"II": end = "<"
+    elif data[:2] == b"MM": end = ">"
+    else: return None
+    try:
+        ifd0 = struct.unpack_from(end + "I", data, 4)[0]
+        n0 = struct.unpack_from(end + "H", data, ifd0)[0]
+        ifd1 = struct.unpack_from(end + "I", data, ifd0 + 2 + n0 * 12)[0]
+        if not ifd1: return None
+        offset = length = None
+        for i in range(struct.unpack_from(end + "H", data, ifd1)[0]):
+            tag, typ, count, value = struct.unpack_from(end + "HHII", data, ifd1 + 2 + i * 12)
+            if typ == 3: value = struct.unpack_from(end + "H", data, ifd1 + 2 + i * 12 + 8)[0]
+            if tag == 0x0201: offset = value
+            elif tag == 0x0202: length = value
+        if not offset or not length or offset + length > len(data): return None
+        blob = data[offset:offset + length]
+        return blob if blob[:2] == b"\xff\xd8" else None
+    except struct.error:
+        return None
+
+def read_embedded_thumbnail(img, size):
+    """ Embedded EXIF preview of an opened JPEG, if it matches the image aspect and is big enough. """
+    blob = extract_exif_thumbnail(img.info.get("exif") or b"")
+    if not blob: return None
+    try:
+        thumb = Image.open(io.BytesIO(blob))
+        thumb.load()
+    except Exception:
+        return None
+    iw, ih = img.size
+    tw, th = thumb.size
+    # Many cameras pad a 3:2 frame into a 4:3 preview with black bars; skip those
+    if not tw or not th or abs(tw / th - iw / ih) > 0.03: return None
+    if tw < size[0] and th < size[1]: return None
+    return thumb.convert("RGB")
+
+def render_thumbnail(filepath, size):
+    """ Decodes a file into a PIL thumbnail, or None if it cannot be previewed. """
+    ext = os.path.splitext(filepath)[1].lower()
+    if ext in IMAGE_EXTS and HAS_PIL:
+        try:
+            img = Image.open(filepath)
+            orientation = img.getexif().get(0x0112, 1)
+            if img.format == "JPEG":
+                # 1. Embedded EXIF preview: no decode of the main image at all
+                thumb = read_embedded_thumbnail(img, size)
+                if thumb is not None:
+                    thumb = apply_orientation(thumb, orientation)
+                    thumb.thumbnail(size)
+                    return thumb
+                # 2. Reduced-scale DCT decode (1/2 - 1/8), before the transpose forces a full load
+                box = (size[1], size[0]) if orientation in (5, 6, 7, 8) else size
+                img.draft(None, (box[0] * 2, box[1] * 2))
+            img = apply_orientation(img, orientation)
+            img.thumbnail(size)
+            return img
+        except: pass
+    elif ext in VIDEO_EXTS and HAS_CV2 and HAS_PIL:
+        try:
+            raw = extract_video_frame(filepath, size)
+            if raw: return video_thumbnail(Image.frombytes("RGB", raw[:2], raw[2]), size)
+        except: pass
+    return None
+
+def video_placeholder_thumbnail(size):
+    img = Image.new('RGB', size, color='#333')
+    draw = ImageDraw.Draw(img)
+    draw.text((10, 20), "VIDEO", fill="white")
+    return img
+
+def video_thumbnail(frame, size):
+    """ Ribbon thumbnail with a play marker from an extracted frame. """
+    img = frame.copy()
+    img.thumbnail(size)
+    draw = ImageDraw.Draw(img)
+    draw.polygon([(35, 20), (35, 40), (55, 30)], fill="white", outline="black")
+    return img
+
+# ==========================================
+#       VIDEO FRAME SERVICE
+# ==========================================
+VIDEO_DARK_LEVEL = 16      # mean brightness (0-255) below which the first frame counts as a fade-in
+VIDEO_MAX_SKIP_MS = 1000   # how far forward a dark first frame may be skipped
+
+def extract_video_frame(filepath, box=None):
+    """ One representative frame as (w, h, RGB bytes), downsized to fit box, or None. Frame 0 is always a
+        keyframe and decodes without a seek; only if it is dark (fade-in, lens cap) are frames skipped with
+        grab(), which decodes but does not convert, up to VIDEO_MAX_SKIP_MS. Seeking to a timestamp instead
+        costs a keyframe seek plus decoding up to it on long-GOP H.264/H.265. """
     import cv2
-    HAS_CV2 = True
-except ImportError:
-    HAS_CV2 = False
+    cap = cv2.VideoCapture(filepath)
+    try:
+        if not cap.isOpened(): return None
+        ok, frame = cap.read()
+        if not ok: return None
+        if frame[::16, ::16].mean() < VIDEO_DARK_LEVEL:
+            for _ in range(int((cap.get(cv2.CAP_PROP_FPS) or 30) * VIDEO_MAX_SKIP_MS / 1000)):
+                if not cap.grab(): break
+            ok, later = cap.retrieve()
+            if ok: frame = later
+    finally:
+        cap.release()
+    h, w = frame.shape[:2]
+    scale = min(box[0] / w, box[1] / h) if box else 1
+    if scale < 1:  # Shrink before the color conversion and the trip through the pipe
+        w, h = max(1, round(w * scale)), max(1, round(h * scale))
+        frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+    return w, h, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).tobytes()
+
+def video_frame_worker(conn):
+    """ Worker process loop: (filepath, box) in, extract_video_frame() result out. """
+    while True:
+        try: filepath, box = conn.recv()
+        except (EOFError, OSError): return
+        try: raw = extract_video_frame(filepath, box)
+        except Exception: raw = None
+        conn.send(raw)
+
+class VideoFrameService:
+    """ One frame per video, extracted once and shared: the ribbon thumbnail and the viewer wait on the same
+        Future. Extraction runs in worker processes so a file that hangs the decoder is killed after TIMEOUT
+        (and not retried until it changes) instead of stalling a thread for good. Frames fit box and are
+        kept in a memory LRU and as JPEGs in the user cache folder. """
+    TIMEOUT = 10.0
+    PRUNE_EVERY = 100  # disk cache writes between size checks
+
+    def __init__(self, box=(1920, 1080), workers=None, max_bytes=128 * 1024 * 1024, cache_dir=None, disk_bytes=256 * 1024 * 1024):
+        self.box = box
+        # Two workers minimum, so one stuck file does not hold up every other clip until its timeout
+        self.workers = workers or min(4, max(2, (os.cpu_count() or 1) // 2))
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir or os.path.join(get_user_cache_dir(), "video_frames")
+        self.disk_bytes = disk_bytes
+        self.lock = threading.Lock()
+        self.jobs = queue.PriorityQueue()
+        self.seq = 0
+        self.threads = []
+        self.inflight = {}           # key -> Future
+        self.running = set()
+        self.frames = OrderedDict()  # key -> PIL image, LRU
+        self.bytes = 0
+        self.failed = set()
+        self.timeouts = 0
+        self.writes = 0
+        self.use_processes = True
+
+    def _key(self, filepath):
+        # Name + size + mtime rather than the path: sorting into folders keeps the cached frame
+        st = os.stat(filepath)
+        return os.path.basename(filepath), st.st_size, st.st_mtime_ns
+
+    def get(self, filepath):
+        """ Frame from memory only (no I/O), or None. """
+        try: key = self._key(filepath)
+        except OSError: return None
+        with self.lock:
+            img = self.frames.get(key)
+            if img is not None: self.frames.move_to_end(key)
+            return img
+
+    def submit(self, filepath, urgent=False):
+        """ Future resolving to the frame (PIL image) or None; never raises. Urgent requests (the viewer) go
+            ahead of queued thumbnail work, including an already queued request for the same file. """
+        fut = Future()
+        try: key = self._key(filepath)
+        except OSError:
+            fut.set_result(None)
+            return fut
+        with self.lock:
+            img = self.frames.get(key)
+            if img is not None: self.frames.move_to_end(key)
+            done = img is not None or key in self.failed
+            if not done:
+                queued = self.inflight.get(key)
+                if queued is not None and queued.cancelled(): queued = None  # Cancelled by a caller: start over
+                if queued is not None and not urgent: return queued
+                if queued is None: self.inflight[key] = fut
+                else: fut = queued
+                self.seq += 1
+                self.jobs.put((0 if urgent else 1, self.seq, key, filepath, fut))
+                while len(self.threads) < self.workers:
+                    self.threads.append(threading.Thread(target=self._run, daemon=True))
+                    self.threads[-1].start()
+        if done: fut.set_result(img)
+        return fut
+
+    def stats(self):
+        with self.lock:
+            return {"cached": len(self.frames), "bytes": self.bytes, "failed": len(self.failed), "timeouts": self.timeouts}
+
+    def _run(self):
+        """ One per worker process; restarts its process after a timeout or crash. """
+        proc = conn = None
+        if self.threads[0] is threading.current_thread(): self._prune()
+        while True:
+            _, _, key, filepath, fut = self.jobs.get()
+            with self.lock:
+                if fut.done() or key in self.running:
+                    # Duplicate entry of a request bumped to urgent, or cancelled while queued
+                    if fut.done() and self.inflight.get(key) is fut: self.inflight.pop(key)
+                    continue
+                fut.set_running_or_notify_cancel()  # From here on cancel() can no longer succeed
+                self.running.add(key)
+            img = self._read_disk(key)
+            extracted = img is None
+            PERF.count("video.frame_cache", hits=not extracted, misses=extracted)
+            if extracted:
+                started = time.perf_counter()
+                raw, proc, conn = self._extract(filepath, proc, conn)
+                if raw:
+                    PERF.add("video.extract", time.perf_counter() - started)
+                    try: img = Image.frombytes("RGB", raw[:2], raw[2])
+                    except Exception: img = None
+            with self.lock:
+                self.inflight.pop(key, None)
+                self.running.discard(key)
+                if img is None: self.failed.add(key)
+                else: self._store(key, img)
+            if not fut.done(): fut.set_result(img)
+            if extracted and img is not None: self._write_disk(key, img)  # After the waiters are served
+
+    def _extract(self, filepath, proc, conn):
+        """ Returns (raw frame or None, proc, conn) with the process to reuse (None once it was killed). """
+        if proc is None and self.use_processes:
+            try:
+                ctx = multiprocessing.get_context("spawn")
+                conn, child = ctx.Pipe()
+                proc = ctx.Process(target=video_frame_worker, args=(child,), daemon=True)
+                proc.start()
+                child.close()
+            except Exception:  # e.g. no process support, or a frozen build without freeze_support()
+                self.use_processes = False
+        if not self.use_processes:
+            try: return extract_video_frame(filepath, self.box), None, None  # In this thread, without a timeout
+            except Exception: return None, None, None
+        try:
+            conn.send((filepath, self.box))
+            if conn.poll(self.TIMEOUT): return conn.recv(), proc, conn
+            with self.lock: self.timeouts += 1
+            print(f"Video frame timed out after {self.TIMEOUT:.0f} s: {filepath}")
+        except (EOFError, OSError): pass  # Worker crashed (e.g. inside the decoder)
+        proc.kill()
+        proc.join()
+        conn.close()
+        return None, None, None
+
+    def _disk_path(self, key):
+        name = f"{key[0]}|{key[1]}|{key[2]}|{self.box[0]}x{self.box[1]}"
+        return os.path.join(self.cache_dir, hashlib.sha1(name.encode("utf-8")).hexdigest() + ".jpg")
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        try:
+            with Image.open(path) as img: img = img.convert("RGB")
+            os.utime(path)  # mtime = last use, for pruning
+            return img
+        except Exception:
+            return None
+
+    def _write_disk(self, key, img):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self._disk_path(key) + f".{threading.get_ident()}.tmp"
+            img.save(tmp, "JPEG", quality=88)
+            os.replace(tmp, self._disk_path(key))
+        except Exception: return
+        with self.lock:
+            self.writes += 1
+            prune = self.writes % self.PRUNE_EVERY == 0
+        if prune: self._prune()
+
+    def _prune(self):
+        """ Deletes the least recently used frames once the folder is over disk_bytes. """
+        try: entries = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(self.cache_dir) if e.is_file()]
+        except OSError: return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes: break
+            try: os.remove(path)
+            except OSError: continue
+            total -= size
+
+    def _store(self, key, img):
+        old = self.frames.pop(key, None)
+        if old is not None: self.bytes -= old.width * old.height * 3
+        self.frames[key] = img
+        self.bytes += img.width * img.height * 3
+        while self.bytes > self.max_bytes and len(self.frames) > 1:
+            _, old = self.frames.popitem(last=False)
+            self.bytes -= old.width * old.height * 3
+
+# ==========================================
+#       PARALLEL THUMBNAIL PIPELINE
+# ==========================================
+def thumbnail_worker(filepath, size):
+    """ Pool entry point. Returns (mode, w, h, raw bytes, decode seconds) so nothing Tk-related crosses the
+        process boundary; the time is recorded by the parent (PERF lives there). """
+    started = time.perf_counter()
+    img = render_thumbnail(filepath, size)
+    if img is None: return None
+    if img.mode not in ("RGB", "RGBA", "L"): img = img.convert("RGB")
+    return img.mode, img.width, img.height, img.tobytes(), time.perf_counter() - started
+
+_decode_pool = None
+_decode_pool_lock = threading.Lock()
+
+def get_decode_pool(fallback=False):
+    """ Shared decode pool sized to the cores. Spawned processes avoid forking a live Tk process;
+        a thread pool is used if processes are unavailable. """
+    global _decode_pool
+    with _decode_pool_lock:
+        if fallback and isinstance(_decode_pool, ProcessPoolExecutor):
+            _decode_pool.shutdown(wait=False, cancel_futures=True)
+            _decode_pool = None
+        if _decode_pool is None:
+            workers = os.cpu_count() or 1
+            if fallback or workers == 1:
+                _decode_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+            else:
+                try: _decode_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                except (OSError, ValueError, NotImplementedError):
+                    _decode_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+        return _decode_pool
+
+class ThumbnailPipeline:
+    """ Cache lookups and pool decodes run off the Tk thread; PhotoImages are only created in
+        _drain (Tk thread), in small time-boxed batches. """
+    def __init__(self, root, store, on_ready, size=(80, 60), wants=None, videos=None):
+        self.root = root
+        self.store = store
+        self.videos = videos  # VideoFrameService: video thumbnails come from the frame the viewer also uses
+        self.on_ready = on_ready
+        self.wants = wants
+        self.size = size
+        self.results = queue.Queue()
+        self.generation = 0
+        self.feeders = 0  # running _feed threads: a scroll fetch can overlap the full-list feed
+        self.lock = threading.Lock()
+        self.draining = False
+
+    def start(self, folder, files):
+        self.generation += 1
+        self.fetch(folder, files)
+
+    def fetch(self, folder, files):
+        """ Queues extra files (e.g. evicted ribbon slots) without cancelling the current run. """
+        with self.lock: self.feeders += 1
+        threading.Thread(target=self._feed, args=(self.generation, folder, list(files)), daemon=True).start()
+        if not self.draining:
+            self.draining = True
+            self.root.after(15, self._drain)
+
+    def cancel(self):
+        self.generation += 1
+
+    def _feed(self, gen, folder, files):
+        pool = get_decode_pool()
+        window = (os.cpu_count() or 1) * 4
+        pending = {}
+        shared = set()  # Futures owned by the video service: other consumers may be waiting on them
+        try:
+            for idx, filename in enumerate(files):
+                if gen != self.generation: break
+                filepath = os.path.join(folder, filename)
+                img = self.store.get(filepath, self.size)
+                PERF.count("thumb.cache", hits=img is not None, misses=img is None)
+                if img is not None:
+                    self.results.put((gen, idx, filename, img))
+                    continue
+                if self.videos and os.path.splitext(filename)[1].lower() in VIDEO_EXTS:
+                    fut = self.videos.submit(filepath)
+                    shared.add(fut)
+                else:
+                    try: fut = pool.submit(thumbnail_worker, filepath, self.size)
+                    except Exception:
+                        pool = get_decode_pool(fallback=True)
+                        fut = pool.submit(thumbnail_worker, filepath, self.size)
+                pending[fut] = (idx, filename, filepath)
+                if len(pending) >= window:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done: self._collect(gen, fut, *pending.pop(fut))
+            for fut in list(pending):
+                if gen != self.generation:
+                    if fut not in shared: fut.cancel()
+                    del pending[fut]
+                    continue
+                self._collect(gen, fut, *pending.pop(fut))
+        finally:
+            self.store.flush()
+            with self.lock: self.feeders -= 1
+
+    def _collect(self, gen, fut, idx, filename, filepath):
+        try: raw = fut.result()
+        except BrokenExecutor: raw = thumbnail_worker(filepath, self.size)
+        except Exception: raw = None
+        img = None
+        if self.videos and isinstance(raw, Image.Image):  # Frame from the video service
+            img = video_thumbnail(raw, self.size)
+            self.store.put(filepath, self.size, img)
+        elif raw:
+            PERF.add("thumb.decode", raw[4])
+            img = Image.frombytes(raw[0], (raw[1], raw[2]), raw[3])
+            self.store.put(filepath, self.size, img)
+        elif os.path.splitext(filename)[1].lower() in VIDEO_EXTS and HAS_PIL:
+            # Placeholder is not cached so it gets replaced once OpenCV is available
+            img = video_placeholder_thumbnail(self.size)
+        if img is not None: self.results.put((gen, idx, filename, img))
+
+    def _drain(self):
+        deadline = time.perf_counter() + 0.012
+        while time.perf_counter() < deadline:
+            try: gen, idx, filename, img = self.results.get_nowait()
+            except queue.Empty: break
+            if gen != self.generation: continue
+            if self.wants and not self.wants(filename): continue
+            with PERF.timer("thumb.photoimage"): photo = ImageTk.PhotoImage(img)
+            self.on_ready(filename, photo)
+        if self.feeders or not self.results.empty():
+            self.root.after(15, self._drain)
+        else:
+            self.draining = False
+
+# ==========================================
+#       DECODE-AHEAD PREFETCH
+# ==========================================
+def load_screen_image(filepath, box):
+    """ Decodes an image oriented and downsized to fit box; JPEGs use reduced-scale DCT decoding. """
+    with PERF.timer("decode.open"):
+        img = Image.open(filepath)
+        orientation = img.getexif().get(0x0112, 1)
+    want = (box[1], box[0]) if orientation in (5, 6, 7, 8) else box
+    with PERF.timer("decode.load"):
+        if img.format == "JPEG": img.draft("RGB", want)
+        img.load()
+    with PERF.timer("decode.transpose"):
+        img = apply_orientation(img, orientation)
+        if img.mode not in ("RGB", "RGBA", "L"): img = img.convert("RGB")
+    if img.width > box[0] or img.height > box[1]:
+        with PERF.timer("decode.resize"): img.thumbnail(box, Image.Resampling.BILINEAR)
+    return img
+
+class ImagePrefetcher:
+    """ Background decoder for the neighbours of the current file. Keeps screen-sized images in an
+        LRU bounded by bytes; update() re-targets it after every navigation step. """
+    def __init__(self, ahead=4, max_bytes=512 * 1024 * 1024):
+        self.ahead = ahead
+        self.max_bytes = max_bytes
+        self.box = (1920, 1080)
+        self.cache = OrderedDict()  # (path, size, mtime) -> PIL image
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.targets = []
+        self.last = (None, -1)
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def configure(self, ahead=None, max_bytes=None, box=None):
+        with self.cond:
+            if ahead is not None: self.ahead = ahead
+            if max_bytes is not None: self.max_bytes = max_bytes
+            if box and box != self.box:
+                self.box = box
+                self.cache.clear()
+                self.bytes = 0
+            self._trim()
+
+    def _key(self, filepath):
+        # Keyed on size + mtime so a file replaced under the same name (rename runs) is never stale
+        st = os.stat(filepath)
+        return filepath, st.st_size, st.st_mtime_ns
+
+    def get(self, filepath):
+        try: key = self._key(filepath)
+        except OSError: key = None
+        with self.cond:
+            img = self.cache.get(key)
+            if img is None: self.misses += 1
+            else:
+                self.hits += 1
+                self.cache.move_to_end(key)
+        PERF.count("prefetch", hits=img is not None, misses=img is None)
+        return img
+
+    def put(self, filepath, img):
+        try: key = self._key(filepath)
+        except OSError: return
+        with self.cond:
+            self._store(key, img)
+
+    def update(self, folder, files, index, exts):
+        """ Queues the next files in the travel direction first, then a few behind. """
+        last_folder, last_index = self.last
+        direction = -1 if (folder == last_folder and index < last_index) else 1
+        self.last = (folder, index)
+        behind = max(1, self.ahead // 2)
+        order = []
+        for step in range(1, max(self.ahead, behind) + 1):
+            if step <= self.ahead: order.append(index + direction * step)
+            if step <= behind: order.append(index - direction * step)
+        targets = []
+        for i in order:
+            if 0 <= i < len(files) and os.path.splitext(files[i])[1].lower() in exts:
+                targets.append(os.path.join(folder, files[i]))
+        with self.cond:
+            self.targets = targets
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def move(self, mapping):
+        """ Follows files that were moved/renamed ({old path: new path}); a new path of None drops the image. """
+        with self.cond:
+            for key in [k for k in self.cache if k[0] in mapping]:
+                img = self.cache.pop(key)
+                if mapping[key[0]] is None: self.bytes -= self._size(img)
+                else: self.cache[(mapping[key[0]],) + key[1:]] = img
+
+    def stats(self):
+        with self.cond:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                    "cached": len(self.cache), "bytes": self.bytes, "max_bytes": self.max_bytes}
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.targets: self.cond.wait()
+                filepath = self.targets.pop(0)
+                if self.ahead <= 0: continue
+                box = self.box
+            try:
+                key = self._key(filepath)
+                if key in self.cache: continue
+                img = load_screen_image(filepath, box)
+            except Exception: continue
+            with self.cond:
+                if box == self.box: self._store(key, img)
+
+    def _size(self, img):
+        return img.width * img.height * len(img.getbands())
+
+    def _store(self, key, img):
+        old = self.cache.pop(key, None)
+        if old is not None: self.bytes -= self._size(old)
+        self.cache[key] = img
+        self.bytes += self._size(img)
+        self._trim()
+
+    def _trim(self):
+        # Keep at least the newest image even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self.cache) > 1:
+            _, img = self.cache.popitem(last=False)
+            self.bytes -= self._size(img)
+
+# ==========================================
+#       ASYNC MAIN-IMAGE LOADING
+# ==========================================
+def load_media(filepath, kind, box):
+    """ Worker-side decode. kind: 'screen' (oriented, fit to box), 'full' (oriented, full res) or 'video' (frame fit
+        to box; the viewer goes through VideoFrameService instead). """
+    if kind == "screen":
+        return load_screen_image(filepath, box)
+    if kind == "full":
+        with PERF.timer("decode.open"):
+            img = Image.open(filepath)
+            orientation = img.getexif().get(0x0112, 1)
+        with PERF.timer("decode.load_full"): img.load()
+        with PERF.timer("decode.transpose"): return apply_orientation(img, orientation)
+    if kind == "video" and HAS_CV2:
+        with PERF.timer("decode.video"): raw = extract_video_frame(filepath, box)
+        if raw: return Image.frombytes("RGB", raw[:2], raw[2])
+    return None
+
+class MediaLoader:
+    """ Single background decoder where the newest request wins: requests that were superseded before
+        the worker got to them are never decoded, and results carry the generation they were asked for. """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = None
+        self.results = queue.Queue()
+        self.thread = None
+
+    def request(self, gen, filepath, kind, box):
+        with self.cond:
+            self.pending = (gen, filepath, kind, box)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None: self.cond.wait()
+                gen, filepath, kind, box = self.pending
+                self.pending = None
+            try: img = load_media(filepath, kind, box)
+            except Exception: img = None
+            self.results.put((gen, filepath, kind, img))
+
+# ==========================================
+#       ZOOM / PAN IMAGE PYRAMID
+# ==========================================
+class ImagePyramid:
+    """ 1/2, 1/4, ... reductions of one image, built on first use. render() resamples only the part
+        of the image that lands inside the viewport, from the smallest level with enough pixels. """
+    MIN_LEVEL_SIDE = 256
+
+    def __init__(self, base):
+        self.base = base
+        self.levels = [base]
+
+    def level_for(self, scale):
+        """ Returns (level index, image) for a display scale in display px per base px. """
+        n = 0
+        while scale * (2 ** (n + 1)) <= 1.0:
+            if len(self.levels) <= n + 1:
+                last = self.levels[-1]
+                if min(last.size) // 2 < self.MIN_LEVEL_SIDE: break
+                self.levels.append(last.reduce(2))
+            n += 1
+        return n, self.levels[n]
+
+    def render(self, scale, left, top, view_w, view_h):
+        """ Image drawn at 'scale' with its top-left corner at (left, top) in view coordinates.
+            Returns (crop image, x, y) covering the visible part, or None if nothing is visible. """
+        iw, ih = self.base.size
+        x0, y0 = max(0, left), max(0, top)
+        x1, y1 = min(view_w, left + iw * scale), min(view_h, top + ih * scale)
+        if x1 - x0 < 1 or y1 - y0 < 1: return None
+        n, level = self.level_for(scale)
+        f = 2 ** n  # base px per level px
+        box = ((x0 - left) / scale / f, (y0 - top) / scale / f, (x1 - left) / scale / f, (y1 - top) / scale / f)
+        box = (max(0, box[0]), max(0, box[1]), min(level.width, box[2]), min(level.height, box[3]))
+        out_w, out_h = max(1, int(round(x1 - x0))), max(1, int(round(y1 - y0)))
+        return level.resize((out_w, out_h), Image.Resampling.BILINEAR, box=box), int(x0), int(y0)
+
+# ==========================================
+#       VIRTUALIZED RIBBON
+# ==========================================
+class RibbonStrip:
+    """ Horizontal thumbnail strip drawn on one canvas. Only the slots in view (plus a margin) exist
+        as canvas items and are re-bound while scrolling; colors come from color_for(filename). """
+    SLOT_W = 88
+    SLOT_H = 66
+    HEIGHT = 90
+    MARGIN = 8
+
+    def __init__(self, parent, on_click, color_for, on_missing=None, bg="#e0e0e0", max_images=1500):
+        self.on_click = on_click
+        self.color_for = color_for
+        self.on_missing = on_missing
+        self.max_images = max_images
+        self.files = []
+        self.index = {}
+        self.images = OrderedDict()  # filename -> PhotoImage, LRU
+        self.requested = set()
+        self.slots = []              # [bg rect, image item, bound index, bound image, bound color]
+        self.current = -1
+        self.render_pending = False
+
+        self.scroll = ttk.Scrollbar(parent, orient="horizontal", command=self._on_scrollbar)
+        self.scroll.pack(side="bottom", fill="x")
+        self.canvas = tk.Canvas(parent, height=self.HEIGHT, bg=bg, highlightthickness=0, xscrollcommand=self._on_xscroll)
+        self.canvas.pack(side="top", fill="x", expand=True)
+        self.cursor = self.canvas.create_rectangle(0, 0, 0, 0, outline="#1e1e1e", width=2, state="hidden")
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_render())
+        self.canvas.bind("<Button-1>", self._on_press)
+        self.canvas.bind("<MouseWheel>", lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        self.canvas.bind("<Button-4>", lambda e: self._wheel(-1))
+        self.canvas.bind("<Button-5>", lambda e: self._wheel(1))
+
+    # --- Model ---
+    def set_files(self, files, pending=True):
+        """ pending: a full pipeline run is about to deliver every thumbnail, so don't ask for them. """
+        self.files = files
+        self.index = {f: i for i, f in enumerate(files)}
+        self.images.clear()
+        self.requested = set(files) if pending else set()
+        self.current = -1
+        self.canvas.configure(scrollregion=(0, 0, max(1, len(files) * self.SLOT_W), self.HEIGHT))
+        self.canvas.xview_moveto(0)
+        for slot in self.slots: slot[2] = slot[3] = slot[4] = None
+        self.schedule_render()
+
+    def extend(self, files):
+        """ files were just appended to the shared list: index them and grow the strip. Their thumbnails
+            are requested through on_missing as they scroll into view. """
+        for i, f in enumerate(files, len(self.index)): self.index[f] = i
+        self.canvas.configure(scrollregion=(0, 0, max(1, len(self.files) * self.SLOT_W), self.HEIGHT))
+        self.schedule_render()
+
+    def reorder(self, pending=True):
+        """ The shared list was re-sorted or filtered in place; thumbnails of files still in it are kept.
+            pending: a pipeline run is about to deliver the rest, so don't ask for them. """
+        self.index = {f: i for i, f in enumerate(self.files)}
+        for f in [f for f in self.images if f not in self.index]: del self.images[f]
+        self.requested = {f for f in self.files if f not in self.images} if pending else set()
+        for slot in self.slots: slot[2] = slot[3] = slot[4] = None
+        self.canvas.configure(scrollregion=(0, 0, max(1, len(self.files) * self.SLOT_W), self.HEIGHT))
+        self.schedule_render()
+
+    def rename_items(self, mapping):
+        """ Batch rename; safe for swaps (A->B, B->A) because nothing is re-keyed one entry at a time. """
+        self.index = {mapping.get(f, f): i for f, i in self.index.items()}
+        self.images = OrderedDict((mapping.get(f, f), img) for f, img in self.images.items())
+        for slot in self.slots: slot[3] = None
+        self.schedule_render()
+
+    def set_thumbnail(self, filename, thumb):
+        self.images[filename] = thumb
+        self.images.move_to_end(filename)
+        self.requested.discard(filename)
+        while len(self.images) > self.max_images: self.images.popitem(last=False)
+        if filename in self.index: self.schedule_render()
+
+    def wants(self, filename):
+        """ Whether a decoded thumbnail is worth a PhotoImage now (near the view, or room to spare). """
+        if len(self.images) < self.max_images: return True
+        idx = self.index.get(filename)
+        first, last = self.visible_range()
+        span = last - first + 1
+        if idx is not None and first - 3 * span <= idx <= last + 3 * span: return True
+        # Dropped: let render() ask for it again once it scrolls into view
+        self.requested.discard(filename)
+        return False
+
+    def refresh_item(self, filename):
+        """ Re-reads the color for one file (label/group changed). """
+        idx = self.index.get(filename)
+        for slot in self.slots:
+            if slot[2] == idx: slot[4] = None
+        self.schedule_render()
+
+    def set_current(self, idx):
+        self.current = idx
+        if 0 <= idx < len(self.files):
+            left = self.canvas.canvasx(0)
+            cw = self.canvas.winfo_width()
+            x = idx * self.SLOT_W
+            total = len(self.files) * self.SLOT_W
+            if total > cw and (x < left or x + self.SLOT_W > left + cw):
+                self.canvas.xview_moveto(max(0, x - cw / 2 + self.SLOT_W / 2) / total)
+        self.schedule_render()
+
+    # --- View ---
+    def visible_range(self):
+        left = self.canvas.canvasx(0)
+        cw = max(self.canvas.winfo_width(), self.SLOT_W)
+        first = int(left // self.SLOT_W) - self.MARGIN
+        last = int((left + cw) // self.SLOT_W) + self.MARGIN
+        return max(0, first), min(len(self.files) - 1, last)
+
+    def schedule_render(self):
+        if not self.render_pending:
+            self.render_pending = True
+            self.canvas.after_idle(self.render)
+
+    def render(self):
+        self.render_pending = False
+        first, last = self.visible_range()
+        count = max(0, last - first + 1)
+        while len(self.slots) < count:
+            rect = self.canvas.create_rectangle(0, 0, 0, 0, outline="")
+            img = self.canvas.create_image(0, 0)
+            self.slots.append([rect, img, None, None, None])
+        self.canvas.tag_raise(self.cursor)
+        top = (self.HEIGHT - self.SLOT_H) // 2
+        missing = []
+        for n, slot in enumerate(self.slots):
+            idx = first + n
+            if n >= count:
+                if slot[2] is not None:
+                    self.canvas.itemconfigure(slot[0], state="hidden")
+                    self.canvas.itemconfigure(slot[1], state="hidden")
+                    slot[2] = slot[3] = slot[4] = None
+                continue
+            fname = self.files[idx]
+            thumb = self.images.get(fname)
+            color = self.color_for(fname)
+            if slot[2] != idx:
+                x = idx * self.SLOT_W
+                self.canvas.coords(slot[0], x + 1, top, x + self.SLOT_W - 1, top + self.SLOT_H)
+                self.canvas.coords(slot[1], x + self.SLOT_W / 2, self.HEIGHT / 2)
+                self.canvas.itemconfigure(slot[0], state="normal")
+                self.canvas.itemconfigure(slot[1], state="normal")
+                slot[2] = idx
+            if slot[3] is not thumb:
+                self.canvas.itemconfigure(slot[1], image=thumb if thumb is not None else "")
+                slot[3] = thumb
+            if slot[4] != color:
+                self.canvas.itemconfigure(slot[0], fill=color)
+                slot[4] = color
+            if thumb is None:
+                if fname not in self.requested: missing.append(fname)
+            else:
+                self.images.move_to_end(fname)
+        if first <= self.current <= last:
+            x = self.current * self.SLOT_W
+            self.canvas.coords(self.cursor, x + 1, top, x + self.SLOT_W - 1, top + self.SLOT_H)
+            self.canvas.itemconfigure(self.cursor, state="normal")
+        else:
+            self.canvas.itemconfigure(self.cursor, state="hidden")
+        if missing and self.on_missing:
+            self.requested.update(missing)
+            self.on_missing(missing)
+
+    # --- Events ---
+    def _on_xscroll(self, first, last):
+        self.scroll.set(first, last)
+        self.schedule_render()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.xview(*args)
+
+    def _wheel(self, direction):
+        self.canvas.xview_scroll(direction * 3, "units")
+
+    def _on_press(self, event):
+        idx = int(self.canvas.canvasx(event.x) // self.SLOT_W)
+        if 0 <= idx < len(self.files): self.on_click(idx)
 
 class PhotoOrganizerApp:
     def __init__(self, root):
@@ -35,61 +1032,102 @@ class PhotoOrganizerApp:
         self.set_window_icon()
 
         # --- State Data ---
-        self.vlc_path = self.find_vlc()
+        self.settings = load_settings()
         
         # Visual Sorter Data
         self.visual_source_dir = ""
         self.visual_output_dir = "" 
+        self.visual_backup_dirs = []
         self.image_files = [] 
         self.file_labels = {}         
         self.file_renames_sorted = {} 
         self.current_image_index = -1
+        self.sort_job = None
+        self.visual_scan = None
+        self.visual_watch = None
         
         # Smart Renamer Data
         self.renamer_source_dir = ""
         self.renamer_files = []
         self.file_groups = {} # {filename: "Group 1"}
         self.current_renamer_index = -1
+        self.renamer_scan = None
+        self.renamer_watch = None
         
         # Shared/Canvas State
         self.pil_image_raw = None     
         self.img_scale = 1.0
         self.img_pos_x = 0
         self.img_pos_y = 0
+        self.pil_image_path = None
+        self.pil_image_state = None  # 'placeholder' (upscaled thumb), 'preview' (screen-sized) or 'full'
+        self.media_loader = MediaLoader()
+        self.load_generation = 0
+        self.load_waiting = False
+        self.load_poll_job = None
+        self.pyramid = None
+        self.display_canvas = None
+        self.display_name = ""
+        self.display_is_video = False
+        self.rendered_rect = None
+        self.redraw_job = None
+        self.last_render_time = 0.0
+        self.display_started = 0.0
+        self.var_perf_hud = tk.BooleanVar(value=False)
+        self.hud_job = None
+        self.profiler = None
+        self.prefetcher = ImagePrefetcher(ahead=self.settings["prefetch_ahead"],
+                                          max_bytes=self.settings["prefetch_memory_mb"] * 1024 * 1024)
+        self.prefetcher.configure(box=(root.winfo_screenwidth(), root.winfo_screenheight()))
+        self.video_frames = VideoFrameService(box=self.prefetcher.box) if HAS_CV2 and HAS_PIL else None
         
-        # Ribbon Data
-        self.thumb_cache = {} 
-        self.ribbon_widgets = {} 
-        self.thumb_cache_renamer = {}
-        self.ribbon_widgets_renamer = {}
+        # Ribbon Data (strips and pipelines are created with their tabs)
+        self.thumb_store = ThumbnailCache()
+        self.metadata = MetadataIndex()
 
         # --- UI Layout ---
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Tab 1: Visual Sorter
-        self.tab_visual = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_visual, text="Visual Sorter")
+        # Only the first tab is built now; the others are built the first time they are selected
+        self.tab_builders = {}
+        self.tab_visual = self.add_tab("Visual Sorter")
+        self.tab_renamer = self.add_tab("Smart Group & Renamer", self.init_smart_rename_tab)
+        self.tab_sequence = self.add_tab("Sequence Sorter", self.init_sequence_tab)
+        self.tab_settings = self.add_tab("Settings", self.init_settings_tab)
+        self.tab_help = self.add_tab("Help", self.init_help_tab)
         self.init_visual_tab()
-        
-        # Tab 2: Smart Renamer (New)
-        self.tab_renamer = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_renamer, text="Smart Group & Renamer")
-        self.init_smart_rename_tab()
-
-        # Tab 3: Sequence Sorter
-        self.tab_sequence = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_sequence, text="Sequence Sorter")
-        self.init_sequence_tab()
 
-        # Tab 4: Help (New)
-        self.tab_help = ttk.Frame(self.notebook)
-        self.notebook.add(self.tab_help, text="Help")
-        self.init_help_tab()
+        # Both viewers share one image state; re-show the current file when switching between them
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        self.root.bind("<F3>", self.toggle_perf_hud)
+        pipelines = lambda: [p for p in (getattr(self, "thumb_pipeline", None), getattr(self, "thumb_pipeline_renamer", None)) if p]
+        PERF.gauge("thumb.queue", lambda: sum(p.results.qsize() for p in pipelines()))
+        PERF.gauge("thumb_cache.mb", lambda: round(self.thumb_store.total_bytes / 1048576, 1))
+        PERF.gauge("prefetch.cached_mb", lambda: round(self.prefetcher.stats()["bytes"] / 1048576, 1))
+        if self.video_frames:
+            PERF.gauge("video.cached_mb", lambda: round(self.video_frames.stats()["bytes"] / 1048576, 1))
+            PERF.gauge("video.timeouts", lambda: self.video_frames.stats()["timeouts"])
 
         if not HAS_CV2:
             ttk.Label(root, text="Warning: OpenCV (cv2) not found. Video thumbnails will be placeholders.", foreground="red").pack(pady=2)
 
+    def add_tab(self, text, build=None):
+        """ build (if given) runs the first time the tab is selected. """
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        if build: self.tab_builders[str(frame)] = build
+        return frame
+
+    def on_tab_changed(self, event=None):
+        build = self.tab_builders.pop(self.notebook.select(), None)
+        if build: build()
+        current_tab = self.notebook.index(self.notebook.select())
+        if current_tab == 0 and self.image_files and self.display_canvas is not self.image_canvas:
+            self.show_image()
+        elif current_tab == 1 and self.renamer_files and self.display_canvas is not self.renamer_canvas:
+            self.show_image_renamer()
+
     def set_window_icon(self):
         try:
             if getattr(sys, 'frozen', False):
@@ -109,6 +1147,11 @@ class PhotoOrganizerApp:
         except Exception:
             pass
 
+    @cached_property
+    def vlc_path(self):
+        """ Looked up on the first external video open rather than at startup. """
+        return self.find_vlc()
+
     def find_vlc(self):
         paths = []
         if sys.platform == 'win32':
@@ -138,7 +1181,13 @@ class PhotoOrganizerApp:
         self.lbl_visual_output.grid(row=0, column=3, padx=5, pady=5, sticky="ew")
 
         self.var_move_related = tk.BooleanVar(value=True)
-        ttk.Checkbutton(top_frame, text="Include Related Files (RAW/XMP/Sidecars)", variable=self.var_move_related).grid(row=1, column=0, columnspan=4, sticky="w", padx=5, pady=(0,5))
+        ttk.Checkbutton(top_frame, text="Include Related Files (RAW/XMP/Sidecars)", variable=self.var_move_related).grid(row=1, column=0, columnspan=2, sticky="w", padx=5, pady=(0,5))
+        f_backup = ttk.Frame(top_frame)
+        f_backup.grid(row=1, column=2, columnspan=2, sticky="ew", padx=5, pady=(0, 5))
+        ttk.Button(f_backup, text="+ Backup Destination", command=self.add_backup_folder).pack(side="left")
+        ttk.Button(f_backup, text="Clear", command=self.clear_backup_folders, width=6).pack(side="left", padx=5)
+        self.lbl_visual_backups = ttk.Label(f_backup, text="No backup copies", foreground="gray", anchor="w")
+        self.lbl_visual_backups.pack(side="left", fill="x", expand=True)
 
         # 2. Main Canvas
         self.canvas_container = tk.Frame(self.tab_visual, bg="#222")
@@ -151,16 +1200,11 @@ class PhotoOrganizerApp:
         ribbon_frame = ttk.Frame(self.tab_visual, height=110)
         ribbon_frame.pack(fill="x", padx=10, pady=5)
         
-        self.ribbon_scroll = ttk.Scrollbar(ribbon_frame, orient="horizontal")
-        self.ribbon_scroll.pack(side="bottom", fill="x")
-        
-        self.ribbon_canvas = tk.Canvas(ribbon_frame, height=90, bg="#e0e0e0", xscrollcommand=self.ribbon_scroll.set)
-        self.ribbon_canvas.pack(side="top", fill="x", expand=True)
-        self.ribbon_scroll.config(command=self.ribbon_canvas.xview)
-        
-        self.ribbon_inner = tk.Frame(self.ribbon_canvas, bg="#e0e0e0")
-        self.ribbon_window_id = self.ribbon_canvas.create_window((0,0), window=self.ribbon_inner, anchor="nw")
-        self.ribbon_inner.bind("<Configure>", lambda e: self.ribbon_canvas.configure(scrollregion=self.ribbon_canvas.bbox("all")))
+        self.ribbon = RibbonStrip(ribbon_frame, on_click=self.jump_to_index,
+                                  color_for=lambda f: self.colors.get(self.file_labels.get(f, "Unmarked"), "#e0e0e0"),
+                                  on_missing=lambda names: self.thumb_pipeline.fetch(self.visual_source_dir, names))
+        self.thumb_pipeline = ThumbnailPipeline(self.root, self.thumb_store, self.ribbon.set_thumbnail, wants=self.ribbon.wants,
+                                                videos=self.video_frames)
 
         # 4. Bottom Controls
         btm_frame = ttk.Frame(self.tab_visual)
@@ -197,8 +1241,8 @@ class PhotoOrganizerApp:
 
         self.bind_events(self.image_canvas)
 
-        self.ext_imgs = {".jpg", ".jpeg", ".png", ".bmp", ".gif", ".webp", ".tiff"}
-        self.ext_vids = {".mp4", ".mov", ".avi", ".mkv", ".wmv", ".flv", ".webm", ".m4v"}
+        self.ext_imgs = IMAGE_EXTS
+        self.ext_vids = VIDEO_EXTS
 
     # ==========================================
     #           TAB 2: SMART RENAMER
@@ -209,6 +1253,7 @@ class PhotoOrganizerApp:
         top_frame.pack(fill="x", padx=10, pady=5)
         
         ttk.Button(top_frame, text="Select Source Folder", command=self.load_images_renamer).pack(side="left", padx=5, pady=5)
+        ttk.Button(top_frame, text="Undo Last Rename", command=self.undo_rename).pack(side="right", padx=5, pady=5)
         self.lbl_renamer_source = ttk.Label(top_frame, text="No source selected", foreground="gray")
         self.lbl_renamer_source.pack(side="left", padx=10)
 
@@ -223,16 +1268,11 @@ class PhotoOrganizerApp:
         r_frame = ttk.Frame(self.tab_renamer, height=110)
         r_frame.pack(fill="x", padx=10, pady=5)
         
-        self.r_scroll = ttk.Scrollbar(r_frame, orient="horizontal")
-        self.r_scroll.pack(side="bottom", fill="x")
-        
-        self.r_canvas = tk.Canvas(r_frame, height=90, bg="#e0e0e0", xscrollcommand=self.r_scroll.set)
-        self.r_canvas.pack(side="top", fill="x", expand=True)
-        self.r_scroll.config(command=self.r_canvas.xview)
-        
-        self.r_inner = tk.Frame(self.r_canvas, bg="#e0e0e0")
-        self.r_window_id = self.r_canvas.create_window((0,0), window=self.r_inner, anchor="nw")
-        self.r_inner.bind("<Configure>", lambda e: self.r_canvas.configure(scrollregion=self.r_canvas.bbox("all")))
+        self.r_ribbon = RibbonStrip(r_frame, on_click=self.jump_to_renamer_index,
+                                    color_for=lambda f: self.group_colors.get(self.file_groups.get(f, "Unassigned"), "#e0e0e0"),
+                                    on_missing=lambda names: self.thumb_pipeline_renamer.fetch(self.renamer_source_dir, names))
+        self.thumb_pipeline_renamer = ThumbnailPipeline(self.root, self.thumb_store, self.r_ribbon.set_thumbnail, wants=self.r_ribbon.wants,
+                                                        videos=self.video_frames)
 
         # 4. Bottom Controls
         btm_frame = ttk.Frame(self.tab_renamer)
@@ -309,7 +1349,149 @@ class PhotoOrganizerApp:
                 self.save_group()
 
     # ==========================================
-    #           TAB 4: HELP
+    #           TAB 4: SETTINGS
+    # ==========================================
+    def init_settings_tab(self):
+        frame = self.tab_settings
+        f_perf = ttk.LabelFrame(frame, text="Preview Prefetch")
+        f_perf.pack(fill="x", padx=20, pady=15)
+
+        ttk.Label(f_perf, text="Files decoded ahead:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        self.var_prefetch_ahead = tk.IntVar(value=self.settings["prefetch_ahead"])
+        ttk.Spinbox(f_perf, from_=0, to=20, textvariable=self.var_prefetch_ahead, width=8).grid(row=0, column=1, sticky="w", padx=5)
+
+        ttk.Label(f_perf, text="Memory budget (MB):").grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        self.var_prefetch_mb = tk.IntVar(value=self.settings["prefetch_memory_mb"])
+        ttk.Spinbox(f_perf, from_=32, to=8192, increment=32, textvariable=self.var_prefetch_mb, width=8).grid(row=1, column=1, sticky="w", padx=5)
+
+        self.lbl_prefetch_stats = ttk.Label(f_perf, text="", foreground="gray")
+        self.lbl_prefetch_stats.grid(row=2, column=0, columnspan=2, sticky="w", padx=5, pady=(0, 5))
+
+        f_io = ttk.LabelFrame(frame, text="File Operations")
+        f_io.pack(fill="x", padx=20, pady=5)
+        ttk.Label(f_io, text="Parallel file operations:").grid(row=0, column=0, sticky="w", padx=5, pady=5)
+        self.var_io_workers = tk.IntVar(value=self.settings["io_workers"])
+        ttk.Spinbox(f_io, from_=1, to=16, textvariable=self.var_io_workers, width=8).grid(row=0, column=1, sticky="w", padx=5)
+        ttk.Label(f_io, text="(1 for spinning disks / card readers, 4-8 for SSDs)", foreground="gray").grid(row=0, column=2, sticky="w", padx=5)
+        self.var_hardlink = tk.BooleanVar(value=self.settings["copy_mode"] == "hardlink")
+        ttk.Checkbutton(f_io, text="Copy = hardlink when source and destination share a volume (no extra disk space)",
+                        variable=self.var_hardlink, command=self.apply_settings).grid(row=1, column=0, columnspan=3, sticky="w", padx=5, pady=(0, 5))
+        ttk.Label(f_io, text="Verify copies:").grid(row=2, column=0, sticky="w", padx=5, pady=5)
+        self.verify_labels = {"off": "Off (fastest)", "hash": "Checksum + manifest", "readback": "Checksum + read-back"}
+        self.var_verify = tk.StringVar(value=self.verify_labels[self.settings["copy_verify"]])
+        cb_verify = ttk.Combobox(f_io, textvariable=self.var_verify, values=list(self.verify_labels.values()), state="readonly", width=22)
+        cb_verify.grid(row=2, column=1, columnspan=2, sticky="w", padx=5)
+        cb_verify.bind("<<ComboboxSelected>>", lambda e: self.apply_settings())
+
+        f_scan = ttk.LabelFrame(frame, text="Folder Scanning")
+        f_scan.pack(fill="x", padx=20, pady=5)
+        self.var_scan_subfolders = tk.BooleanVar(value=self.settings["scan_subfolders"])
+        ttk.Checkbutton(f_scan, text="Include subfolders (e.g. DCIM/100CANON, 101CANON)", variable=self.var_scan_subfolders,
+                        command=self.apply_settings).grid(row=0, column=0, columnspan=3, sticky="w", padx=5, pady=5)
+        ttk.Label(f_scan, text="Only files matching:").grid(row=1, column=0, sticky="w", padx=5, pady=5)
+        self.var_scan_include = tk.StringVar(value=self.settings["scan_include"])
+        ttk.Entry(f_scan, textvariable=self.var_scan_include, width=30).grid(row=1, column=1, sticky="w", padx=5)
+        ttk.Label(f_scan, text="(e.g. IMG_*, *.CR3 - empty = all media)", foreground="gray").grid(row=1, column=2, sticky="w", padx=5)
+        ttk.Label(f_scan, text="Skip folders/files:").grid(row=2, column=0, sticky="w", padx=5, pady=5)
+        self.var_scan_exclude = tk.StringVar(value=self.settings["scan_exclude"])
+        ttk.Entry(f_scan, textvariable=self.var_scan_exclude, width=30).grid(row=2, column=1, sticky="w", padx=5)
+        ttk.Label(f_scan, text="(applies the next time a folder is opened)", foreground="gray").grid(row=2, column=2, sticky="w", padx=5)
+        self.var_watch_folders = tk.BooleanVar(value=self.settings["watch_folders"])
+        ttk.Checkbutton(f_scan, text="Watch open folders for changes made by other apps (checks every 2 s)", variable=self.var_watch_folders,
+                        command=self.apply_settings).grid(row=3, column=0, columnspan=3, sticky="w", padx=5, pady=(0, 5))
+
+        f_diag = ttk.LabelFrame(frame, text="Performance Diagnostics")
+        f_diag.pack(fill="x", padx=20, pady=5)
+        ttk.Checkbutton(f_diag, text="Show timing overlay on the viewer (F3)", variable=self.var_perf_hud,
+                        command=self.toggle_perf_hud).pack(side="left", padx=5, pady=5)
+        ttk.Button(f_diag, text="Export Stats...", command=self.export_perf_stats).pack(side="left", padx=5)
+        ttk.Button(f_diag, text="Reset", width=6, command=PERF.reset).pack(side="left")
+        self.btn_profile = ttk.Button(f_diag, text="Start Profiling", command=self.toggle_profiling)
+        self.btn_profile.pack(side="left", padx=5)
+
+        for var in (self.var_prefetch_ahead, self.var_prefetch_mb, self.var_io_workers, self.var_scan_include, self.var_scan_exclude):
+            var.trace_add("write", lambda *a: self.apply_settings())
+        self.update_settings_stats()
+
+    def apply_settings(self):
+        try:
+            self.settings["prefetch_ahead"] = max(0, int(self.var_prefetch_ahead.get()))
+            self.settings["prefetch_memory_mb"] = max(32, int(self.var_prefetch_mb.get()))
+            self.settings["io_workers"] = max(1, int(self.var_io_workers.get()))
+            self.settings["copy_mode"] = "hardlink" if self.var_hardlink.get() else "auto"
+            self.settings["copy_verify"] = next(k for k, v in self.verify_labels.items() if v == self.var_verify.get())
+            self.settings["scan_subfolders"] = bool(self.var_scan_subfolders.get())
+            self.settings["scan_include"] = self.var_scan_include.get()
+            self.settings["scan_exclude"] = self.var_scan_exclude.get()
+            self.settings["watch_folders"] = bool(self.var_watch_folders.get())
+        except (tk.TclError, ValueError):
+            return  # Half-typed value in a spinbox
+        self.prefetcher.configure(ahead=self.settings["prefetch_ahead"],
+                                  max_bytes=self.settings["prefetch_memory_mb"] * 1024 * 1024)
+        save_settings(self.settings)
+
+    def update_settings_stats(self):
+        if self.notebook.select() == str(self.tab_settings):
+            st = self.prefetcher.stats()
+            self.lbl_prefetch_stats.config(text=f"Hit rate: {st['hit_rate']:.0%} ({st['hits']} hits / {st['misses']} misses)  |  "
+                                                f"{st['cached']} images, {st['bytes'] / 1048576:.0f} of {st['max_bytes'] / 1048576:.0f} MB")
+        self.root.after(1000, self.update_settings_stats)
+
+    # --- Performance HUD / Profiling ---
+    def toggle_perf_hud(self, event=None):
+        if event is not None: self.var_perf_hud.set(not self.var_perf_hud.get())  # F3; the checkbox sets it itself
+        if self.hud_job: self.root.after_cancel(self.hud_job)
+        self.hud_job = None
+        if self.display_canvas is not None: self.display_canvas.delete("hud")
+        if self.var_perf_hud.get(): self.update_perf_hud()
+
+    def update_perf_hud(self):
+        """ Redraws only the overlay items, twice a second, while the HUD is on. """
+        if self.display_canvas is not None: self.draw_perf_hud(self.display_canvas)
+        self.hud_job = self.root.after(500, self.update_perf_hud)
+
+    def draw_perf_hud(self, canvas):
+        canvas.delete("hud")
+        snap = PERF.snapshot()
+        lines = [f"{'stage':20} {'p50':>7} {'p90':>7} {'p99':>7} ms {'n':>6}"]
+        lines += [f"{name:20} {t['p50_ms']:7.1f} {t['p90_ms']:7.1f} {t['p99_ms']:7.1f}    {t['n']:6}" for name, t in snap["timings"].items()]
+        lines += [f"{name:20} {r['rate']:7.0%} hit of {r['hits'] + r['misses']}" for name, r in snap["hit_rates"].items() if r["rate"] is not None]
+        lines += [f"{name:20} {value:7g}" for name, value in snap["gauges"].items()]
+        item = canvas.create_text(canvas.winfo_width() - 16, 16, text="\n".join(lines), anchor="ne", fill="#7CFC00",
+                                  font=("Courier", 9), tags=("hud",))
+        x0, y0, x1, y1 = canvas.bbox(item)
+        canvas.create_rectangle(x0 - 6, y0 - 6, x1 + 6, y1 + 6, fill="#000000", stipple="gray50", outline="", tags=("hud",))
+        canvas.tag_raise(item)
+
+    def export_perf_stats(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+        if not path: return
+        try: PERF.export(path)
+        except OSError as e: messagebox.showerror("Error", f"Could not save stats: {e}")
+
+    def toggle_profiling(self):
+        """ cProfile of the Tk thread, where stalls are felt; worker threads/processes show up in the PERF timings.
+            Saves a .prof (snakeviz, pstats) plus a .txt of the top functions by cumulative time. """
+        import cProfile
+        import pstats
+        if self.profiler is None:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            self.btn_profile.config(text="Stop Profiling and Save...")
+            return
+        profiler, self.profiler = self.profiler, None
+        profiler.disable()
+        self.btn_profile.config(text="Start Profiling")
+        path = filedialog.asksaveasfilename(defaultextension=".prof", filetypes=[("cProfile", "*.prof")])
+        if not path: return
+        try:
+            profiler.dump_stats(path)
+            with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(60)
+        except OSError as e: messagebox.showerror("Error", f"Could not save profile: {e}")
+
+    # ==========================================
+    #           TAB 5: HELP
     # ==========================================
     def init_help_tab(self):
         # Main container with scrollbar
@@ -338,7 +1520,11 @@ Instructions:
    - Green: Moves to 'Green' folder (Good photos).
    - Yellow: Moves to 'Yellow' folder (Review Later).
    - Red: PERMANENTLY DELETES the file from disk.
-5. Click 'SORT NOW' to execute moves/deletes.
+5. Click 'SORT NOW' to execute moves/deletes. Progress is shown and the sort can be cancelled.
+6. (Optional) '+ Backup Destination' writes every sorted file to extra drives too (e.g. a working SSD
+   and a backup). Each file is read from the card once and written to all destinations at the same time;
+   a failing drive is reported without stopping the others. With 'Move', the original is only removed
+   once every copy succeeded. The Sequence Sorter has the same option.
 
 Shortcuts:
 - Cmd + 1: Mark as Green
@@ -364,6 +1550,8 @@ Instructions:
 6. (Optional) Enter Camera Name. If blank, it tries to read metadata.
 7. Select Action: Rename (Default), Move to new folder, or Copy to new folder.
 8. Result: 'Transit_001.mov' or 'Transit_001_FX30.mov'.
+9. 'Preview...' lists every new name first. If a name is already taken, nothing is changed.
+   Renames and moves are all-or-nothing; 'Undo Last Rename' restores the previous names.
 
 Shortcuts:
 - Cmd + 1: Assign to Group 1
@@ -382,12 +1570,35 @@ Instructions:
 2. Paste shorthand sequence: "1210,1,5, 67, 347, 4728".
 3. App interprets as: 1210, 1211, 1215, 1267, 1347, 4728.
 4. Set Prefix (IMG_) and Extensions (JPG,CR2,ARW).
-5. Click Process to copy/move those specific files.
+5. Click Process to copy/move those specific files. Extensions match in any case (jpg = JPG).
+   The log lists numbers with no matching file, and other file types found for a number
+   (e.g. a .HEIC you did not ask for).
+
+TAB 4: SETTINGS
+-----------------------------------------
+- Files decoded ahead: how many upcoming images are prepared in the background while you browse.
+- Memory budget: RAM used for those prepared images. The hit rate shows how often Next/Prev was instant.
+- Parallel file operations: how many files SORT NOW moves/copies at once. Use 1 for spinning disks.
+- Hardlink copies: on the same drive, 'Copy' creates a second name for the same data instead of duplicating it.
+  Editing one copy then changes both. Moves within a drive are always instant renames.
+- Folder scanning: opening a folder also lists media in its subfolders (a whole memory card at once),
+  sorted by capture time. The first photos appear while the rest is still being scanned. 'Skip' lists
+  folder/file names to ignore; by default hidden files and the Green/Yellow/Red output folders.
+  'Watch open folders' picks up files added, renamed or deleted by other apps without reopening.
+- Verify copies: hashes every copied file (BLAKE2b) while it is written and saves a MANIFEST.b2sum
+  in each destination folder ('b2sum -c MANIFEST.b2sum' re-checks a delivery). 'Read-back' also
+  re-reads each written file from the drive and compares it before the next file starts.
 
 GENERAL NOTES
 -----------------------------------------
-- Video Support: Videos play in external player (VLC recommended).
+- Video Support: Videos play in external player (VLC recommended). One frame per clip is extracted (OpenCV)
+  for both the thumbnail and the preview, cached on disk; a clip that hangs the decoder is skipped after 10 s.
 - Related Files: If enabled, sorting a JPG will also move the matching RAW/XMP file.
+- Performance Diagnostics (Settings, or F3 in a viewer): overlay with p50/p90/p99 times for decode,
+  resize, PhotoImage, thumbnails and file operations, cache hit rates and queue depths. 'Export Stats'
+  saves them as JSON/CSV; 'Start Profiling' records a cProfile session of the UI thread.
+- Command line (no window): photo_organizer.py sort|rename|sequence ... --help
+  sorts a label list (JSON or CSV 'file,label'), renames groups ('file,scene') or picks a sequence.
 
 Credits:
 -----------------------------------------
@@ -404,31 +1615,44 @@ Credits:
     # ==========================================
     def load_images_renamer(self):
         folder = filedialog.askdirectory()
-        if not folder: return
+        if folder: self.open_renamer_folder(folder)
+
+    def open_renamer_folder(self, folder, keep_groups=False):
         self.renamer_source_dir = folder
         self.lbl_renamer_source.config(text=folder)
-        
-        valid_exts = self.ext_imgs.union(self.ext_vids)
-        try:
-            files = [f for f in os.listdir(folder) if os.path.splitext(f)[1].lower() in valid_exts]
-            files.sort()
-            self.renamer_files = files
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-            return
-
-        self.file_groups = {}
+        if not keep_groups: self.file_groups = {}
+        self.renamer_files = []
         self.current_renamer_index = 0
-        self.ribbon_widgets_renamer = {}
-        
-        for w in self.r_inner.winfo_children(): w.destroy()
-        
-        if self.renamer_files:
-            self.show_image_renamer()
-            threading.Thread(target=self.generate_thumbnails_renamer_thread, daemon=True).start()
-        else:
-            self.renamer_canvas.delete("all")
-            self.renamer_canvas.create_text(400, 300, text="No Media Found", fill="white")
+        self.r_ribbon.set_files(self.renamer_files, pending=False)
+        self.thumb_pipeline_renamer.cancel()
+        self.show_canvas_message(self.renamer_canvas, "Scanning...")
+        self.start_folder_watch("renamer_watch", None, "renamer")
+        self.start_folder_scan("renamer_scan", folder, self.on_renamer_files, self.on_renamer_scan_done)
+
+    def on_renamer_files(self, files):
+        first = not self.renamer_files
+        self.renamer_files.extend(files)
+        self.r_ribbon.extend(files)
+        if first: self.show_image_renamer()
+        else: self.lbl_renamer_counter.config(text=f"{self.current_renamer_index + 1} / {len(self.renamer_files)}")
+
+    def on_renamer_scan_done(self, files, error=None):
+        if error: messagebox.showerror("Error", error)
+        else: self.start_folder_watch("renamer_watch", self.renamer_source_dir, "renamer")
+        current = self.renamer_files[self.current_renamer_index] if self.renamer_files else None
+        self.renamer_files[:] = files
+        present = set(files)
+        self.file_groups = {f: g for f, g in self.file_groups.items() if f in present}
+        self.r_ribbon.reorder()
+        if not self.renamer_files:
+            self.show_canvas_message(self.renamer_canvas, "No Media Found")
+            return
+        self.thumb_pipeline_renamer.start(self.renamer_source_dir, self.renamer_files)
+        self.current_renamer_index = self.renamer_files.index(current) if current in present else 0
+        if current == self.renamer_files[self.current_renamer_index]:
+            self.lbl_renamer_counter.config(text=f"{self.current_renamer_index + 1} / {len(self.renamer_files)}")
+            self.r_ribbon.set_current(self.current_renamer_index)
+        else: self.show_image_renamer()
 
     def show_image_renamer(self):
         if not self.renamer_files: return
@@ -440,10 +1664,10 @@ Credits:
         self.var_renamer_group.set(grp)
         
         # Highlight Ribbon
-        if filename in self.ribbon_widgets_renamer:
-             self.ensure_ribbon_visible(self.ribbon_widgets_renamer[filename], self.r_canvas, self.r_inner)
+        self.r_ribbon.set_current(self.current_renamer_index)
 
         self.display_media_on_canvas(self.renamer_canvas, self.renamer_source_dir, filename)
+        self.prefetcher.update(self.renamer_source_dir, self.renamer_files, self.current_renamer_index, self.ext_imgs)
 
     def save_group(self):
         if not self.renamer_files: return
@@ -452,9 +1676,7 @@ Credits:
         self.file_groups[fname] = grp
         
         # Update Ribbon Color
-        if fname in self.ribbon_widgets_renamer:
-            color = self.group_colors.get(grp, "#e0e0e0")
-            self.ribbon_widgets_renamer[fname].config(bg=color)
+        self.r_ribbon.refresh_item(fname)
 
     def prev_image_renamer(self):
         if self.current_renamer_index > 0:
@@ -478,7 +1700,7 @@ Credits:
 
         dlg = tk.Toplevel(self.root)
         dlg.title("Process Groups")
-        dlg.geometry("450x400")
+        dlg.geometry("450x430")
         
         ttk.Label(dlg, text="Batch Rename Group", font=("Arial", 12, "bold")).pack(pady=10)
         
@@ -513,184 +1735,204 @@ Credits:
         ttk.Radiobutton(f_actions, text="Copy to New Folder", variable=var_action, value="copy").pack(anchor="w", pady=2)
         ttk.Label(f_actions, text="*New Folder will be named after Scene", font=("Arial", 8), foreground="gray").pack(anchor="w", padx=20)
 
-        def run_rename():
+        def build_plan():
+            """ Full source -> target mapping for the selected group, checked for conflicts (nothing touched yet). """
             target_group = var_grp.get()
             scene = e_scene.get().strip()
             manual_cam = e_cam.get().strip()
-            action = var_action.get()
-            
             if not scene:
                 messagebox.showerror("Error", "Scene Name is required!")
-                return
+                return None
             
             # 1. Collect files in group
             files_in_group = [f for f, g in self.file_groups.items() if g == target_group]
             if not files_in_group:
                 messagebox.showerror("Error", f"No files assigned to {target_group}")
-                return
+                return None
 
-            # 2. Sort Chronologically (Metadata or File Date)
-            files_with_dates = []
-            for f in files_in_group:
-                full_path = os.path.join(self.renamer_source_dir, f)
-                date_taken = self.get_date_taken(full_path)
-                files_with_dates.append((f, date_taken))
-            
-            # Sort by date
-            files_with_dates.sort(key=lambda x: x[1])
-            
-            # 3. Prepare Paths
-            dest_dir = self.renamer_source_dir
-            if action in ["move", "copy"]:
-                safe_scene_folder = "".join([c for c in scene if c.isalnum() or c in (' ', '_', '-')]).strip()
-                dest_dir = os.path.join(self.renamer_source_dir, safe_scene_folder)
-                if not os.path.exists(dest_dir):
-                    try: os.makedirs(dest_dir)
-                    except Exception as e:
-                        messagebox.showerror("Error", f"Could not create folder: {e}")
-                        return
-
-            # 4. Rename Loop
-            count = 0
-            for idx, (fname, _) in enumerate(files_with_dates):
-                src_path = os.path.join(self.renamer_source_dir, fname)
-                ext = os.path.splitext(fname)[1]
-                
-                # Determine Camera Name
-                cam_name = manual_cam
-                if not cam_name:
-                    cam_name = self.get_camera_model(src_path)
-                
-                # Sanitize inputs
-                safe_scene = "".join([c for c in scene if c.isalnum() or c in (' ', '_', '-')]).strip()
-                
-                # Format Filename
-                if cam_name:
-                    safe_cam = "".join([c for c in cam_name if c.isalnum() or c in (' ', '_', '-')]).strip()
-                    new_name = f"{safe_scene}_{str(idx+1).zfill(3)}_{safe_cam}{ext}"
-                else:
-                    # No Camera Name logic
-                    new_name = f"{safe_scene}_{str(idx+1).zfill(3)}{ext}"
-                
-                new_path = os.path.join(dest_dir, new_name)
-                
-                try:
-                    if action == "rename":
-                        # Standard Rename
-                        os.rename(src_path, new_path)
-                        # Update internal lists if renamed in place
-                        if new_name != fname:
-                            self.renamer_files[self.renamer_files.index(fname)] = new_name
-                            self.file_groups[new_name] = self.file_groups.pop(fname)
-                            if fname in self.ribbon_widgets_renamer:
-                                self.ribbon_widgets_renamer[new_name] = self.ribbon_widgets_renamer.pop(fname)
-                    elif action == "move":
-                        shutil.move(src_path, new_path)
-                        # For simplicity, we don't update the view for moved files out of root
-                        # as they are now "gone" from source dir perspective
-                    elif action == "copy":
-                        shutil.copy2(src_path, new_path)
-                    
-                    count += 1
-                except Exception as e:
-                    print(f"Failed to process {fname}: {e}")
+            # 2. Chronological names (metadata is usually already indexed in the background)
+            dest_dir = None  # None: rename next to the original (which may sit in a subfolder)
+            if var_action.get() in ["move", "copy"]: dest_dir = os.path.join(self.renamer_source_dir, safe_name_part(scene))
+            pairs = group_rename_pairs([os.path.join(self.renamer_source_dir, f) for f in files_in_group], scene,
+                                       manual_cam, dest_dir, self.metadata)
+            return plan_renames(pairs), dest_dir
 
+        def preview():
+            plan = build_plan()
+            if plan: self.show_rename_preview(plan[0])
+
+        def run_rename():
+            plan = build_plan()
+            if not plan: return
+            steps, dest_dir = plan
+            action = var_action.get()
+            if any(st.status in RENAME_BLOCKING for st in steps):
+                messagebox.showerror("Name Conflicts", "Some new names are already taken. Nothing was changed.\n"
+                                                       "See the preview for details, or pick another Scene Name.")
+                self.show_rename_preview(steps)
+                return
+            try:
+                if dest_dir: os.makedirs(dest_dir, exist_ok=True)
+                if action == "copy": done = copy_renames(steps, self.settings["copy_mode"], self.settings["copy_verify"])
+                else: done = execute_renames(steps)  # rename and move stay on one volume: all-or-nothing
+            except Exception as e:
+                messagebox.showerror("Error", f"Nothing was {'copied' if action == 'copy' else 'renamed'}: {e}")
+                return
+
+            rel = lambda path: os.path.relpath(path, self.renamer_source_dir)
+            changes = {rel(st.src): rel(st.dst) for st in done}
+            if action != "copy": self.update_caches([(st.src, st.dst) for st in done])
+            # <source>/<Scene>/ is part of a recursive scan: moved files keep their group under the new path,
+            # copies join the list unassigned. Without subfolders, moved files leave the list with their groups.
+            if action == "rename" or (action == "move" and self.settings["scan_subfolders"]):
+                self.apply_file_changes("renamer", renamed=changes)
+            elif action == "move": self.apply_file_changes("renamer", removed=list(changes))
+            elif self.settings["scan_subfolders"]: self.apply_file_changes("renamer", added=sorted(changes.values(), key=str.lower))
             msg_action = "Renamed" if action == "rename" else "Processed"
-            messagebox.showinfo("Success", f"{msg_action} {count} files in {target_group}")
-            
-            # Refresh view if files were moved/renamed in place
-            self.load_images_renamer() 
+            messagebox.showinfo("Success", f"{msg_action} {len(steps)} files in {var_grp.get()}")
             dlg.destroy()
 
-        ttk.Button(dlg, text="Execute", command=run_rename).pack(pady=20)
+        f_btns = ttk.Frame(dlg)
+        f_btns.pack(pady=20)
+        ttk.Button(f_btns, text="Preview...", command=preview).pack(side="left", padx=5)
+        ttk.Button(f_btns, text="Execute", command=run_rename).pack(side="left", padx=5)
 
-    # --- Helpers for Renamer ---
-    def get_date_taken(self, filepath):
-        """ Returns datetime object. Tries EXIF, falls back to file mod time. """
-        if HAS_PIL:
-            try:
-                img = Image.open(filepath)
-                exif = img.getexif()
-                if exif:
-                    # Tags: 36867 (DateTimeOriginal), 306 (DateTime)
-                    date_str = exif.get(36867) or exif.get(306)
-                    if date_str:
-                        return datetime.strptime(date_str, "%Y:%m:%d %H:%M:%S")
-            except: pass
-        return datetime.fromtimestamp(os.path.getmtime(filepath))
-
-    def get_camera_model(self, filepath):
-        """ Tries to extract camera model from EXIF """
-        if HAS_PIL:
-            try:
-                img = Image.open(filepath)
-                exif = img.getexif()
-                if exif:
-                    # Tag 272 is Model
-                    model = exif.get(272)
-                    if model: return str(model).strip()
-            except: pass
-        return None
+    def show_rename_preview(self, steps):
+        """ Dry-run table: every planned name change and whether it is safe. """
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Rename Preview")
+        dlg.geometry("760x420")
+        blocking = sum(1 for st in steps if st.status in RENAME_BLOCKING)
+        text = f"{len(steps)} files" + (f"  |  {blocking} conflicts - nothing will be changed" if blocking else "  |  no conflicts")
+        ttk.Label(dlg, text=text, foreground="red" if blocking else "").pack(anchor="w", padx=10, pady=(10, 5))
+        cols = ("original", "new", "status")
+        tree = ttk.Treeview(dlg, columns=cols, show="headings")
+        for col, title, width in zip(cols, ("Original", "New Name", "Status"), (260, 340, 120)):
+            tree.heading(col, text=title)
+            tree.column(col, width=width, anchor="w")
+        tree.tag_configure("conflict", foreground="red")
+        notes = {"chain": "ok (reuses a name)", "cycle": "ok (swap)", "exists": "CONFLICT: exists", "duplicate": "CONFLICT: duplicate"}
+        for st in steps:
+            tree.insert("", "end", values=(os.path.basename(st.src), os.path.relpath(st.dst, os.path.dirname(st.src)), notes.get(st.status, st.status)),
+                        tags=("conflict",) if st.status in RENAME_BLOCKING else ())
+        tree.pack(fill="both", expand=True, padx=10)
+        ttk.Button(dlg, text="Close", command=dlg.destroy).pack(pady=8)
+
+    def undo_rename(self):
+        batches = load_rename_journal()
+        if not batches:
+            messagebox.showinfo("Undo", "Nothing to undo.")
+            return
+        steps = batches[-1]["steps"]
+        if not messagebox.askyesno("Undo", f"Restore the original names of {len(steps)} files from the last rename ({batches[-1]['time']})?"): return
+        try: pairs = undo_last_rename()
+        except Exception as e:
+            messagebox.showerror("Undo Failed", f"Nothing was changed: {e}")
+            return
+        self.update_caches(pairs)
+        if self.renamer_source_dir:
+            inside = lambda path: path.startswith(os.path.join(self.renamer_source_dir, ""))
+            rel = lambda path: os.path.relpath(path, self.renamer_source_dir)
+            self.apply_file_changes("renamer", renamed={rel(cur): rel(orig) for cur, orig in pairs if inside(cur) and inside(orig)},
+                                    removed=[rel(cur) for cur, orig in pairs if inside(cur) and not inside(orig)],
+                                    added=[rel(orig) for cur, orig in pairs if inside(orig) and not inside(cur)])
+        messagebox.showinfo("Undo", f"Restored {len(pairs)} files.")
 
-    def generate_thumbnails_renamer_thread(self):
-        size = (80, 60)
-        for idx, filename in enumerate(self.renamer_files):
-            filepath = os.path.join(self.renamer_source_dir, filename)
-            thumb = self.create_thumbnail(filepath, size)
-            if thumb:
-                self.root.after(10, self.add_renamer_ribbon_item, idx, filename, thumb)
-            if idx % 5 == 0: time.sleep(0.01)
-
-    def add_renamer_ribbon_item(self, idx, filename, thumb):
-        self.thumb_cache_renamer[filename] = thumb
-        f = tk.Frame(self.r_inner, bg=self.group_colors["Unassigned"], padx=3, pady=3)
-        f.pack(side="left", fill="y", padx=1)
-        btn = tk.Button(f, image=thumb, command=lambda: self.jump_to_renamer_file(filename), relief="flat", bd=0)
-        btn.pack(fill="both", expand=True)
-        self.ribbon_widgets_renamer[filename] = f
-        if idx == self.current_renamer_index:
-             self.ensure_ribbon_visible(f, self.r_canvas, self.r_inner)
-
-    def jump_to_renamer_file(self, filename):
-        if filename in self.renamer_files:
-            self.current_renamer_index = self.renamer_files.index(filename)
+    # --- Helpers for Renamer ---
+    def jump_to_renamer_index(self, idx):
+        if 0 <= idx < len(self.renamer_files):
+            self.current_renamer_index = idx
             self.show_image_renamer()
 
     # ==========================================
     #       SHARED / COMMON HELPERS
     # ==========================================
-    def create_thumbnail(self, filepath, size):
-        ext = os.path.splitext(filepath)[1].lower()
-        if ext in self.ext_imgs and HAS_PIL:
+    def start_folder_scan(self, attr, folder, on_files, on_done):
+        """ Streams a FolderScan into on_files(chunk) on the Tk thread, then on_done(ordered files[, error]).
+            Starting another scan under the same attr abandons the previous one. """
+        if getattr(self, attr) is not None: getattr(self, attr).cancel()
+        scan = FolderScan(folder, self.ext_imgs | self.ext_vids, self.settings["scan_subfolders"],
+                          parse_patterns(self.settings["scan_include"]), parse_patterns(self.settings["scan_exclude"]),
+                          self.metadata).start()
+        setattr(self, attr, scan)
+
+        def poll():
+            if getattr(self, attr) is not scan: return
+            files, deadline = [], time.perf_counter() + 0.02
+            while time.perf_counter() < deadline:
+                try: kind, payload = scan.events.get_nowait()
+                except queue.Empty: break
+                if kind == "chunk":
+                    files.extend(payload)
+                    continue
+                if files: on_files(files)
+                if kind == "done": on_done(payload)
+                else: on_done([], payload)
+                return
+            if files: on_files(files)
+            self.root.after(15 if files else 30, poll)
+        poll()
+
+    def apply_file_changes(self, tab, renamed=None, removed=(), added=()):
+        """ Applies a known diff (paths relative to the tab's folder) to its file list, labels/groups and ribbon
+            in O(N) instead of rescanning. The current photo stays selected if it survives, else its neighbour. """
+        renamed, removed = renamed or {}, set(removed)
+        if tab == "visual":
+            files, index_attr, ribbon, show, canvas = self.image_files, "current_image_index", self.ribbon, self.show_image, self.image_canvas
+            states = (self.file_labels, self.file_renames_sorted)
+        else:
+            files, index_attr, ribbon, show, canvas = self.renamer_files, "current_renamer_index", self.r_ribbon, self.show_image_renamer, self.renamer_canvas
+            states = (self.file_groups,)
+        idx = getattr(self, index_attr)
+        current = files[idx] if 0 <= idx < len(files) else None
+        if current in removed:
+            current = next((f for f in files[idx:] if f not in removed), None) or next((f for f in reversed(files[:idx]) if f not in removed), None)
+        current = renamed.get(current, current)
+        kept = [renamed.get(f, f) for f in files if f not in removed]
+        present = set(kept)
+        files[:] = kept + [f for f in added if f not in present]
+        for state in states:
+            for f in removed: state.pop(f, None)
+            state.update({renamed[f]: state.pop(f) for f in list(state) if f in renamed})
+        ribbon.rename_items(renamed)
+        ribbon.reorder(pending=False)
+        setattr(self, index_attr, ribbon.index.get(current, 0))
+        if files: show()
+        else: self.show_canvas_message(canvas, "No Media Found")
+
+    def update_caches(self, moved, removed=()):
+        """ Moves thumbnail/metadata/prefetch entries along with files ([(old path, new path)]). """
+        self.thumb_store.move(moved)
+        self.metadata.move(moved)
+        self.prefetcher.move({**{old: new for old, new in moved}, **{path: None for path in removed}})
+
+    def start_folder_watch(self, attr, folder, tab):
+        """ Optional polling watcher (Settings) feeding outside changes into apply_file_changes().
+            folder=None just stops the tab's current watcher. """
+        if getattr(self, attr) is not None: getattr(self, attr).stop()
+        setattr(self, attr, None)
+        if not folder or not self.settings["watch_folders"]: return
+        watcher = FolderWatcher(folder, self.ext_imgs | self.ext_vids, self.settings["scan_subfolders"],
+                                parse_patterns(self.settings["scan_include"]), parse_patterns(self.settings["scan_exclude"])).start()
+        setattr(self, attr, watcher)
+
+        def poll():
+            if getattr(self, attr) is not watcher: return
             try:
-                img = Image.open(filepath)
-                img.thumbnail(size)
-                return ImageTk.PhotoImage(img)
-            except: pass
-        elif ext in self.ext_vids:
-            if HAS_CV2:
-                try:
-                    cap = cv2.VideoCapture(filepath)
-                    cap.set(cv2.CAP_PROP_POS_MSEC, 1000)
-                    ret, frame = cap.read()
-                    cap.release()
-                    if ret:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        img = Image.fromarray(frame)
-                        img.thumbnail(size)
-                        draw = ImageDraw.Draw(img)
-                        draw.polygon([(35, 20), (35, 40), (55, 30)], fill="white", outline="black")
-                        return ImageTk.PhotoImage(img)
-                except: pass
-            
-            if HAS_PIL:
-                base = Image.new('RGB', size, color='#333')
-                draw = ImageDraw.Draw(base)
-                draw.text((10, 20), "VIDEO", fill="white")
-                return ImageTk.PhotoImage(base)
-        return None
+                while True:
+                    renamed, removed, added = watcher.events.get_nowait()
+                    self.apply_file_changes(tab, renamed, removed, added)
+            except queue.Empty: pass
+            self.root.after(500, poll)
+        poll()
+
+    def show_canvas_message(self, canvas, text):
+        if self.display_canvas is canvas: self.display_canvas = None
+        canvas.delete("all")
+        canvas.create_text(400, 300, text=text, fill="white")
 
     def display_media_on_canvas(self, canvas, folder, filename):
+        self.display_started = time.perf_counter()
         # Reset Scale
         self.img_scale = 1.0
         self.img_pos_x = 0
@@ -698,38 +1940,127 @@ Credits:
         
         filepath = os.path.join(folder, filename)
         ext = os.path.splitext(filename)[1].lower()
-        canvas.delete("all")
-        
         loaded_pil = None
         is_video = False
 
+        self.load_generation += 1
+        self.load_waiting = False
+        state = None
         if ext in self.ext_imgs and HAS_PIL:
-            try:
-                loaded_pil = Image.open(filepath)
-                try: loaded_pil = ImageOps.exif_transpose(loaded_pil)
-                except: pass
-            except: pass
+            # Screen-sized preview (prefetched most of the time); full resolution is loaded on zoom
+            loaded_pil = self.prefetcher.get(filepath)
+            state = "preview"
+            if loaded_pil is None:
+                # Miss: upscale the cached ribbon thumbnail now, swap in the real image when the worker is done
+                loaded_pil = self.thumb_store.get(filepath, (80, 60))
+                state = "placeholder"
+                self.request_media(filepath, "screen")
         elif ext in self.ext_vids:
             is_video = True
-            if HAS_CV2:
-                try:
-                    cap = cv2.VideoCapture(filepath)
-                    ret, frame = cap.read()
-                    cap.release()
-                    if ret:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        loaded_pil = Image.fromarray(frame)
-                except: pass
+            if self.video_frames:
+                # Usually extracted already for the ribbon thumbnail; otherwise jumps the thumbnail queue
+                loaded_pil = self.video_frames.get(filepath)
+                state = "full"
+                if loaded_pil is None:
+                    loaded_pil = self.thumb_store.get(filepath, (80, 60))
+                    state = "placeholder"
+                    self.request_media(filepath, "video")
 
         self.pil_image_raw = loaded_pil
+        self.pil_image_path = filepath
+        self.pil_image_state = state
+        self.display_canvas = canvas
+        self.display_name = filename
+        self.display_is_video = is_video
+        self.cancel_redraw()
+        self.render_canvas()
+        PERF.add("display.switch", time.perf_counter() - self.display_started)  # Tk thread, navigation to first paint
+        if state in ("preview", "full"): PERF.add("display.ready", time.perf_counter() - self.display_started)
+
+    def request_media(self, filepath, kind):
+        if kind == "video":
+            # Delivered through the loader's queue, so poll_media_loader handles it like any other result
+            gen = self.load_generation
+            self.video_frames.submit(filepath, urgent=True).add_done_callback(
+                lambda fut: self.media_loader.results.put((gen, filepath, kind, fut.result())))
+        else:
+            self.media_loader.request(self.load_generation, filepath, kind, self.prefetcher.box)
+        self.load_waiting = True
+        if not self.load_poll_job: self.load_poll_job = self.root.after(5, self.poll_media_loader)
+
+    def poll_media_loader(self):
+        self.load_poll_job = None
+        while True:
+            try: gen, filepath, kind, img = self.media_loader.results.get_nowait()
+            except queue.Empty: break
+            if gen != self.load_generation or filepath != self.pil_image_path: continue  # Stale: user moved on
+            self.load_waiting = False
+            self.on_media_loaded(filepath, kind, img)
+        if self.load_waiting and not self.load_poll_job:
+            self.load_poll_job = self.root.after(5, self.poll_media_loader)
+
+    def on_media_loaded(self, filepath, kind, img):
+        if kind != "full": PERF.add("display.ready", time.perf_counter() - self.display_started)  # Until the real image
+        if kind == "full":
+            if img is None: return
+            self.pil_image_state = "full"
+        elif kind == "screen":
+            self.pil_image_state = "preview" if img is not None else None
+            if img is not None: self.prefetcher.put(filepath, img)
+        else:
+            self.pil_image_state = "full" if img is not None else None
+        self.pil_image_raw = img
+        self.request_redraw(self.display_canvas)
+        if kind == "screen" and img is not None and self.img_scale > 1.0: self.load_full_resolution()
+
+    # --- Redraw Scheduling ---
+    # Zoom / resize / pan-past-margin only *request* a redraw; at most one render runs per frame.
+    FRAME_INTERVAL = 1 / 60
+    PAN_MARGIN = 0.25  # extra crop rendered around the viewport (fraction of canvas size) so pans can just move it
+
+    def request_redraw(self, canvas):
+        if canvas is not self.display_canvas or self.redraw_job: return
+        wait = self.FRAME_INTERVAL - (time.perf_counter() - self.last_render_time)
+        if wait > 0: self.redraw_job = self.root.after(max(1, int(wait * 1000)), self.run_redraw)
+        else: self.redraw_job = self.root.after_idle(self.run_redraw)
+
+    def cancel_redraw(self):
+        if self.redraw_job:
+            self.root.after_cancel(self.redraw_job)
+            self.redraw_job = None
+
+    def run_redraw(self):
+        self.redraw_job = None
+        self.render_canvas()
+
+    def render_canvas(self):
+        """ Full repaint of the displayed media: image crop, then overlays on top. """
+        canvas = self.display_canvas
+        if canvas is None: return
+        self.last_render_time = time.perf_counter()
+        canvas.delete("all")
+        self.rendered_rect = None
+        filename = self.display_name
         if self.pil_image_raw:
             self.draw_canvas_image(canvas)
-            if is_video: self.draw_video_overlay(canvas, filename)
+            if self.display_is_video: self.draw_video_overlay(canvas, filename)
             self.draw_filename_overlay(canvas, filename)
-        elif is_video:
+        elif self.display_is_video:
             self.draw_video_placeholder(canvas, filename)
+        elif self.pil_image_state == "placeholder":
+            self.draw_placeholder(canvas, f"Loading {filename}...")
         else:
             self.draw_placeholder(canvas, f"Cannot preview: {filename}")
+        if self.var_perf_hud.get(): self.draw_perf_hud(canvas)
+
+    def image_view_rect(self, canvas):
+        """ Where the whole image currently sits on the canvas: (left, top, scale). """
+        cw, ch = canvas.winfo_width(), canvas.winfo_height()
+        iw, ih = self.pil_image_raw.size
+        scale = min(cw/iw, ch/ih) * self.img_scale
+        cx = cw // 2 + self.img_pos_x
+        cy = ch // 2 + self.img_pos_y
+        return cx - iw * scale / 2, cy - ih * scale / 2, scale
 
     def draw_canvas_image(self, canvas):
         if not self.pil_image_raw: return
@@ -738,18 +2069,40 @@ Credits:
         iw, ih = self.pil_image_raw.size
         if iw == 0 or ih == 0: return
 
-        ratio = min(cw/iw, ch/ih)
-        final_scale = ratio * self.img_scale
-        new_w, new_h = int(iw * final_scale), int(ih * final_scale)
+        left, top, final_scale = self.image_view_rect(canvas)
+        mx, my = int(cw * self.PAN_MARGIN), int(ch * self.PAN_MARGIN)
         
         try:
-            resized = self.pil_image_raw.resize((new_w, new_h), Image.Resampling.BILINEAR)
-            self.tk_image = ImageTk.PhotoImage(resized)
-            cx = cw // 2 + self.img_pos_x
-            cy = ch // 2 + self.img_pos_y
-            canvas.create_image(cx, cy, image=self.tk_image)
+            if self.pyramid is None or self.pyramid.base is not self.pil_image_raw:
+                self.pyramid = ImagePyramid(self.pil_image_raw)
+            # Only the visible crop (+ pan margin) is resampled, so cost follows the canvas size, not the zoom level
+            with PERF.timer("render.resize"):
+                rendered = self.pyramid.render(final_scale, left + mx, top + my, cw + 2 * mx, ch + 2 * my)
+            if rendered is None: return
+            crop, x, y = rendered
+            with PERF.timer("render.photoimage"): self.tk_image = ImageTk.PhotoImage(crop)
+            canvas.create_image(x - mx, y - my, image=self.tk_image, anchor="nw", tags=("pan",))
+            canvas.tag_lower("pan")
+            self.rendered_rect = [x - mx, y - my, x - mx + crop.width, y - my + crop.height]
         except: pass
 
+    def rendered_covers_view(self, canvas):
+        """ True if the already rendered crop still covers every visible image pixel after a pan. """
+        if not self.rendered_rect: return False
+        cw, ch = canvas.winfo_width(), canvas.winfo_height()
+        left, top, scale = self.image_view_rect(canvas)
+        iw, ih = self.pil_image_raw.size
+        need = (max(0, left), max(0, top), min(cw, left + iw * scale), min(ch, top + ih * scale))
+        if need[2] <= need[0] or need[3] <= need[1]: return True
+        r = self.rendered_rect
+        return r[0] <= need[0] + 1 and r[1] <= need[1] + 1 and r[2] >= need[2] - 1 and r[3] >= need[3] - 1
+
+    def load_full_resolution(self):
+        """ Asks the loader for the full image once the user zooms past fit; the preview stays up meanwhile. """
+        if self.pil_image_state != "preview": return
+        self.pil_image_state = "loading-full"
+        self.request_media(self.pil_image_path, "full")
+
     def on_zoom(self, event, is_renamer=False):
         if not self.pil_image_raw: return
         if event.num == 5 or event.delta < 0: factor = 0.9
@@ -757,19 +2110,10 @@ Credits:
         self.img_scale *= factor
         if self.img_scale < 0.1: self.img_scale = 0.1
         if self.img_scale > 10.0: self.img_scale = 10.0
+        if self.img_scale > 1.0: self.load_full_resolution()
         
         canvas = self.renamer_canvas if is_renamer else self.image_canvas
-        canvas.delete("all")
-        self.draw_canvas_image(canvas)
-        
-        # Redraw Overlays
-        files = self.renamer_files if is_renamer else self.image_files
-        idx = self.current_renamer_index if is_renamer else self.current_image_index
-        if files:
-            fname = files[idx]
-            ext = os.path.splitext(fname)[1].lower()
-            if ext in self.ext_vids: self.draw_video_overlay(canvas, fname)
-            self.draw_filename_overlay(canvas, fname)
+        self.request_redraw(canvas)
 
     def on_drag_start(self, event):
         self._drag_start_x = event.x
@@ -777,6 +2121,8 @@ Credits:
 
     def on_drag_move(self, event, is_renamer=False):
         if not self.pil_image_raw: return
+        canvas = self.renamer_canvas if is_renamer else self.image_canvas
+        if canvas is not self.display_canvas: return
         dx = event.x - self._drag_start_x
         dy = event.y - self._drag_start_y
         self.img_pos_x += dx
@@ -784,24 +2130,25 @@ Credits:
         self._drag_start_x = event.x
         self._drag_start_y = event.y
         
-        canvas = self.renamer_canvas if is_renamer else self.image_canvas
-        canvas.delete("all")
-        self.draw_canvas_image(canvas)
-        # Redraw overlays... (Simplified for brevity, same logic as zoom)
+        # Pure pan: shift the existing image + play icon; only resample once we run past the rendered margin
+        canvas.move("pan", dx, dy)
+        if self.rendered_rect:
+            self.rendered_rect = [self.rendered_rect[0] + dx, self.rendered_rect[1] + dy,
+                                  self.rendered_rect[2] + dx, self.rendered_rect[3] + dy]
+        if not self.redraw_job and not self.rendered_covers_view(canvas):
+            self.request_redraw(canvas)
 
     def on_canvas_resize(self, event, is_renamer=False):
-        if self.pil_image_raw:
-            canvas = self.renamer_canvas if is_renamer else self.image_canvas
-            self.draw_canvas_image(canvas)
-            # Re-draw overlays logic needed here in full impl
+        canvas = self.renamer_canvas if is_renamer else self.image_canvas
+        self.request_redraw(canvas)
 
     # --- Overlay Drawing Helpers ---
     def draw_video_overlay(self, canvas, filename):
         cw, ch = canvas.winfo_width(), canvas.winfo_height()
         cx = cw // 2 + self.img_pos_x
         cy = ch // 2 + self.img_pos_y
-        canvas.create_oval(cx-50, cy-50, cx+50, cy+50, outline="white", width=4, fill="#000000", stipple="gray25")
-        canvas.create_polygon(cx-15, cy-25, cx-15, cy+25, cx+30, cy, fill="white")
+        canvas.create_oval(cx-50, cy-50, cx+50, cy+50, outline="white", width=4, fill="#000000", stipple="gray25", tags=("pan",))
+        canvas.create_polygon(cx-15, cy-25, cx-15, cy+25, cx+30, cy, fill="white", tags=("pan",))
         canvas.create_text(cw/2, ch - 50, text=f"[VIDEO] {filename}", fill="white", font=("Arial", 14, "bold"))
 
     def draw_filename_overlay(self, canvas, text):
@@ -839,17 +2186,6 @@ Credits:
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
-    def ensure_ribbon_visible(self, widget, canvas, inner):
-        try:
-            x1 = widget.winfo_x()
-            cw = canvas.winfo_width()
-            iw = inner.winfo_width()
-            if iw <= cw: return
-            want_x = x1 - cw/2 + widget.winfo_width()/2
-            pct = want_x / iw
-            canvas.xview_moveto(pct)
-        except: pass
-
     # ==========================================
     #       VISUAL SORTER (TAB 1) LOGIC
     # ==========================================
@@ -867,36 +2203,61 @@ Credits:
             self.visual_output_dir = folder
             self.lbl_visual_output.config(text=folder)
 
+    def add_backup_folder(self):
+        folder = filedialog.askdirectory(title="Also copy sorted files to...")
+        if folder and folder not in self.visual_backup_dirs:
+            self.visual_backup_dirs.append(folder)
+            self.lbl_visual_backups.config(text="Backups: " + ", ".join(self.visual_backup_dirs))
+
+    def clear_backup_folders(self):
+        self.visual_backup_dirs = []
+        self.lbl_visual_backups.config(text="No backup copies")
+
     def refresh_file_list(self):
         if not self.visual_source_dir: return
-        valid_exts = self.ext_imgs.union(self.ext_vids)
-        try:
-            files = [f for f in os.listdir(self.visual_source_dir) if os.path.splitext(f)[1].lower() in valid_exts]
-            files.sort()
-            self.image_files = files
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-            return
+        self.image_files = []
         self.file_labels = {}
         self.file_renames_sorted = {}
         self.current_image_index = 0
-        self.ribbon_widgets = {}
-        for w in self.ribbon_inner.winfo_children(): w.destroy()
-        if self.image_files:
-            self.show_image()
-            threading.Thread(target=self.generate_thumbnails_thread, daemon=True).start()
-        else:
-            self.image_canvas.delete("all")
-            self.image_canvas.create_text(400, 300, text="No Media Found", fill="white")
+        self.ribbon.set_files(self.image_files, pending=False)
+        self.thumb_pipeline.cancel()
+        self.show_canvas_message(self.image_canvas, "Scanning...")
+        self.start_folder_watch("visual_watch", None, "visual")
+        self.start_folder_scan("visual_scan", self.visual_source_dir, self.on_visual_files, self.on_visual_scan_done)
+
+    def on_visual_files(self, files):
+        first = not self.image_files
+        self.image_files.extend(files)
+        self.ribbon.extend(files)
+        if first: self.show_image()
+        else: self.lbl_counter.config(text=f"{self.current_image_index + 1} / {len(self.image_files)}")
+
+    def on_visual_scan_done(self, files, error=None):
+        if error: messagebox.showerror("Error", error)
+        else: self.start_folder_watch("visual_watch", self.visual_source_dir, "visual")
+        current = self.image_files[self.current_image_index] if self.image_files else None
+        self.image_files[:] = files
+        self.ribbon.reorder()
+        if not self.image_files:
+            self.show_canvas_message(self.image_canvas, "No Media Found")
+            return
+        self.thumb_pipeline.start(self.visual_source_dir, self.image_files)
+        self.current_image_index = self.image_files.index(current) if current in self.ribbon.index else 0
+        if current == self.image_files[self.current_image_index]:
+            # Same photo, new position: no reload
+            self.lbl_counter.config(text=f"{self.current_image_index + 1} / {len(self.image_files)}")
+            self.ribbon.set_current(self.current_image_index)
+            self.prefetcher.update(self.visual_source_dir, self.image_files, self.current_image_index, self.ext_imgs)
+        else: self.show_image()
 
     def show_image(self):
         if not self.image_files: return
         filename = self.image_files[self.current_image_index]
         self.lbl_counter.config(text=f"{self.current_image_index + 1} / {len(self.image_files)}")
         self.var_current_label.set(self.file_labels.get(filename, "Unmarked"))
-        if filename in self.ribbon_widgets:
-             self.ensure_ribbon_visible(self.ribbon_widgets[filename], self.ribbon_canvas, self.ribbon_inner)
+        self.ribbon.set_current(self.current_image_index)
         self.display_media_on_canvas(self.image_canvas, self.visual_source_dir, filename)
+        self.prefetcher.update(self.visual_source_dir, self.image_files, self.current_image_index, self.ext_imgs)
 
     def prev_image(self):
         if self.current_image_index > 0:
@@ -918,38 +2279,18 @@ Credits:
         fname = self.image_files[self.current_image_index]
         lbl = self.var_current_label.get()
         self.file_labels[fname] = lbl
-        if fname in self.ribbon_widgets:
-            color = self.colors.get(lbl, "#e0e0e0")
-            self.ribbon_widgets[fname].config(bg=color)
-
-    def generate_thumbnails_thread(self):
-        size = (80, 60)
-        for idx, filename in enumerate(self.image_files):
-            filepath = os.path.join(self.visual_source_dir, filename)
-            thumb = self.create_thumbnail(filepath, size)
-            if thumb:
-                self.root.after(10, self.add_ribbon_item, idx, filename, thumb)
-            if idx % 5 == 0: time.sleep(0.01)
-
-    def add_ribbon_item(self, idx, filename, thumb):
-        self.thumb_cache[filename] = thumb
-        f = tk.Frame(self.ribbon_inner, bg=self.colors["Unmarked"], padx=3, pady=3)
-        f.pack(side="left", fill="y", padx=1)
-        btn = tk.Button(f, image=thumb, command=lambda: self.jump_to_file(filename), relief="flat", bd=0)
-        btn.pack(fill="both", expand=True)
-        self.ribbon_widgets[filename] = f
-        if idx == self.current_image_index:
-             self.ensure_ribbon_visible(f, self.ribbon_canvas, self.ribbon_inner)
-
-    def jump_to_file(self, filename):
-        if filename in self.image_files:
-            self.current_image_index = self.image_files.index(filename)
+        self.ribbon.refresh_item(fname)
+
+    def jump_to_index(self, idx):
+        if 0 <= idx < len(self.image_files):
+            self.current_image_index = idx
             self.show_image()
             
     def open_rename_dialog(self):
         if not self.image_files: return
         fname = self.image_files[self.current_image_index]
-        base, ext = os.path.splitext(fname)
+        sub_dir, name = os.path.split(fname)
+        base, ext = os.path.splitext(name)
         dlg = tk.Toplevel(self.root)
         dlg.title("Rename File")
         dlg.geometry("400x350")
@@ -975,14 +2316,14 @@ Credits:
             new_name_base = e_prefix.get() + e_base.get() + e_suffix.get()
             new_full_name = new_name_base + ext
             if var_mode.get() == "original":
+                new_full_name = os.path.join(sub_dir, new_full_name)
                 src = os.path.join(self.visual_source_dir, fname)
                 dst = os.path.join(self.visual_source_dir, new_full_name)
                 try:
+                    if new_full_name != fname and os.path.lexists(dst): raise FileExistsError(f"{new_full_name} already exists")
                     os.rename(src, dst)
-                    self.image_files[self.current_image_index] = new_full_name
-                    if fname in self.file_labels: self.file_labels[new_full_name] = self.file_labels.pop(fname)
-                    if fname in self.ribbon_widgets: self.ribbon_widgets[new_full_name] = self.ribbon_widgets.pop(fname)
-                    self.show_image() 
+                    self.update_caches([(src, dst)])
+                    self.apply_file_changes("visual", renamed={fname: new_full_name})
                     dlg.destroy()
                 except Exception as e: messagebox.showerror("Rename Error", str(e))
             else:
@@ -993,48 +2334,106 @@ Credits:
 
     def run_visual_sort(self):
         if not self.visual_source_dir: return
+        if self.sort_job and not self.sort_job.finished:
+            messagebox.showinfo("Sort Running", "A sort is already in progress.")
+            return
         out_root = self.visual_output_dir if self.visual_output_dir else self.visual_source_dir
-        count = 0
-        action = self.var_visual_action.get()
-        include_related = self.var_move_related.get()
-        for filename, label in self.file_labels.items():
-            if label == "Unmarked": continue
-            src = os.path.join(self.visual_source_dir, filename)
-            if label == "Red": 
-                try: os.remove(src)
-                except Exception as e: print(f"Failed to delete {filename}: {e}"); continue
-                if include_related:
-                    base_orig = os.path.splitext(filename)[0]
-                    related = [f for f in os.listdir(self.visual_source_dir) if f.startswith(base_orig) and f != filename]
-                    for r_file in related:
-                        try: os.remove(os.path.join(self.visual_source_dir, r_file))
-                        except: pass
-                count += 1
-                continue
-            dest_folder = os.path.join(out_root, label)
-            if not os.path.exists(dest_folder): os.makedirs(dest_folder)
-            target_name = self.file_renames_sorted.get(filename, filename)
-            dst = os.path.join(dest_folder, target_name)
-            try:
-                if action == "move": shutil.move(src, dst)
-                else: shutil.copy2(src, dst)
-            except Exception as e: print(e); continue
-            if include_related:
-                base_orig = os.path.splitext(filename)[0]
-                base_targ = os.path.splitext(target_name)[0]
-                related = [f for f in os.listdir(self.visual_source_dir) if f.startswith(base_orig) and f != filename]
-                for r_file in related:
-                    r_ext = os.path.splitext(r_file)[1]
-                    r_new_name = base_targ + r_ext
-                    r_src = os.path.join(self.visual_source_dir, r_file)
-                    r_dst = os.path.join(dest_folder, r_new_name)
-                    try:
-                        if action == "move": shutil.move(r_src, r_dst)
-                        else: shutil.copy2(r_src, r_dst)
-                    except: pass
-            count += 1
-        messagebox.showinfo("Sort Complete", f"Processed {count} files.\n(Red items were deleted)")
-        self.refresh_file_list()
+        backups = [d for d in self.visual_backup_dirs if os.path.abspath(d) != os.path.abspath(out_root)]
+        args = (self.visual_source_dir, out_root, dict(self.file_labels), dict(self.file_renames_sorted),
+                self.var_visual_action.get(), self.var_move_related.get(), backups)
+        self.sort_job = SortJob(lambda: plan_visual_sort(*args), workers=self.settings["io_workers"],
+                                copy_mode=self.settings["copy_mode"], verify=self.settings["copy_verify"],
+                                roots=[out_root] + backups).start()
+        source = self.visual_source_dir
+        self.open_job_progress("Sorting", self.sort_job, lambda job: self.on_visual_sort_done(job, source))
+
+    def on_visual_sort_done(self, job, source):
+        results = job.results()
+        primaries = [item.primary for item in job.items]
+        count = sum(1 for op in primaries if op.status == "ok")
+        problems = [op for op in results if op.status != "ok" or op.error]
+        msg = f"Processed {count} files.\n(Red items were deleted)"
+        if job.cancel_event.is_set(): msg = "Sort cancelled.\n" + msg
+        if job.error: messagebox.showerror("Sort Failed", job.error)
+        elif problems: self.show_job_report("Sort Complete", msg, results)
+        else: messagebox.showinfo("Sort Complete", msg)
+        if source == self.visual_source_dir: self.apply_sort_results(job)
+
+    def apply_sort_results(self, job):
+        """ Applies what the sort did instead of rescanning: moved/deleted files leave the list (cached thumbnails
+            and metadata follow them to their new paths), files that were handled cleanly lose their label. """
+        rel = lambda path: os.path.relpath(path, self.visual_source_dir)
+        gone, moved, deleted = [], [], []
+        for item in job.items:
+            for op in item.ops():
+                if op.status != "ok" or op.error: continue  # Failed, or source kept because a backup failed
+                if op is item.primary:
+                    self.file_labels.pop(rel(op.src), None)
+                    self.file_renames_sorted.pop(rel(op.src), None)
+                if op.action in ("move", "delete"): gone.append(rel(op.src))
+                if op.action == "move": moved.append((op.src, op.dst))
+                if op.action == "delete": deleted.append(op.src)
+        self.update_caches(moved, removed=deleted)
+        self.apply_file_changes("visual", removed=gone)
+
+    # --- Job Progress / Report Dialogs ---
+    def open_job_progress(self, title, job, on_done):
+        dlg = tk.Toplevel(self.root)
+        dlg.title(title)
+        dlg.transient(self.root)
+        ttk.Label(dlg, text=f"{title}...", font=("Arial", 11, "bold")).pack(pady=(12, 4))
+        bar = ttk.Progressbar(dlg, maximum=1.0, length=400)
+        bar.pack(padx=20, pady=4)
+        lbl = ttk.Label(dlg, text="Preparing...", foreground="gray")
+        lbl.pack(pady=2)
+        lbl_dests = ttk.Label(dlg, text="", foreground="gray", justify="left")
+        lbl_dests.pack(padx=20, pady=2, anchor="w")
+        btn = ttk.Button(dlg, text="Cancel", command=job.cancel)
+        btn.pack(pady=6)
+        dlg.protocol("WM_DELETE_WINDOW", job.cancel)
+
+        def poll():
+            st = job.snapshot()
+            if st["total_bytes"]: bar["value"] = st["bytes"] / st["total_bytes"]
+            elif st["total_files"]: bar["value"] = st["files"] / st["total_files"]
+            eta = f"{int(st['eta']) // 60}:{int(st['eta']) % 60:02d}" if st["eta"] is not None else "--:--"
+            lbl.config(text=f"{st['files']} / {st['total_files']} files  |  {format_bytes(st['bytes'])} / {format_bytes(st['total_bytes'])}"
+                            f"  |  {format_bytes(st['rate'])}/s  |  ETA {eta}")
+            if len(st["destinations"]) > 1:
+                lbl_dests.config(text="\n".join(f"{os.path.basename(r) or r}: {format_bytes(done)} / {format_bytes(total)}"
+                                                + (f"  ({failed} failed)" if failed else "") for r, done, total, failed in st["destinations"]))
+            if st["cancelled"]: btn.config(text="Cancelling...", state="disabled")
+            if st["finished"]:
+                dlg.destroy()
+                on_done(job)
+            else:
+                self.root.after(100, poll)
+        poll()
+
+    def show_job_report(self, title, message, results):
+        """ Per-file outcome table for anything that did not succeed, with JSON export. """
+        dlg = tk.Toplevel(self.root)
+        dlg.title(title)
+        dlg.geometry("860x400")
+        ttk.Label(dlg, text=message).pack(anchor="w", padx=10, pady=(10, 5))
+        cols = ("status", "action", "file", "destination", "error")
+        tree = ttk.Treeview(dlg, columns=cols, show="headings")
+        for col, width in zip(cols, (80, 60, 200, 200, 280)):
+            tree.heading(col, text=col.title())
+            tree.column(col, width=width, anchor="w")
+        for op in results:
+            if op.status != "ok" or op.error: tree.insert("", "end", values=(op.status, op.action, os.path.basename(op.src), os.path.dirname(op.dst), op.error))
+        tree.pack(fill="both", expand=True, padx=10)
+
+        def save_report():
+            path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+            if not path: return
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump([{**op.__dict__, "backups": [b.dst for b in op.backups]} for op in results], f, indent=2)
+        f_btns = ttk.Frame(dlg)
+        f_btns.pack(fill="x", padx=10, pady=8)
+        ttk.Button(f_btns, text="Save Report...", command=save_report).pack(side="left")
+        ttk.Button(f_btns, text="Close", command=dlg.destroy).pack(side="right")
 
     # ==========================================
     #           TAB 3: SEQUENCE SORTER
@@ -1061,65 +2460,117 @@ Credits:
         ttk.Label(frame, text="New Folder Name:").pack(anchor="w", padx=20, pady=(10,0))
         self.seq_target_name = tk.StringVar(value="Selected_Photos")
         ttk.Entry(frame, textvariable=self.seq_target_name).pack(fill="x", padx=20)
+        f_seq_backup = ttk.Frame(frame)
+        f_seq_backup.pack(fill="x", padx=20, pady=(5, 0))
+        self.seq_backup_dirs = []
+        self.lbl_seq_backups = ttk.Label(f_seq_backup, text="No backup copies", foreground="gray")
+        ttk.Button(f_seq_backup, text="+ Backup Destination", command=self.add_seq_backup_folder).pack(side="left")
+        ttk.Button(f_seq_backup, text="Clear", width=6, command=lambda: (self.seq_backup_dirs.clear(), self.lbl_seq_backups.config(text="No backup copies"))).pack(side="left", padx=5)
+        self.lbl_seq_backups.pack(side="left", fill="x", expand=True)
         self.seq_action_var = tk.StringVar(value="copy")
         f_act = ttk.Frame(frame)
         f_act.pack(fill="x", padx=20, pady=10)
         ttk.Radiobutton(f_act, text="Copy", variable=self.seq_action_var, value="copy").pack(side="left", padx=(0, 20))
         ttk.Radiobutton(f_act, text="Move", variable=self.seq_action_var, value="move").pack(side="left")
-        ttk.Button(frame, text="Process Sequence", command=self.run_sequence_logic).pack(pady=10)
+        self.btn_seq_process = ttk.Button(frame, text="Process Sequence", command=self.run_sequence_logic)
+        self.btn_seq_process.pack(pady=(10, 5))
+        f_seq_status = ttk.Frame(frame)
+        f_seq_status.pack(fill="x", padx=20, pady=(0, 5))
+        self.seq_progress = ttk.Progressbar(f_seq_status, maximum=1.0)
+        self.seq_progress.pack(side="left", fill="x", expand=True)
+        self.lbl_seq_progress = ttk.Label(f_seq_status, text="", foreground="gray", width=16, anchor="e")
+        self.lbl_seq_progress.pack(side="left", padx=5)
+        ttk.Button(f_seq_status, text="Save Log...", command=self.save_seq_log).pack(side="left")
+        self.seq_summary = ttk.Treeview(frame, columns=("count",), height=4)
+        self.seq_summary.heading("#0", text="Result")
+        self.seq_summary.heading("count", text="Files")
+        self.seq_summary.column("#0", width=200)
+        self.seq_summary.column("count", width=80, anchor="e")
+        self.seq_summary.pack(fill="x", padx=20, pady=(0, 5))
         self.seq_log = tk.Text(frame, height=10, state="disabled", bg="#f0f0f0", font=("Consolas", 9))
         self.seq_log.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        self.seq_events = queue.Queue()  # Worker -> Tk thread: ("log", line) | ("progress", done, total) | ("done", counts)
+        self.seq_log_lines = []          # Full log for Save Log; the Text widget only keeps the tail
+        self.seq_counts = {}
 
-    def run_sequence_logic(self):
-        threading.Thread(target=self.process_seq_files, daemon=True).start()
+    def add_seq_backup_folder(self):
+        folder = filedialog.askdirectory(title="Also copy selected files to...")
+        if folder and folder not in self.seq_backup_dirs:
+            self.seq_backup_dirs.append(folder)
+            self.lbl_seq_backups.config(text="Backups: " + ", ".join(f"{d}/<New Folder Name>" for d in self.seq_backup_dirs))
 
-    def process_seq_files(self):
+    def run_sequence_logic(self):
+        """ Reads and validates the form on the Tk thread, then hands plain values to the worker. """
         source_dir = self.seq_source.get()
         if not source_dir or not os.path.exists(source_dir): messagebox.showerror("Error", "Please select a valid source folder."); return
         raw_seq = self.seq_text.get("1.0", "end").strip()
         if not raw_seq: messagebox.showerror("Error", "Please enter a number sequence."); return
-        prefix = self.seq_prefix_var.get().strip()
-        exts = [e.strip().replace(".", "") for e in self.seq_ext_var.get().split(",")]
-        target_name = self.seq_target_name.get().strip()
-        action = self.seq_action_var.get()
-        target_dir = os.path.join(source_dir, target_name)
-        if not os.path.exists(target_dir):
-            try: os.makedirs(target_dir)
+        target_dir = os.path.join(source_dir, self.seq_target_name.get().strip())
+        backup_dirs = [os.path.join(d, self.seq_target_name.get().strip()) for d in self.seq_backup_dirs]
+        for folder in [target_dir] + backup_dirs:
+            try: os.makedirs(folder, exist_ok=True)
             except Exception as e: messagebox.showerror("Error", f"Could not create folder: {e}"); return
-        self.log_seq(f"Starting processing...")
-        numbers = [x.strip() for x in raw_seq.replace("\n", ",").split(",") if x.strip()]
-        last_full = ""
-        success = 0
-        missing = 0
-        for num_str in numbers:
-            current_full = ""
-            if not last_full: current_full = num_str
-            else:
-                if len(num_str) < len(last_full): prefix_len = len(last_full) - len(num_str); current_full = last_full[:prefix_len] + num_str
-                else: current_full = num_str
-            last_full = current_full
-            for ext in exts:
-                filename = f"{prefix}{current_full}.{ext}"
-                src_path = os.path.join(source_dir, filename)
-                dst_path = os.path.join(target_dir, filename)
-                if os.path.exists(src_path):
-                    try:
-                        if action == "move": shutil.move(src_path, dst_path); self.log_seq(f"[MOVED] {filename}")
-                        else: shutil.copy2(src_path, dst_path); self.log_seq(f"[COPIED] {filename}")
-                        success += 1
-                    except Exception as e: self.log_seq(f"[ERR] {filename}: {str(e)}")
-                else: self.log_seq(f"[MISSING] {filename}"); missing += 1
-        self.log_seq("-" * 30)
-        self.log_seq(f"Done! Success: {success}, Missing: {missing}")
-        messagebox.showinfo("Complete", f"Operation finished.\nSuccess: {success}\nMissing: {missing}")
+        args = (source_dir, raw_seq, self.seq_prefix_var.get().strip(), self.seq_ext_var.get().split(","), target_dir,
+                backup_dirs, self.seq_action_var.get(), self.settings["copy_mode"], self.settings["copy_verify"])
+        self.seq_log.config(state="normal")
+        self.seq_log.delete("1.0", "end")
+        self.seq_log.config(state="disabled")
+        self.seq_log_lines = []
+        self.seq_counts = {}
+        self.seq_progress["value"] = 0
+        self.btn_seq_process.config(state="disabled")
+        threading.Thread(target=self.process_seq_files, args=args, daemon=True).start()
+        self.drain_seq_events()
+
+    def process_seq_files(self, source_dir, raw_seq, prefix, exts, target_dir, backup_dirs, action, copy_mode, verify):
+        """ Worker thread: touches no widgets, everything goes through self.seq_events. """
+        counts = run_sequence(source_dir, raw_seq, prefix, exts, target_dir, backup_dirs, action, copy_mode, verify,
+                              log=lambda message: self.seq_events.put(("log", message)),
+                              progress=lambda done, total: self.seq_events.put(("progress", done, total)))
+        self.seq_events.put(("done", counts))
+
+    def drain_seq_events(self):
+        """ Tk thread: applies everything the worker queued since the last tick in one batch. """
+        lines, progress, counts = [], None, None
+        try:
+            while True:
+                event = self.seq_events.get_nowait()
+                if event[0] == "log": lines.append(event[1])
+                elif event[0] == "progress": progress = event[1:]
+                else: counts = event[1]
+        except queue.Empty: pass
+        if lines: self.log_seq("\n".join(lines))
+        if progress:
+            done, total = progress
+            self.seq_progress["value"] = done / total if total else 1.0
+            self.lbl_seq_progress.config(text=f"{done} / {total} files")
+        if counts is None:
+            self.root.after(100, self.drain_seq_events)
+            return
+        self.seq_progress["value"] = 1.0
+        self.seq_summary.delete(*self.seq_summary.get_children())
+        for label, n in counts.items(): self.seq_summary.insert("", "end", text=label, values=(n,))
+        self.btn_seq_process.config(state="normal")
+        messagebox.showinfo("Complete", "Operation finished.\n" + "\n".join(f"{k}: {v}" for k, v in counts.items()))
 
     def log_seq(self, message):
+        """ Tk thread only. One insert per batch; the widget keeps the last SEQ_LOG_VISIBLE lines. """
+        self.seq_log_lines.extend(message.split("\n"))
+        if len(self.seq_log_lines) > SEQ_LOG_MAX: del self.seq_log_lines[:len(self.seq_log_lines) - SEQ_LOG_MAX]
         self.seq_log.config(state="normal")
         self.seq_log.insert("end", message + "\n")
+        excess = int(self.seq_log.index("end-1c").split(".")[0]) - 1 - SEQ_LOG_VISIBLE
+        if excess > 0: self.seq_log.delete("1.0", f"{excess + 1}.0")
         self.seq_log.see("end")
         self.seq_log.config(state="disabled")
 
+    def save_seq_log(self):
+        path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text", "*.txt")])
+        if not path: return
+        with open(path, "w", encoding="utf-8") as f: f.write("\n".join(self.seq_log_lines) + "\n")
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = PhotoOrganizerApp(root)
     root.mainloop()
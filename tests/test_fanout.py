@@ -0,0 +1,40 @@
+""" Multi-destination copies: one read for every destination, renames kept for same-volume moves. """
+import os
+
+import photo_engine as pe
+
+def shot(tmp_path, data=b"pixels" * 1000):
+    src = tmp_path / "IMG_1.JPG"
+    src.write_bytes(data)
+    return src, data
+
+def test_copy_reads_once_into_every_destination(tmp_path):
+    src, data = shot(tmp_path)
+    op = pe.add_backup_ops(pe.FileOp("copy", str(src), str(tmp_path / "out" / "Green" / "IMG_1.JPG")),
+                           str(tmp_path / "out"), [str(tmp_path / "b1"), str(tmp_path / "b2")])
+    for t in op.targets(): os.makedirs(os.path.dirname(t.dst))
+    pe.execute_file_op(op, verify="hash")
+    assert [t.method for t in op.targets()] == ["fanout"] * 3
+    assert all(open(t.dst, "rb").read() == data and t.digest == pe.hash_file(t.dst) for t in op.targets())
+    assert src.exists()
+
+def test_same_volume_move_with_backup_is_a_rename(tmp_path):
+    src, data = shot(tmp_path)
+    inode = src.stat().st_ino
+    (tmp_path / "Green").mkdir()
+    (tmp_path / "backup" / "Green").mkdir(parents=True)
+    op = pe.add_backup_ops(pe.FileOp("move", str(src), str(tmp_path / "Green" / "IMG_1.JPG")), str(tmp_path), [str(tmp_path / "backup")])
+    pe.execute_file_op(op, verify="hash")
+    assert op.method == "rename" and os.stat(op.dst).st_ino == inode
+    assert op.backups[0].status == "ok" and open(op.backups[0].dst, "rb").read() == data
+    assert not src.exists()
+
+def test_failed_backup_keeps_the_source(tmp_path):
+    src, data = shot(tmp_path)
+    (tmp_path / "Green").mkdir()
+    (tmp_path / "backup").write_bytes(b"")  # A file where the backup folder should be
+    op = pe.add_backup_ops(pe.FileOp("move", str(src), str(tmp_path / "Green" / "IMG_1.JPG")), str(tmp_path), [str(tmp_path / "backup")])
+    pe.execute_file_op(op)
+    assert op.backups[0].status == "failed"
+    assert src.exists() and open(op.dst, "rb").read() == data
+    assert op.error == "source kept: a backup copy failed"
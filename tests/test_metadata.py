@@ -0,0 +1,52 @@
+""" Header-only capture metadata on tiny synthetic JPEG, TIFF RAW and ISO-BMFF files. """
+import struct
+from datetime import datetime
+
+import photo_engine as pe
+
+SHOT = datetime(2024, 6, 1, 10, 30, 15)
+
+def tiff(end="<", model="EOS R5", when=SHOT):
+    """ Minimal TIFF: IFD0 with Model (0x0110) and DateTime (0x0132), strings after the IFD. """
+    texts = [(0x0110, model.encode() + b"\0"), (0x0132, when.strftime("%Y:%m:%d %H:%M:%S").encode() + b"\0")]
+    data_at = 8 + 2 + 12 * len(texts) + 4
+    ifd, data = struct.pack(end + "H", len(texts)), b""
+    for tag, raw in texts:
+        ifd += struct.pack(end + "HHII", tag, 2, len(raw), data_at + len(data))
+        data += raw
+    return (b"II" if end == "<" else b"MM") + struct.pack(end + "HI", 42, 8) + ifd + struct.pack(end + "I", 0) + data
+
+def record(path):
+    return pe.extract_metadata(str(path))
+
+def test_jpeg_exif_date(tmp_path):
+    exif = b"Exif\0\0" + tiff()
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 8, 8, 300, 400, 0)
+    path = tmp_path / "a.jpg"
+    path.write_bytes(b"\xff\xd8\xff\xe1" + struct.pack(">H", len(exif) + 2) + exif + sof + b"\xff\xd9")
+    rec = record(path)
+    assert rec["date_taken"] == SHOT.timestamp()
+    assert rec["model"] == "EOS R5"
+    assert (rec["width"], rec["height"]) == (400, 300)
+
+def test_tiff_raw_date_both_byte_orders(tmp_path):
+    for end, name in (("<", "a.CR2"), (">", "b.NEF")):
+        (tmp_path / name).write_bytes(tiff(end, model="Body"))
+        rec = record(tmp_path / name)
+        assert rec["date_taken"] == SHOT.timestamp() and rec["model"] == "Body"
+
+def box(typ, payload):
+    return struct.pack(">I4s", 8 + len(payload), typ) + payload
+
+def test_isobmff_creation_time(tmp_path):
+    created = int(datetime(2024, 6, 1, 8, 0, 0).timestamp()) + pe.QT_EPOCH_OFFSET
+    mvhd = box(b"mvhd", struct.pack(">B3xII", 0, created, created) + b"\0" * 88)
+    path = tmp_path / "clip.mp4"
+    # moov after a (tiny) mdat, as cameras write it
+    path.write_bytes(box(b"ftyp", b"isom\0\0\0\0isom") + box(b"mdat", b"\0" * 64) + box(b"moov", mvhd))
+    assert record(path)["date_taken"] == float(created - pe.QT_EPOCH_OFFSET)
+
+def test_unrecognised_header_has_no_date(tmp_path):
+    path = tmp_path / "notes.mp4"
+    path.write_bytes(b"\0" * 4)
+    assert record(path)["date_taken"] is None
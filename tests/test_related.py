@@ -0,0 +1,15 @@
+""" Related-file stems and the per-folder index (RAW / XMP / sidecars of one shot). """
+import photo_engine as pe
+
+def test_related_stem():
+    assert pe.related_stem("IMG_1.CR2") == "IMG_1"
+    assert pe.related_stem("IMG_1.JPG.xmp") == "IMG_1"
+    assert pe.related_stem("IMG_1.xmp") == "IMG_1"
+    assert pe.related_stem("IMG_10.JPG") != pe.related_stem("IMG_1.JPG")
+
+def test_related_index_keeps_similar_numbers_apart(tmp_path):
+    for name in ("IMG_1.JPG", "IMG_1.CR2", "IMG_1.JPG.xmp", "IMG_10.JPG", "IMG_10.CR2"):
+        (tmp_path / name).write_bytes(b"")
+    index = pe.build_related_index(str(tmp_path))
+    assert sorted(index["IMG_1"]) == ["IMG_1.CR2", "IMG_1.JPG", "IMG_1.JPG.xmp"]
+    assert sorted(index["IMG_10"]) == ["IMG_10.CR2", "IMG_10.JPG"]
@@ -0,0 +1,92 @@
+""" Two-phase batch rename: planning, cycles, conflicts, rollback and the Undo journal. """
+import os
+
+import pytest
+
+import photo_engine as pe
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "config"
+    monkeypatch.setattr(pe, "get_user_config_dir", lambda: str(folder))
+    return folder
+
+def make(folder, **files):
+    for name, text in files.items(): (folder / name).write_text(text)
+    return {name: str(folder / name) for name in files}
+
+def contents(folder):
+    return {p.name: p.read_text() for p in folder.iterdir() if p.is_file()}
+
+def test_swap_cycle(tmp_path):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b"})
+    steps = pe.plan_renames([(p["A.jpg"], p["B.jpg"]), (p["B.jpg"], p["A.jpg"])])
+    assert [st.status for st in steps] == ["cycle", "cycle"]
+    pe.execute_renames(steps, journal=False)
+    assert contents(tmp_path) == {"A.jpg": "b", "B.jpg": "a"}
+
+def test_chain_runs_in_order(tmp_path):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b"})
+    steps = pe.plan_renames([(p["A.jpg"], p["B.jpg"]), (p["B.jpg"], str(tmp_path / "C.jpg"))])
+    assert [st.status for st in steps] == ["chain", "ok"]
+    pe.execute_renames(steps, journal=False)
+    assert contents(tmp_path) == {"B.jpg": "a", "C.jpg": "b"}
+
+def test_chain_onto_existing_file_is_blocked(tmp_path):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b", "C.jpg": "keep"})
+    steps = pe.plan_renames([(p["A.jpg"], p["B.jpg"]), (p["B.jpg"], p["C.jpg"])])
+    assert steps[1].status == "exists"
+    with pytest.raises(FileExistsError): pe.execute_renames(steps, journal=False)
+    assert contents(tmp_path) == {"A.jpg": "a", "B.jpg": "b", "C.jpg": "keep"}
+
+def test_duplicate_targets_are_blocked(tmp_path):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b"})
+    steps = pe.plan_renames([(p["A.jpg"], str(tmp_path / "X.jpg")), (p["B.jpg"], str(tmp_path / "X.jpg"))])
+    assert steps[1].status == "duplicate"
+
+def test_rollback_when_phase_two_fails(tmp_path, monkeypatch, journal_dir):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b", "C.jpg": "c"})
+    steps = pe.plan_renames([(p[n], str(tmp_path / f"new_{n}")) for n in ("A.jpg", "B.jpg", "C.jpg")])
+    real_rename, calls = os.rename, []
+
+    def rename(src, dst):
+        if src.endswith(".tmp") and os.path.basename(dst).startswith("new_"):
+            calls.append(dst)
+            if len(calls) == 2: raise OSError("disk went away")  # Second file of phase 2
+        real_rename(src, dst)
+    monkeypatch.setattr(os, "rename", rename)
+    with pytest.raises(OSError): pe.execute_renames(steps)
+    assert contents(tmp_path) == {"A.jpg": "a", "B.jpg": "b", "C.jpg": "c"}
+    assert pe.load_rename_journal() == []
+
+def test_undo_round_trip(tmp_path):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b"})
+    pe.execute_renames(pe.plan_renames([(p["A.jpg"], p["B.jpg"]), (p["B.jpg"], str(tmp_path / "C.jpg"))]))
+    batch = pe.load_rename_journal()[-1]
+    assert batch["state"] == "done" and all(os.path.isabs(path) for step in batch["steps"] for path in step)
+    restored = pe.undo_last_rename()
+    assert len(restored) == 2
+    assert contents(tmp_path) == {"A.jpg": "a", "B.jpg": "b"}
+    assert pe.load_rename_journal() == []
+
+def test_undo_from_another_working_directory(tmp_path, monkeypatch):
+    make(tmp_path, **{"A.jpg": "a"})
+    monkeypatch.chdir(tmp_path)
+    pe.execute_renames(pe.plan_renames([("A.jpg", "Beach_001.jpg")]))  # Relative, as the CLI gets them from '.'
+    monkeypatch.chdir(tmp_path.parent)
+    pe.undo_last_rename()
+    assert contents(tmp_path) == {"A.jpg": "a"}
+
+def test_copy_renames_removes_partial_copies(tmp_path, monkeypatch):
+    p = make(tmp_path, **{"A.jpg": "a", "B.jpg": "b"})
+    out = tmp_path / "Scene"
+    out.mkdir()
+    steps = pe.plan_renames([(p["A.jpg"], str(out / "S_001.jpg")), (p["B.jpg"], str(out / "S_002.jpg"))])
+    real_op = pe.execute_file_op
+
+    def execute_file_op(op, *args):
+        if op.src == p["B.jpg"]: raise OSError("no space left")
+        return real_op(op, *args)
+    monkeypatch.setattr(pe, "execute_file_op", execute_file_op)
+    with pytest.raises(OSError): pe.copy_renames(steps)
+    assert list(out.iterdir()) == []
@@ -0,0 +1,68 @@
+""" Folder scans: breadth-first chunks, filters, capture-time ordering and a metadata index that can't be read. """
+import os
+import sqlite3
+from datetime import datetime
+
+import photo_engine as pe
+from test_metadata import SHOT, tiff
+
+EXTS = pe.IMAGE_EXTS | pe.VIDEO_EXTS
+
+def stamp(path, when):
+    os.utime(path, (when.timestamp(), when.timestamp()))
+
+def card(tmp_path):
+    root = tmp_path / "card"
+    (root / "100CANON").mkdir(parents=True)
+    (root / "a.jpg").write_bytes(b"not really a jpeg")
+    (root / "b.tiff").write_bytes(tiff(when=SHOT))  # Shot in 2024, copied later
+    (root / "100CANON" / "c.jpg").write_bytes(b"not really a jpeg")
+    (root / "notes.txt").write_text("skip me")
+    stamp(root / "a.jpg", datetime(2025, 1, 1))
+    stamp(root / "b.tiff", datetime(2026, 1, 1))
+    stamp(root / "100CANON" / "c.jpg", datetime(2023, 1, 1))
+    return root
+
+def drain(scan, timeout=10):
+    chunks = []
+    while True:
+        kind, payload = scan.events.get(timeout=timeout)
+        if kind != "chunk": return chunks, kind, payload
+        chunks.append(payload)
+
+def test_scan_media_is_breadth_first_and_filtered(tmp_path):
+    root = card(tmp_path)
+    chunks = list(pe.scan_media(str(root), EXTS, first_chunk=2))
+    assert [[rel for rel, _size, _mtime in c] for c in chunks] == [["a.jpg", "b.tiff"], [os.path.join("100CANON", "c.jpg")]]
+    assert [rel for c in pe.scan_media(str(root), EXTS, recursive=False) for rel, _s, _m in c] == ["a.jpg", "b.tiff"]
+    assert [rel for c in pe.scan_media(str(root), EXTS, exclude=("*.tiff",)) for rel, _s, _m in c] == ["a.jpg", os.path.join("100CANON", "c.jpg")]
+
+def test_order_by_capture_prefers_the_capture_date(tmp_path):
+    root = card(tmp_path)
+    c = os.path.join("100CANON", "c.jpg")
+    assert pe.scan_folder(str(root)) == [c, "a.jpg", "b.tiff"]  # mtime only
+    index = pe.MetadataIndex(str(tmp_path / "meta.sqlite"))
+    assert pe.scan_folder(str(root), metadata=index) == [c, "b.tiff", "a.jpg"]
+
+def test_folder_scan_streams_then_orders(tmp_path):
+    root = card(tmp_path)
+    index = pe.MetadataIndex(str(tmp_path / "meta.sqlite"))
+    chunks, kind, ordered = drain(pe.FolderScan(str(root), EXTS, metadata=index).start())
+    assert sorted(rel for c in chunks for rel in c) == sorted(ordered)
+    assert (kind, ordered) == ("done", [os.path.join("100CANON", "c.jpg"), "b.tiff", "a.jpg"])
+
+class LockedDatabase:
+    def execute(self, *args): raise sqlite3.OperationalError("database is locked")
+    executemany = execute
+    def commit(self): raise sqlite3.OperationalError("database is locked")
+
+def test_folder_scan_finishes_when_the_index_is_locked(tmp_path):
+    root = card(tmp_path)
+    index = pe.MetadataIndex(str(tmp_path / "meta.sqlite"))
+    index.conn = LockedDatabase()
+    _chunks, kind, ordered = drain(pe.FolderScan(str(root), EXTS, metadata=index).start())
+    assert (kind, ordered) == ("done", [os.path.join("100CANON", "c.jpg"), "b.tiff", "a.jpg"])
+
+def test_folder_scan_reports_a_missing_folder(tmp_path):
+    _chunks, kind, message = drain(pe.FolderScan(str(tmp_path / "gone"), EXTS).start())
+    assert kind == "error" and message
@@ -0,0 +1,21 @@
+""" Sequence Sorter shorthand and the single-scandir number index. """
+import photo_engine as pe
+
+def test_expand_sequence():
+    assert pe.expand_sequence("1210, 1, 5, 9") == ["1210", "1211", "1215", "1219"]
+    assert pe.expand_sequence("1210\n67,,") == ["1210", "1267"]
+
+def test_resolve_sequence(tmp_path):
+    for name in ("IMG_1210.JPG", "IMG_1210.CR2", "img_1211.jpg", "IMG_1215.MOV"):
+        (tmp_path / name).write_bytes(b"")
+    index = pe.build_sequence_index(str(tmp_path), "IMG_")
+    matched, unmatched, unexpected = pe.resolve_sequence(index, ["1210", "1211", "1215", "1219"], ["JPG", "CR2"])
+    assert matched == ["IMG_1210.JPG", "IMG_1210.CR2", "img_1211.jpg"]
+    assert unmatched == ["1215", "1219"]
+    assert unexpected == {"1215": ["mov"]}
+
+def test_resolve_sequence_without_extension_filter(tmp_path):
+    for name in ("IMG_7.JPG", "IMG_7.MOV"):
+        (tmp_path / name).write_bytes(b"")
+    matched, unmatched, _ = pe.resolve_sequence(pe.build_sequence_index(str(tmp_path), "IMG_"), ["7", "8"], [])
+    assert sorted(matched) == ["IMG_7.JPG", "IMG_7.MOV"] and unmatched == ["8"]
@@ -0,0 +1,60 @@
+""" SortJob: planned moves, copies and deletes on the worker pool, progress snapshots and cancellation. """
+import time
+
+import photo_engine as pe
+
+def run(job, timeout=10):
+    job.start()
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, "sort job did not finish"
+        time.sleep(0.01)
+    assert job.error == ""
+    return job
+
+def shoot(tmp_path):
+    src = tmp_path / "card"
+    src.mkdir()
+    for name, size in (("A.JPG", 100), ("A.CR2", 1000), ("B.JPG", 200), ("C.JPG", 300), ("C.CR2", 3000)):
+        (src / name).write_bytes(b"x" * size)
+    return src
+
+def test_move_copy_and_delete(tmp_path):
+    src, out = shoot(tmp_path), tmp_path / "sorted"
+    labels = {"A.JPG": "Green", "B.JPG": "Yellow", "C.JPG": "Red"}
+    plan = lambda: pe.plan_visual_sort(str(src), str(out), labels, {"B.JPG": "keep.JPG"}, "move", True)
+    job = run(pe.SortJob(plan, workers=2, roots=[str(out)]))
+    assert sorted((op.action, op.status) for op in job.results()) == [("delete", "ok")] * 2 + [("move", "ok")] * 3
+    assert sorted(p.name for p in src.iterdir()) == []
+    assert (out / "Green" / "A.CR2").stat().st_size == 1000 and (out / "Yellow" / "keep.JPG").exists()
+    snap = job.snapshot()
+    assert (snap["files"], snap["total_files"]) == (5, 5)
+    assert snap["bytes"] == snap["total_bytes"] == 1300  # C.JPG / C.CR2 are deleted, not transferred
+    assert snap["destinations"] == [(str(out), 1300, 1300, 0)] and snap["finished"]
+
+def test_copy_keeps_sources_and_reports_failures(tmp_path):
+    src, out = shoot(tmp_path), tmp_path / "sorted"
+    (out / "Green").mkdir(parents=True)
+    (out / "Green" / "B.JPG").mkdir()  # A directory in the way of one target
+    labels = {"A.JPG": "Green", "B.JPG": "Green"}
+    plan = lambda: pe.plan_visual_sort(str(src), str(out), labels, {}, "copy", False)
+    job = run(pe.SortJob(plan, workers=1, roots=[str(out)]))
+    status = {op.src.rsplit("/", 1)[-1]: op.status for op in job.results()}
+    assert status == {"A.JPG": "ok", "B.JPG": "failed"}
+    assert (src / "A.JPG").exists() and (out / "Green" / "A.JPG").read_bytes() == b"x" * 100
+    assert job.snapshot()["destinations"] == [(str(out), 100, 300, 1)]
+
+def test_cancel_stops_between_files(tmp_path, monkeypatch):
+    src, out = shoot(tmp_path), tmp_path / "sorted"
+    labels = {"A.JPG": "Green", "B.JPG": "Green", "C.JPG": "Green"}
+    job = pe.SortJob(lambda: pe.plan_visual_sort(str(src), str(out), labels, {}, "move", False), workers=1)
+    real_op = pe.execute_file_op
+
+    def first_then_cancel(op, *args):
+        real_op(op, *args)
+        job.cancel()
+    monkeypatch.setattr(pe, "execute_file_op", first_then_cancel)
+    run(job)
+    assert [op.status for op in job.results()] == ["ok", "cancelled", "cancelled"]
+    assert sorted(p.name for p in src.iterdir()) == ["A.CR2", "B.JPG", "C.CR2", "C.JPG"]
+    assert job.snapshot()["cancelled"]
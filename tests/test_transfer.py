@@ -0,0 +1,80 @@
+""" Move / copy fast paths: same-volume rename, hard links, in-kernel copies and the cross-volume fallback. """
+import errno
+import os
+import shutil
+import sys
+
+import pytest
+
+import photo_engine as pe
+
+DATA = b"raw sensor data" * 4096
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "IMG_1.CR2"
+    path.write_bytes(DATA)
+    os.utime(path, (1_700_000_000, 1_700_000_000))
+    return path
+
+def test_same_volume_move_is_a_rename(src, tmp_path):
+    inode = src.stat().st_ino
+    assert pe.move_file(str(src), str(tmp_path / "moved.CR2")) == "rename"
+    assert (tmp_path / "moved.CR2").stat().st_ino == inode and not src.exists()
+
+def test_copy_keeps_data_and_mtime(src, tmp_path):
+    dst = tmp_path / "copy.CR2"
+    method = pe.copy_file(str(src), str(dst))
+    assert method in ("clone", "reflink", "copy_file_range", "copy")
+    assert dst.read_bytes() == DATA and dst.stat().st_mtime == 1_700_000_000
+    assert dst.stat().st_ino != src.stat().st_ino
+
+def test_copy_overwrites_an_existing_target(src, tmp_path):
+    dst = tmp_path / "copy.CR2"
+    dst.write_bytes(b"old and longer than nothing" * 10000)
+    pe.copy_file(str(src), str(dst))
+    assert dst.read_bytes() == DATA
+
+def test_hardlink_mode(src, tmp_path):
+    dst = tmp_path / "linked.CR2"
+    dst.write_bytes(b"stale")
+    assert pe.copy_file(str(src), str(dst), "hardlink") == "hardlink"
+    assert dst.stat().st_ino == src.stat().st_ino
+
+def test_same_file_is_refused(src, tmp_path):
+    with pytest.raises(shutil.SameFileError): pe.copy_file(str(src), str(src))
+    os.link(src, tmp_path / "alias.CR2")
+    with pytest.raises(shutil.SameFileError): pe.copy_file(str(src), str(tmp_path / "alias.CR2"), "hardlink")
+    assert src.read_bytes() == DATA
+
+def test_cross_volume_move_copies_with_the_copy_mode(src, tmp_path, monkeypatch):
+    modes = []
+    real_copy = pe.copy_file
+
+    def copy_file(s, d, mode="auto"):
+        modes.append(mode)
+        return real_copy(s, d, mode)
+
+    def rename(s, d): raise OSError(errno.EXDEV, "Invalid cross-device link")
+    monkeypatch.setattr(pe, "copy_file", copy_file)
+    monkeypatch.setattr(pe.os, "rename", rename)
+    monkeypatch.setattr(pe, "same_volume", lambda s, d: False)
+    method = pe.move_file(str(src), str(tmp_path / "other.CR2"), "hardlink")
+    assert modes == ["hardlink"] and method != "hardlink"  # Links can't cross volumes: a real copy
+    assert (tmp_path / "other.CR2").read_bytes() == DATA and not src.exists()
+
+def test_same_volume_rename_errors_are_not_masked(src, tmp_path):
+    with pytest.raises(OSError): pe.move_file(str(src), str(tmp_path / "missing" / "x.CR2"))
+    assert src.exists()
+
+@pytest.mark.skipif(not sys.platform.startswith("linux") or not hasattr(os, "copy_file_range"), reason="Linux copy_file_range")
+def test_copy_file_range_that_stops_short_falls_back(src, tmp_path, monkeypatch):
+    import fcntl
+
+    def no_reflink(*args): raise OSError(errno.EOPNOTSUPP, "no reflink")
+    real_range = os.copy_file_range
+    monkeypatch.setattr(fcntl, "ioctl", no_reflink)
+    monkeypatch.setattr(pe.os, "copy_file_range", lambda fi, fo, n: real_range(fi, fo, min(n, 1000)) if os.lseek(fo, 0, 1) < 5000 else 0)
+    dst = tmp_path / "copy.CR2"
+    assert pe.copy_file(str(src), str(dst)) == "copy"
+    assert dst.read_bytes() == DATA
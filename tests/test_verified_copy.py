@@ -0,0 +1,63 @@
+""" Verified, pipelined copies: digests, manifests and writes that come back short. """
+import builtins
+import os
+
+import pytest
+
+import photo_engine as pe
+
+DATA = os.urandom(3 * 1024 * 1024 + 123)
+
+class ShortWrites:
+    """ Wraps a raw file so every write() takes at most 'limit' bytes; lossy=True claims the full buffer anyway. """
+    def __init__(self, f, limit, lossy=False):
+        self.f, self.limit, self.lossy = f, limit, lossy
+
+    def write(self, buf):
+        n = self.f.write(buf[:self.limit])
+        return len(buf) if self.lossy else n
+
+    def __getattr__(self, name):
+        return getattr(self.f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.f.close()
+
+def short_writes(monkeypatch, lossy=False):
+    def fake_open(path, mode="r", *args, **kwargs):
+        f = builtins.open(path, mode, *args, **kwargs)
+        return ShortWrites(f, 100_000, lossy) if str(path).endswith(".part") else f
+    monkeypatch.setattr(pe, "open", fake_open, raising=False)
+
+def test_verified_copy_digest_matches_disk(tmp_path):
+    src = tmp_path / "a.CR2"
+    src.write_bytes(DATA)
+    digest = pe.verified_copy(str(src), str(tmp_path / "b.CR2"), readback=True, chunk=1024 * 1024)
+    assert digest == pe.hash_file(str(src)) == pe.hash_file(str(tmp_path / "b.CR2"))
+
+def test_short_writes_are_completed(tmp_path, monkeypatch):
+    src = tmp_path / "a.CR2"
+    src.write_bytes(DATA)
+    short_writes(monkeypatch)
+    digest = pe.verified_copy(str(src), str(tmp_path / "b.CR2"), chunk=1024 * 1024)
+    assert (tmp_path / "b.CR2").read_bytes() == DATA and digest == pe.hash_file(str(src))
+
+def test_truncated_copy_is_rejected(tmp_path, monkeypatch):
+    src = tmp_path / "a.CR2"
+    src.write_bytes(DATA)
+    short_writes(monkeypatch, lossy=True)
+    with pytest.raises(IOError, match="Size mismatch"): pe.verified_copy(str(src), str(tmp_path / "b.CR2"), chunk=1024 * 1024)
+    assert sorted(os.listdir(tmp_path)) == ["a.CR2"]  # Neither the copy nor its .part file is left behind
+
+def test_manifest_merges_entries(tmp_path):
+    manifest = pe.CopyManifest()
+    manifest.add(str(tmp_path / "a.JPG"), "aa")
+    manifest.write()
+    manifest.add(str(tmp_path / "b.JPG"), "bb")
+    manifest.add(str(tmp_path / "a.JPG"), "cc")
+    manifest.write()
+    lines = (tmp_path / pe.MANIFEST_NAME).read_text().splitlines()
+    assert sorted(lines) == ["bb  b.JPG", "cc  a.JPG"]
@@ -0,0 +1,59 @@
+""" FolderWatcher: outside creates, renames (also between folders) and deletes, one polling round at a time. """
+import os
+import queue
+import threading
+
+import photo_engine as pe
+
+class Rounds:
+    """ Stands in for the stop event: the watcher polls once per step() instead of on a timer. """
+    def __init__(self):
+        self.steps = queue.Queue()
+        self.waiting = threading.Event()
+    def is_set(self): return False
+    def wait(self, timeout=None):
+        self.waiting.set()
+        return self.steps.get(timeout=10)
+
+def watch(root):
+    watcher = pe.FolderWatcher(str(root), pe.IMAGE_EXTS | pe.VIDEO_EXTS)
+    watcher.stop_event = rounds = Rounds()
+    watcher.start()
+    assert rounds.waiting.wait(10)  # First snapshot taken
+
+    def step():
+        rounds.waiting.clear()
+        rounds.steps.put(False)
+        assert rounds.waiting.wait(10)
+        try: return watcher.events.get_nowait()
+        except queue.Empty: return None
+
+    return watcher, step
+
+def test_create_rename_and_delete(tmp_path):
+    (tmp_path / "100CANON").mkdir()
+    for name in ("b.jpg", "c.jpg", os.path.join("100CANON", "d.jpg")):
+        (tmp_path / name).write_bytes(name.encode())
+    watcher, step = watch(tmp_path)
+
+    (tmp_path / "a.jpg").write_bytes(b"new")
+    (tmp_path / "notes.txt").write_text("not media")
+    os.rename(tmp_path / "b.jpg", tmp_path / "100CANON" / "b2.jpg")
+    os.remove(tmp_path / "c.jpg")
+    (tmp_path / "101CANON").mkdir()
+    (tmp_path / "101CANON" / "E.jpg").write_bytes(b"new folder")
+    assert step() == ({"b.jpg": os.path.join("100CANON", "b2.jpg")}, ["c.jpg"], [os.path.join("101CANON", "E.jpg"), "a.jpg"])
+
+    os.rename(tmp_path / "100CANON" / "d.jpg", tmp_path / "100CANON" / "keeper.jpg")
+    assert step() == ({os.path.join("100CANON", "d.jpg"): os.path.join("100CANON", "keeper.jpg")}, [], [])
+
+    assert step() is None  # Nothing changed
+    watcher.stop_event.steps.put(True)
+
+def test_removed_folder(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "x.mp4").write_bytes(b"clip")
+    _watcher, step = watch(tmp_path)
+    os.remove(tmp_path / "sub" / "x.mp4")
+    os.rmdir(tmp_path / "sub")
+    assert step() == ({}, [os.path.join("sub", "x.mp4")], [])